@@ -1,13 +1,27 @@
 from bulding_compounds.opening import Opening, OpeningTech, OPENING_TYPES, OpeningCategory
 from bulding_compounds.material import Material, MATERIALS
-from bulding_compounds.room import Room
-from bulding_compounds.wall import Wall, walls_intersect_properly
-from typing import Dict
+from bulding_compounds.room import Room, RoomGeometry
+from bulding_compounds.wall import Wall, segments_intersect_properly, GEOMETRY_TOLERANCE, geometry_clock
+from typing import Callable, Dict, List
 from icecream import ic
 import plotly.graph_objects as go
 from typing import Optional
-import math
 from bulding_compounds.custom_errors import *
+from bulding_compounds.observed_dict import ObservedDict, MISSING
+from bulding_compounds.spatial_index import SegmentGridIndex
+from bulding_compounds.adjacency import RoomAdjacency, AdjacencyCSR
+from bulding_compounds.arrays import BuildingArrays, build_arrays
+from bulding_compounds.id_index import IdIndex
+from bulding_compounds.slab import Slab
+from bulding_compounds.journal import EditJournal, Operation
+from bulding_compounds.plan_renderer import build_plan_figure, PlanCache, PLAN_CACHE_LIMIT
+from bulding_compounds.change_log import ChangeLog
+from bulding_compounds.hvac import HVACDevice
+from bulding_compounds.validation import ValidationReport, find_improper_pairs
+import numpy as np
+import copy
+import dataclasses
+import weakref
 from dataclasses import dataclass, field
 
 
@@ -15,13 +29,481 @@ from dataclasses import dataclass, field
 class Building:
     walls: Dict[str, Wall] = field(default_factory=dict)
     rooms: Dict[str, Room] = field(default_factory=dict)
+    slabs: Dict[str, Slab] = field(default_factory=dict)  # перекриття між поверхами
+
+    # --- Службові індекси ---
+    # walls завжди зберігається як ObservedDict: будь-яка вставка/видалення стіни
+    # (у тому числі напряму через building.walls[...] = ...) оновлює індекси.
+    # Індекси не є полями dataclass, тому не потрапляють в asdict / JSON.
+
+    def __setattr__(self, name, value):
+        if name == "walls":
+            value = ObservedDict(value)
+            value.bind(self._on_wall_set, self._on_wall_delete)
+            object.__setattr__(self, "_indexes_dirty", True)
+            # Щільні номери стін (у порядку словника)
+            object.__setattr__(self, "_wall_numbers", IdIndex(value))
+        elif name == "rooms":
+            value = ObservedDict(value)
+            value.bind(self._on_room_set, self._on_room_delete)
+            object.__setattr__(self, "_room_numbers", IdIndex(value))
+            # id кімнати -> (ревізія кімнати, годинник координат, висота, стіни, відбиток стін, геометрія)
+            object.__setattr__(self, "_room_geometry", {})
+        elif name == "slabs":
+            value = ObservedDict(value)
+            value.bind(self._on_slab_set, self._on_slab_delete)
+            # id кімнати -> {id перекриття: id кімнати з іншого боку}
+            object.__setattr__(self, "_room_slabs", {})
+            for key, slab in value.items():
+                self._index_slab(key, slab)
+        changes = self.__dict__.get("_changes")
+        if changes is not None and name in ("walls", "rooms", "slabs"):
+            changes.reset()
+        object.__setattr__(self, name, value)
+
+    def __post_init__(self):
+        # Журнал правок для undo / redo (не копіюється і не серіалізується)
+        object.__setattr__(self, "_journal", EditJournal())
+        self._init_changes()
+        self._init_cow()
+
+    def _init_changes(self):
+        # Лічильник ревізій зі списком змінених стін / кімнат і кеш планів за (поверх, режим, область)
+        object.__setattr__(self, "_changes", ChangeLog())
+        object.__setattr__(self, "_plan_caches", {})
+        object.__setattr__(self, "_arrays", None)
+
+    def _init_cow(self):
+        # Copy-on-write: поки живий хоч один знімок, стіни та кімнати, що є і в ньому,
+        # перед зміною копіюються. _owned — id об'єктів, створених/скопійованих після знімка.
+        object.__setattr__(self, "_snapshots", [])
+        object.__setattr__(self, "_owned", set())
+        object.__setattr__(self, "_frozen", False)
+
+    def __getstate__(self):
+        # Для pickle/copy зберігаємо лише дані, індекси перебудуються після відновлення
+        return {k: v for k, v in self.__dict__.items() if not k.startswith("_")}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        object.__setattr__(self, "_journal", EditJournal())
+        self._init_changes()
+        self._init_cow()
+
+    # --- Знімки (copy-on-write) ---
+
+    def snapshot(self) -> "Building":
+        """
+        Незмінний знімок поточного стану для симуляції / експорту.
+        Копіюються лише словники посилань: стіни, кімнати та матеріали спільні,
+        а подальші правки цієї будівлі копіюють об'єкт перед зміною (copy-on-write).
+        """
+        if self._frozen:
+            return self
+        snap = Building(walls=self.walls, rooms=dict(self.rooms), slabs=self.slabs)
+        # Знімок має ті самі номери стін / кімнат, що й оригінал
+        object.__setattr__(snap, "_wall_numbers", self._wall_numbers.copy())
+        object.__setattr__(snap, "_room_numbers", self._room_numbers.copy())
+        # Кеш геометрії кімнат можна успадкувати, але ревізії кімнат у знімка свої:
+        # перше звернення перевіряє запис за відбитком стін
+        snap._room_geometry.update({rid: (None,) + entry[1:] for rid, entry in self._room_geometry.items()})
+        object.__setattr__(snap, "_frozen", True)
+        self._snapshots.append(weakref.ref(snap))
+        self._owned.clear()
+        return snap
+
+    @property
+    def is_snapshot(self) -> bool:
+        return self._frozen
+
+    def _check_mutable(self):
+        if self._frozen:
+            raise FrozenBuildingError("Знімок будівлі не можна змінювати")
+
+    def _is_shared(self, obj) -> bool:
+        """Чи може об'єкт належати живому знімку."""
+        if id(obj) in self._owned:
+            return False
+        self._snapshots[:] = [ref for ref in self._snapshots if ref() is not None]
+        return bool(self._snapshots)
+
+    @staticmethod
+    def _copy_object(obj):
+        # Поверхнева копія dataclass-а з власними списками (room_ids, openings, wall_ids, ...)
+        clone = copy.copy(obj)
+        for f in dataclasses.fields(obj):
+            value = getattr(obj, f.name)
+            if isinstance(value, list):
+                # copy.copy, а не list(): список отворів зберігає свій тип і лічильник змін
+                object.__setattr__(clone, f.name, copy.copy(value))
+        return clone
+
+    def mutable_wall(self, wall_id: str) -> Wall:
+        """Стіна, яку можна змінювати на місці (копія, якщо оригінал є в знімку)."""
+        self._check_mutable()
+        wall = self.walls[wall_id]
+        if self._is_shared(wall):
+            wall = self._copy_object(wall)
+            self.walls[wall_id] = wall
+        self._owned.add(id(wall))
+        # Стіну видано для зміни — вважаємо її зміненою
+        self._changes.record((wall_id,), wall.room_ids)
+        return wall
+
+    def mutable_room(self, room_id: str) -> Room:
+        self._check_mutable()
+        room = self.rooms[room_id]
+        if self._is_shared(room):
+            room = self._copy_object(room)
+            self.rooms[room_id] = room
+        self._owned.add(id(room))
+        self._changes.record(room_ids=(room_id,))
+        return room
+
+    # --- Журнал правок ---
+
+    @property
+    def journal(self) -> EditJournal:
+        return self._journal
+
+    def undo(self) -> Optional[str]:
+        """Скасовує останню правку. Повертає її назву або None."""
+        return self._journal.undo()
+
+    def redo(self) -> Optional[str]:
+        return self._journal.redo()
+
+    def _record_room_added(self, name: str, room: Room, new_walls: List[Wall], linked_walls: List[Wall]):
+        """Записує в журнал додавання кімнати: нові стіни та наявні стіни, до яких її прив'язано."""
+        linked_ids = [wall.id for wall in linked_walls]
+
+        def undo():
+            for wall_id in linked_ids:
+                self.mutable_wall(wall_id).room_ids.remove(room.id)
+                self._sync_wall_rooms(wall_id)
+            for wall in new_walls:
+                del self.walls[wall.id]
+            del self.rooms[room.id]
+
+        def redo():
+            for wall in new_walls:
+                self.walls[wall.id] = wall
+            for wall_id in linked_ids:
+                self.mutable_wall(wall_id).room_ids.append(room.id)
+                self._sync_wall_rooms(wall_id)
+            self.rooms[room.id] = room
+
+        self._journal.record(Operation(name, undo, redo))
+
+    def add_opening(self, wall_id: str, opening: Opening):
+        """Додає отвір у стіну (з перевірками Wall.add_opening) із записом у журнал."""
+        self.mutable_wall(wall_id).add_opening(opening)
+
+        def undo():
+            openings = self.mutable_wall(wall_id).openings
+            # Видаляємо саме цей об'єкт, а не рівний йому за полями
+            index = next(i for i, op in enumerate(openings) if op is opening)
+            del openings[index]
+
+        def redo():
+            self.mutable_wall(wall_id).openings.append(opening)
+
+        self._journal.record(Operation(f"Додати отвір {opening.tech.name}", undo, redo))
+
+    def set_wall_material(self, wall_id: str, material: Material):
+        wall = self.mutable_wall(wall_id)
+        old_material = wall.base_material
+        wall.base_material = material
+
+        def undo():
+            self.mutable_wall(wall_id).base_material = old_material
+
+        def redo():
+            self.mutable_wall(wall_id).base_material = material
+
+        self._journal.record(Operation(f"Змінити матеріал на {material.name}", undo, redo))
+
+    def add_hvac(self, room_id: str, device: HVACDevice):
+        self.mutable_room(room_id).add_hvac(device)
+
+        def undo():
+            devices = self.mutable_room(room_id).hvac_devices
+            index = next(i for i, d in enumerate(devices) if d is device)
+            del devices[index]
+
+        def redo():
+            self.mutable_room(room_id).add_hvac(device)
+
+        self._journal.record(Operation(f"Встановити {device.name}", undo, redo))
+
+    def remove_hvac(self, room_id: str, device_id: str):
+        room = self.mutable_room(room_id)
+        old_devices = list(room.hvac_devices)
+        room.remove_hvac(device_id)
+        new_devices = list(room.hvac_devices)
+
+        # Кожен раз новий список, щоб не ділити його з кімнатою у знімку
+        def undo():
+            self.mutable_room(room_id).hvac_devices = list(old_devices)
+
+        def redo():
+            self.mutable_room(room_id).hvac_devices = list(new_devices)
+
+        self._journal.record(Operation("Прибрати обладнання", undo, redo))
+
+    def clear(self):
+        """Видаляє все (з можливістю скасування)."""
+        self._check_mutable()
+        old = (self.walls, self.rooms, self.slabs)
+
+        def undo():
+            self.walls, self.rooms, self.slabs = old
+
+        def redo():
+            self.walls, self.rooms, self.slabs = {}, {}, {}
+
+        redo()
+        self._journal.record(Operation("Видалити все", undo, redo))
+
+    def _on_wall_set(self, key, old, new):
+        # Контур кімнат залежить від їхніх стін — змінюються і старі, і нові кімнати стіни
+        self._changes.record((key,), (old.room_ids if old is not MISSING else []) + new.room_ids)
+        self._wall_numbers.add(key)
+        if self._indexes_dirty:
+            return
+        if old is not MISSING:
+            self._unindex_wall(key, old)
+        self._index_wall(key, new)
+
+    def _on_wall_delete(self, key, old):
+        self._changes.record((key,), old.room_ids)
+        self._wall_numbers.remove(key)
+        if not self._indexes_dirty:
+            self._unindex_wall(key, old)
+
+    def _on_room_set(self, key, old, new):
+        self._changes.record(room_ids=(key,))
+        self._room_numbers.add(key)
+
+    def _on_room_delete(self, key, old):
+        self._changes.record(room_ids=(key,))
+        self._room_numbers.remove(key)
+
+    def _on_slab_set(self, key, old, new):
+        self._changes.record()
+        if old is not MISSING:
+            self._unindex_slab(key, old)
+        self._index_slab(key, new)
+
+    def _on_slab_delete(self, key, old):
+        self._changes.record()
+        self._unindex_slab(key, old)
+
+    def _index_slab(self, key: str, slab: Slab):
+        self._room_slabs.setdefault(slab.lower_room_id, {})[key] = slab.upper_room_id
+        self._room_slabs.setdefault(slab.upper_room_id, {})[key] = slab.lower_room_id
+
+    def _unindex_slab(self, key: str, slab: Slab):
+        for room_id in (slab.lower_room_id, slab.upper_room_id):
+            slabs = self._room_slabs.get(room_id)
+            if slabs is not None:
+                slabs.pop(key, None)
+                if not slabs:
+                    del self._room_slabs[room_id]
+
+    def _index_wall(self, key: str, wall: Wall):
+        # Запам'ятовуємо ключ геометрії на момент вставки, щоб коректно прибрати стіну
+        geometry_key = wall.geometry_key
+        # Перетини можливі лише між стінами одного поверху — окрема сітка на поверх
+        grid = self._wall_grids.get(wall.level)
+        if grid is None:
+            grid = self._wall_grids[wall.level] = SegmentGridIndex()
+        grid.insert(key, wall.start_x, wall.start_y, wall.end_x, wall.end_y)
+        self._adjacency.insert(key, wall.room_ids)
+        self._wall_geometry_keys[key] = geometry_key
+        self._geometry_index.setdefault(geometry_key, []).append(key)
+
+    def _unindex_wall(self, key: str, wall: Wall):
+        self._adjacency.remove(key)
+        geometry_key = self._wall_geometry_keys.pop(key, None)
+        if geometry_key is not None:
+            self._wall_grids[geometry_key[0]].remove(key)
+        same_geometry = self._geometry_index.get(geometry_key)
+        if same_geometry is not None:
+            same_geometry.remove(key)
+            if not same_geometry:
+                del self._geometry_index[geometry_key]
+
+    def _ensure_indexes(self):
+        """Перебудовує індекси, якщо словник стін було замінено цілком."""
+        if self._indexes_dirty:
+            # поверх -> сітка стін цього поверху
+            self._wall_grids: Dict[int, SegmentGridIndex] = {}
+            # ключ геометрії -> ключі стін з такою геометрією (у порядку вставки)
+            self._geometry_index: Dict[tuple, List[str]] = {}
+            self._wall_geometry_keys: Dict[str, tuple] = {}
+            self._adjacency = RoomAdjacency()
+            self._adjacency_csr: Optional[AdjacencyCSR] = None
+            for key, wall in self.walls.items():
+                self._index_wall(key, wall)
+            self._indexes_dirty = False
+
+    def invalidate_indexes(self):
+        """
+        Позначає індекси застарілими (наприклад, після ручної зміни координат
+        чи wall.room_ids вже доданих стін) — вони перебудуються при наступному зверненні.
+        Кешовані плани теж перебудуються повністю.
+        """
+        self._indexes_dirty = True
+        self._changes.reset()
+
+    @property
+    def wall_numbers(self) -> IdIndex:
+        """Таблиця щільних цілих номерів стін (id <-> номер). Не змінювати напряму."""
+        return self._wall_numbers
+
+    @property
+    def room_numbers(self) -> IdIndex:
+        return self._room_numbers
+
+    @property
+    def revision(self) -> int:
+        """Номер ревізії: змінюється при кожній зміні стін, кімнат чи перекриттів."""
+        return self._changes.revision
+
+    def changes_since(self, revision: Optional[int]) -> Optional[tuple]:
+        """(id стін, id кімнат), змінені після revision, або None — якщо треба перебудувати все."""
+        return self._changes.changes_since(revision)
+
+    def _sync_wall_rooms(self, key: str):
+        """Оновлює суміжність після зміни wall.room_ids стіни, що вже є в будівлі."""
+        self._changes.record((key,), self.walls[key].room_ids)
+        if not self._indexes_dirty:
+            self._adjacency.insert(key, self.walls[key].room_ids)
+
+    def get_room_adjacency(self, room_id: str) -> Dict[str, Optional[str]]:
+        """
+        Стіни кімнати з сусідами: {id стіни: id сусідньої кімнати або None для зовнішньої}.
+        Повертається внутрішній словник індексу — його не можна змінювати.
+        """
+        self._ensure_indexes()
+        return self._adjacency.walls_of(room_id)
+
+    def get_adjacent_room_ids(self, room_id: str) -> List[str]:
+        self._ensure_indexes()
+        return self._adjacency.neighbours(room_id)
+
+    def get_exterior_wall_ids(self, room_id: str) -> List[str]:
+        self._ensure_indexes()
+        return self._adjacency.exterior_walls(room_id)
+
+    def is_exterior_wall(self, wall_id: str) -> bool:
+        self._ensure_indexes()
+        return self._adjacency.is_exterior(wall_id)
+
+    def get_room_slabs(self, room_id: str) -> Dict[str, str]:
+        """Перекриття кімнати: {id перекриття: id кімнати над / під ним}. Не змінювати."""
+        return self._room_slabs.get(room_id, {})
+
+    def build_footprint_index(self) -> Dict[int, SegmentGridIndex]:
+        """Просторовий індекс габаритів кімнат по поверхах (ключ — id кімнати)."""
+        index: Dict[int, SegmentGridIndex] = {}
+        for room_id, room in self.rooms.items():
+            geometry = self.get_room_geometry(room)
+            if geometry is None:
+                continue
+            grid = index.get(room.level)
+            if grid is None:
+                grid = index[room.level] = SegmentGridIndex()
+            grid.insert(room_id, *geometry.bounds)
+        return index
+
+    def find_overlapping_rooms(self, room_id: str, level: int,
+                               index: Optional[Dict[int, SegmentGridIndex]] = None) -> Dict[str, float]:
+        """
+        Кімнати поверху level, чиї контури перекриваються з контуром room_id.
+        Повертає {id кімнати: площа перетину, м²}. index — готовий build_footprint_index()
+        для серії запитів.
+        """
+        if index is None:
+            index = self.build_footprint_index()
+        grid = index.get(level)
+        geometry = self.get_room_geometry(self.rooms[room_id])
+        if grid is None or geometry is None:
+            return {}
+
+        min_x, min_y, max_x, max_y = geometry.bounds
+        result = {}
+        for other_id in grid.query(min_x, min_y, max_x, max_y):
+            if other_id == room_id:
+                continue
+            o_min_x, o_min_y, o_max_x, o_max_y = self.get_room_geometry(self.rooms[other_id]).bounds
+            # Кімнати прямокутні — перетин контурів є перетином габаритів
+            dx = min(max_x, o_max_x) - max(min_x, o_min_x)
+            dy = min(max_y, o_max_y) - max(min_y, o_min_y)
+            if dx > GEOMETRY_TOLERANCE and dy > GEOMETRY_TOLERANCE:
+                result[other_id] = dx * dy
+        return result
+
+    def connect_levels(self, material: Material) -> List[Slab]:
+        """
+        Перебудовує перекриття: для кожної кімнати — з кімнатами наступного поверху,
+        з якими перекриваються контури. Пошук через індекс габаритів, без перебору всіх пар.
+        Записується в журнал: undo повертає попередні перекриття.
+        """
+        self._check_mutable()
+        index = self.build_footprint_index()
+        old_slabs = dict(self.slabs)
+        new_slabs = {}
+        for room_id, room in self.rooms.items():
+            for upper_id, area in self.find_overlapping_rooms(room_id, room.level + 1, index).items():
+                slab = Slab(room_id, upper_id, area, material)
+                new_slabs[slab.id] = slab
+
+        def replace(slabs: Dict[str, Slab]):
+            self.slabs.clear()
+            self.slabs.update(slabs)
+
+        def undo():
+            replace(old_slabs)
+
+        def redo():
+            replace(new_slabs)
+
+        redo()
+        self._journal.record(Operation("З'єднати поверхи", undo, redo))
+        return list(new_slabs.values())
+
+    def get_adjacency_csr(self) -> AdjacencyCSR:
+        """Суміжність у форматі CSR (кімнати в порядку self.rooms), кешується до наступної зміни."""
+        self._ensure_indexes()
+        csr = self._adjacency_csr
+        room_order = list(self.rooms)
+        if csr is None or csr.room_ids != room_order or self._adjacency_csr_version != self._adjacency.version:
+            csr = self._adjacency.to_csr(room_order)
+            self._adjacency_csr = csr
+            self._adjacency_csr_version = self._adjacency.version
+        return csr
+
+    def get_arrays(self) -> BuildingArrays:
+        """
+        Стіни будівлі як NumPy-масиви (див. BuildingArrays), кешуються до наступної ревізії.
+        Після зміни стін на місці в обхід методів Building — викликати invalidate_indexes().
+        """
+        arrays = self._arrays
+        if arrays is None or arrays[0] != self.revision:
+            arrays = (self.revision, build_arrays(self))
+            object.__setattr__(self, "_arrays", arrays)
+        return arrays[1]
 
     def create_initial_room(self, x_len: float, y_len: float, height: float, material: Material,
-                            name: str = "Room") -> Room:
+                            name: str = "Room", level: int = 0) -> Room:
+        self._check_mutable()
         if x_len <= 0 or y_len <= 0 or height <= 0:
             raise ValueError("Розміри мають бути > 0")
         # створюю кімнату і додаю її до будівлі
-        room = Room(name=name, x=0.0, y=0.0, width=x_len, length=y_len, height=height)
+        room = Room(name=name, x=0.0, y=0.0, width=x_len, length=y_len, height=height, level=level)
         self.rooms[room.id] = room
 
         # вершини кімнати проти годинникової стрілки, починаючи з лівого нижнього
@@ -33,13 +515,13 @@ class Building:
         # Створюємо стіни з чіткими координатами
         walls = [
             Wall(start_x=x1, start_y=y1, end_x=x2, end_y=y2, height=height,  # південь
-                 base_material=material, room_ids=[room.id]),
+                 base_material=material, room_ids=[room.id], level=level),
             Wall(start_x=x2, start_y=y2, end_x=x3, end_y=y3, height=height,  # схід
-                 base_material=material, room_ids=[room.id]),
+                 base_material=material, room_ids=[room.id], level=level),
             Wall(start_x=x3, start_y=y3, end_x=x4, end_y=y4, height=height,  # північ
-                 base_material=material, room_ids=[room.id]),
+                 base_material=material, room_ids=[room.id], level=level),
             Wall(start_x=x4, start_y=y4, end_x=x1, end_y=y1, height=height,  # захід
-                 base_material=material, room_ids=[room.id]),
+                 base_material=material, room_ids=[room.id], level=level),
         ]
 
         # додаємо стіни в будівлю
@@ -48,162 +530,72 @@ class Building:
 
         # зберігаємо ід стін у кімнаті S, E, N, W
         room.wall_ids = [wall.id for wall in walls]
+        self._record_room_added(f"Створити кімнату {name}", room, walls, [])
         return room
 
-    def get_building_plan(self) -> go.Figure:
-        fig = go.Figure()
-
-        # --- 1. КІМНАТИ (ПІДЛОГА) ---
-        for room in self.rooms.values():
-            room_walls = [self.walls[wid] for wid in room.wall_ids if wid in self.walls]
-            if len(room_walls) < 3: continue
-
-            # --- Геометрія кімнати ---
-            vertices = set()
-            for w in room_walls:
-                vertices.add((round(w.start_x, 4), round(w.start_y, 4)))
-                vertices.add((round(w.end_x, 4), round(w.end_y, 4)))
-            unique_points = list(vertices)
-            if len(unique_points) < 3: continue
-
-            # Центр кімнати
-            center_x = sum(p[0] for p in unique_points) / len(unique_points)
-            center_y = sum(p[1] for p in unique_points) / len(unique_points)
-
-            # Сортування вершин
-            unique_points.sort(key=lambda p: math.atan2(p[1] - center_y, p[0] - center_x))
-            x_coords = [p[0] for p in unique_points] + [unique_points[0][0]]
-            y_coords = [p[1] for p in unique_points] + [unique_points[0][1]]
-
-            # А. Візуальна заливка (не для кліку)
-            fig.add_trace(go.Scatter(
-                x=x_coords,
-                y=y_coords,
-                fill="toself",
-                fillcolor="rgba(173, 216, 230, 0.5)",
-                line=dict(width=0),
-                mode="none",
-                hoverinfo="skip",  # Ігноруємо ховер на заливці, щоб не заважав
-                showlegend=False
-            ))
-
-            label_text = room.name
-            # Якщо є девайси, додаємо іконку
-            if room.hvac_devices:
-                has_heat = any(d.power_heating > 0 for d in room.hvac_devices)
-                has_cool = any(d.power_cooling > 0 for d in room.hvac_devices)
-
-                if has_heat and has_cool:
-                    label_text += " 🌡️"
-                elif has_heat:
-                    label_text += " 🔥"
-                elif has_cool:
-                    label_text += " ❄️"
-
-            # Б. Текст назви кімнати (Головна точка кліку для кімнати)
-            fig.add_trace(go.Scatter(
-                x=[center_x],
-                y=[center_y],
-                mode="text+markers",  # Маркер невидимий, але розширює зону кліку
-                marker=dict(size=20, opacity=0),  # Невидимий великий маркер під текстом
-                text=[label_text],
-                textfont=dict(size=14, color="black", weight="bold"),
-                # === ID Кімнати прив'язаний до тексту ===
-                customdata=[[room.id, "room"]],
-                hovertemplate=f"Кімната: {room.name}<extra></extra>",
-                showlegend=False
-            ))
-
-            # --- 2. СТІНИ ТА ОТВОРИ ---
-            for wall in self.walls.values():
-                is_external = len(wall.room_ids) == 1
-                color = getattr(wall.base_material, "color", "#555555")
-                # Зовнішні стіни малюємо товщими
-                width_px = 8 if is_external else 4
-
-                # А. Малюємо саму стіну (суцільна лінія)
-                # Ми малюємо її повною довжиною, вікна будуть просто накладені зверху іншим кольором
-                fig.add_trace(go.Scatter(
-                    x=[wall.start_x, wall.end_x],
-                    y=[wall.start_y, wall.end_y],
-                    mode="lines",
-                    line=dict(color=color, width=width_px),
-                    hoverinfo="skip",
-                    showlegend=False
-                ))
-
-                # Б. Малюємо отвори (якщо є)
-                if wall.openings:
-                    # Вектор стіни
-                    wx = wall.end_x - wall.start_x
-                    wy = wall.end_y - wall.start_y
-                    wall_len = wall.length
-
-                    # Нормалізований вектор напрямку стіни
-                    ux = wx / wall_len
-                    uy = wy / wall_len
-
-                    # Алгоритм рівномірного розподілу:
-                    # [GAP] [WIN1] [GAP] [WIN2] [GAP]
-                    total_openings_width = sum(op.width for op in wall.openings)
-                    total_gap = wall_len - total_openings_width
-                    gap_size = total_gap / (len(wall.openings) + 1)
-
-                    current_dist = 0.0  # Поточна відстань від start_x
-
-                    for op in wall.openings:
-                        # Початок вікна = (поточна + відступ)
-                        current_dist += gap_size
-                        win_start_x = wall.start_x + ux * current_dist
-                        win_start_y = wall.start_y + uy * current_dist
-
-                        # Кінець вікна = (початок + ширина)
-                        win_end_x = win_start_x + ux * op.width
-                        win_end_y = win_start_y + uy * op.width
-
-                        # Малюємо вікно поверх стіни
-                        # Воно має бути трохи вужчим або світлішим, щоб виділятися
-                        fig.add_trace(go.Scatter(
-                            x=[win_start_x, win_end_x],
-                            y=[win_start_y, win_end_y],
-                            mode="lines",
-                            line=dict(color=op.tech.color, width=width_px),  # Трохи тонше за стіну
-                            hoverinfo="text",
-                            hovertext=f"{op.tech.category}: {op.tech.name}<br>{op.width}x{op.height}м",
-                            showlegend=False
-                        ))
-
-                        # Зсуваємо "курсор" на ширину вікна
-                        current_dist += op.width
-
-                # В. Невидимий Хідбокс стіни (для кліку)
-                # (Без змін, як було раніше)
-                fig.add_trace(go.Scatter(
-                    x=[wall.start_x, wall.end_x],
-                    y=[wall.start_y, wall.end_y],
-                    mode="lines",
-                    line=dict(color="rgba(0,0,0,0)", width=20),
-                    customdata=[[wall.id, "wall"], [wall.id, "wall"]],  # Дублюємо для двох точок
-                    hovertemplate=f"Стіна: {getattr(wall.base_material, 'name', 'Стіна')}<extra></extra>",
-                    showlegend=False
-                ))
-
-
-        fig.update_layout(
-            title="План будівлі",
-            uirevision='constant',
-            xaxis=dict(title="X", showgrid=True, zeroline=True, scaleanchor="y", scaleratio=1),
-            yaxis=dict(title="Y", showgrid=True, zeroline=True),
-            height=600,
-            hovermode="closest",
-            clickmode="event+select",
-            margin=dict(l=20, r=20, t=40, b=20),
-            showlegend=False
-        )
-
-        fig.update_traces(selectedpoints=None)
-
-        return fig
+    def get_building_plan(self, level: Optional[int] = None, mode: str = "auto",
+                          viewport: Optional[tuple] = None) -> go.Figure:
+        """
+        План будівлі; level — показати лише один поверх.
+        mode / viewport — режим рендерингу (SVG / WebGL) та видима область, див. build_plan_figure.
+        """
+        return build_plan_figure(self, level, mode, viewport)
+
+    def get_cached_building_plan(self, level: Optional[int] = None, mode: str = "auto",
+                                 viewport: Optional[tuple] = None) -> go.Figure:
+        """
+        План будівлі з кешу, прив'язаного до ревізії: без змін повертається та сама фігура,
+        після правок через методи Building перераховуються лише змінені стіни та кімнати.
+        Фігуру не можна змінювати — вона спільна між викликами.
+        """
+        key = (level, mode, viewport)
+        cache = self._plan_caches.pop(key, None)
+        if cache is None:
+            cache = PlanCache(level, mode, viewport)
+            # Кожна нова область перегляду — новий кеш; найдавніше використані викидаємо
+            while len(self._plan_caches) >= PLAN_CACHE_LIMIT:
+                del self._plan_caches[next(iter(self._plan_caches))]
+        self._plan_caches[key] = cache  # в кінець: нещодавно використаний
+        return cache.get_figure(self)
+
+    def get_room_geometry(self, room: Room) -> Optional[RoomGeometry]:
+        """
+        Геометрія кімнати (центр, габарити, площа, об'єм, напрямки стін) з кешу.
+        Швидка перевірка — ревізія кімнати в журналі змін (її бампають правки кімнати та її стін),
+        годинник координат стін (geometry_clock), висота і список стін. Якщо якась стіна
+        рухалась на місці, запис перевіряється за відбитком: ревізії координат стін кімнати.
+        Повертає None, якщо у кімнати немає жодної наявної стіни.
+        """
+        room_revision = self._changes.room_revision(room.id)
+        clock = geometry_clock()
+        cached = self._room_geometry.get(room.id)
+        same_room = cached is not None and cached[2] == room.height and cached[3] == room.wall_ids
+        if same_room and cached[0] == room_revision and cached[1] == clock:
+            return cached[5]
+
+        walls = [self.walls.get(wid) for wid in room.wall_ids]
+        stamp = tuple((id(w), w.geometry_revision) if w is not None else None for w in walls)
+        if same_room and cached[4] == stamp:
+            # Змінилось щось інше — запис дійсний, оновлюємо швидку перевірку
+            self._room_geometry[room.id] = (room_revision, clock) + cached[2:]
+            return cached[5]
+
+        xs = []
+        ys = []
+        for wall in walls:
+            if wall:
+                xs.extend([wall.start_x, wall.end_x])
+                ys.extend([wall.start_y, wall.end_y])
+        if not xs:
+            self._room_geometry.pop(room.id, None)
+            return None
+
+        center = (sum(xs) / len(xs), sum(ys) / len(ys))
+        directions = {wid: self._direction_from_center(wall, *center)
+                      for wid, wall in zip(room.wall_ids, walls) if wall}
+        geometry = RoomGeometry(center, (min(xs), min(ys), max(xs), max(ys)), room.height, directions)
+        self._room_geometry[room.id] = (room_revision, clock, room.height, list(room.wall_ids), stamp, geometry)
+        return geometry
 
     def get_wall_direction(self, wall_id: str, room_id: str) -> str:
         """
@@ -213,10 +605,18 @@ class Building:
         wall = self.walls[wall_id]
         if room_id not in wall.room_ids:
             raise ValueError("Ця кімната не належить до стіни")
-        room = self.rooms[room_id]
-        cx, cy = room.get_center(self)
-        # ic(cx,cy)
-        # Вектор від початку стіни до її середини
+        geometry = self.get_room_geometry(self.rooms[room_id])
+        if geometry is None:
+            raise ValueError("Кімната не має валідних стін")
+        direction = geometry.wall_directions.get(wall_id)
+        if direction is None:
+            # Стіна посилається на кімнату, але не входить до її списку стін
+            direction = self._direction_from_center(wall, *geometry.center)
+        return direction
+
+    @staticmethod
+    def _direction_from_center(wall: Wall, cx: float, cy: float) -> str:
+        # Вектор від центру кімнати до середини стіни
         mid_x = (wall.start_x + wall.end_x) / 2
         mid_y = (wall.start_y + wall.end_y) / 2
 
@@ -258,11 +658,17 @@ class Building:
 
     def find_wall_with_geometry(self, other_wall: Wall) -> Optional[Wall]:
         """
-        Шукає стіну з точно такими ж координатами (в будь-якому напрямку)
+        Шукає стіну з точно такими ж координатами (в будь-якому напрямку).
+        O(1): пошук за канонічним ключем кінців стіни.
         """
-        for wall in self.walls.values():
-            if wall.is_equeal_wall(other_wall):
-                return wall
+        return self.find_wall_by_geometry_key(other_wall.geometry_key)
+
+    def find_wall_by_geometry_key(self, geometry_key: tuple) -> Optional[Wall]:
+        """Перша додана стіна з ключем геометрії segment_key(...) або None."""
+        self._ensure_indexes()
+        same_geometry = self._geometry_index.get(geometry_key)
+        if same_geometry:
+            return self.walls[same_geometry[0]]
         return None
 
     def calculate_room_dimensions(self, room_id: str) -> tuple[float, float]:
@@ -273,38 +679,63 @@ class Building:
         if room_id not in self.rooms:
             return 0.0, 0.0
 
-        room = self.rooms[room_id]
-
-        # Збираємо всі координати точок, що належать цій кімнаті
-        x_coords = []
-        y_coords = []
-
-        for wid in room.wall_ids:
-            if wid in self.walls:
-                wall = self.walls[wid]
-                x_coords.extend([wall.start_x, wall.end_x])
-                y_coords.extend([wall.start_y, wall.end_y])
-
-        if not x_coords or not y_coords:
+        geometry = self.get_room_geometry(self.rooms[room_id])
+        if geometry is None:
             return 0.0, 0.0
 
-        # Ширина = різниця між крайніми точками по X
-        # Довжина = різниця між крайніми точками по Y
-        current_width = max(x_coords) - min(x_coords)
-        current_length = max(y_coords) - min(y_coords)
-
-        return current_width, current_length
+        # Ширина / довжина = різниця між крайніми точками по X / Y
+        return geometry.width, geometry.length
 
     def check_if_walls_intersection_right(self, wall_to_check: Wall) -> bool:
         """
-        Перевіряє надану стіну на правильність перетину з усіма існуючими
+        Перевіряє надану стіну на правильність перетину з усіма існуючими.
+        Стіни, чиї габарити не перетинаються з новою, перетнутись не можуть,
+        тому перевіряються лише кандидати з просторового індексу.
+        """
+        self._ensure_indexes()
+        grid = self._wall_grids.get(wall_to_check.level)
+        if grid is None:
+            return True
+        candidates = grid.query(wall_to_check.start_x, wall_to_check.start_y,
+                                wall_to_check.end_x, wall_to_check.end_y)
+        if not candidates:
+            return True
+        others = [self.walls[key].segment for key in candidates]
+        return bool(segments_intersect_properly(wall_to_check.segment, others).all())
+
+    def validate(self) -> ValidationReport:
+        """
+        Перевіряє топологію всієї будівлі за один прохід (наприклад, після імпорту файлу):
+        неправильні перетини стін, дублікати стін, посилання кімнат на відсутні стіни
+        та стіни з більш ніж двома кімнатами.
         """
-        for wall in self.walls.values():
-            if not walls_intersect_properly(wall, wall_to_check):
-                return False
-        return True
+        report = ValidationReport()
+
+        # Стіни різних поверхів не перетинаються — перевіряємо кожен поверх окремо.
+        # Масиви збираються заново: перевірка має бачити і зміни, зроблені в обхід методів
+        arrays = build_arrays(self)
+        for level in np.unique(arrays.levels):
+            indices = np.flatnonzero(arrays.levels == level)
+            for i, j in find_improper_pairs(arrays.segments[indices]):
+                report.improper_intersections.append((arrays.wall_ids[indices[i]], arrays.wall_ids[indices[j]]))
+
+        self._ensure_indexes()
+        report.duplicate_walls = [list(group) for group in self._geometry_index.values() if len(group) > 1]
+
+        for room_id, room in self.rooms.items():
+            for wall_id in room.wall_ids:
+                if wall_id not in self.walls:
+                    report.orphan_wall_ids.append((room_id, wall_id))
+
+        for slab_id, slab in self.slabs.items():
+            if slab.lower_room_id not in self.rooms or slab.upper_room_id not in self.rooms:
+                report.orphan_slab_ids.append(slab_id)
+
+        report.overfull_walls = [key for key, wall in self.walls.items() if len(wall.room_ids) > 2]
+        return report
 
     def add_room_to_wall(self, wall_id: str, depth: float, name: str = "Нова кімната"):
+        self._check_mutable()
         existing_wall = self.walls[wall_id]
         if len(existing_wall.room_ids) == 2:
             raise ValueError("Стіна вже має дві кімнати!")
@@ -398,10 +829,11 @@ class Building:
             case _:
                 raise ValueError(f"Неправильний тип напрямку стіни: '{direction}'")
         # створюю стіни
-        owall = Wall(ox_start, oy_start, ox_end, oy_end, height, material)
-        p1wall = Wall(px1_start, py1_start, px1_end, py1_end, height, material)
-        p2wall = Wall(px2_start, py2_start, px2_end, py2_end, height, material)
-        room_ = Room(name, abs(width), abs(length), height, 0, 0, wall_ids=[])
+        level = existing_wall.level
+        owall = Wall(ox_start, oy_start, ox_end, oy_end, height, material, level=level)
+        p1wall = Wall(px1_start, py1_start, px1_end, py1_end, height, material, level=level)
+        p2wall = Wall(px2_start, py2_start, px2_end, py2_end, height, material, level=level)
+        room_ = Room(name, abs(width), abs(length), height, 0, 0, wall_ids=[], level=level)
         check_walls = [owall, p1wall, p2wall]
         # в циклі ми зберігаємо стіни окремо,
         # а додамо їх до кімнати і будинку тільки якщо всі вони правильні
@@ -421,7 +853,10 @@ class Building:
                     "Неможливо створити кімнату: обрані параметри не відповідають вимогам!"
                 )
         # тепер коли отримали правильні стіни, зберігаємо їх
-        for wall in right_walls:
+        new_walls = [wall for wall in right_walls if wall.id not in self.walls]
+        # Наявні стіни змінюються — беремо їх власні (не спільні зі знімком) версії
+        linked_walls = [self.mutable_wall(wall.id) for wall in right_walls if wall.id in self.walls]
+        for wall in new_walls + linked_walls:
             # додаємо айді кімнати
             wall.add_room_id(room_.id)
             # зберігаємо в будівлю стіну
@@ -429,6 +864,7 @@ class Building:
 
         room_.wall_ids = [wall.id for wall in right_walls]
         self.rooms[room_.id] = room_
+        self._record_room_added(f"Прибудувати кімнату {name}", room_, new_walls, linked_walls)
         return room_
 
     def delete_room(self, room_id: str):
@@ -437,27 +873,68 @@ class Building:
         Якщо стіна належала тільки цій кімнаті — вона видаляється.
         Якщо стіна була спільною — вона залишається, але перестає бути внутрішньою.
         """
+        self._check_mutable()
         if room_id not in self.rooms:
             raise ValueError(f"Кімната {room_id} не знайдена")
 
+        name = self.rooms[room_id].name
+        operation = Operation(f"Видалити кімнату {name}", self._delete_room(room_id), None)
+
+        def redo():
+            # Повтор видаляє актуальні (можливо, скопійовані для знімка) стіни —
+            # скасовувати треба саме його, а не перше видалення
+            operation.undo = self._delete_room(room_id)
+
+        operation.redo = redo
+        self._journal.record(operation)
+
+    def _delete_room(self, room_id: str) -> Callable[[], None]:
+        """Видалення кімнати без запису в журнал. Повертає функцію, що його скасовує."""
         room = self.rooms[room_id]
+        # Що саме змінено — для скасування
+        unlinked = []  # (id стіни, стіна, позиція id кімнати в room_ids)
+        removed_walls = []  # (id стіни, стіна)
+        removed_slabs = [(slab_id, self.slabs[slab_id]) for slab_id in self.get_room_slabs(room_id)]
 
         # Ітеруємося по копії списку стін, бо ми можемо видаляти їх з self.walls
         for wall_id in room.wall_ids:
             if wall_id in self.walls:
-                wall = self.walls[wall_id]
+                wall = self.mutable_wall(wall_id)
 
                 # Логіка видалення посилань
                 if room_id in wall.room_ids:
+                    unlinked.append((wall_id, wall, wall.room_ids.index(room_id)))
                     wall.room_ids.remove(room_id)
+                    self._sync_wall_rooms(wall_id)
 
                 # Перевірка: чи залишились у стіни прив'язані кімнати?
                 if len(wall.room_ids) == 0:
                     # Стіна "осиротіла" (була зовнішньою для цієї кімнати), видаляємо
+                    removed_walls.append((wall_id, wall))
                     del self.walls[wall_id]
                 #del self.walls[wall_id]
                 # Якщо len > 0 (наприклад, 1), стіна залишається,
                 # але тепер вона стане зовнішньою стіною для сусідньої кімнати
 
+        # Перекриття з кімнатами над / під нею теж зникають
+        for slab_id in list(self.get_room_slabs(room_id)):
+            del self.slabs[slab_id]
+
         # Нарешті видаляємо саму кімнату
         del self.rooms[room_id]
+        self._room_geometry.pop(room_id, None)
+
+        def undo():
+            for wall_id, wall in removed_walls:
+                self.walls[wall_id] = wall
+            for wall_id, _, position in reversed(unlinked):
+                wall = self.mutable_wall(wall_id)
+                # Ідемпотентно: кімната не може потрапити в room_ids двічі
+                if room_id not in wall.room_ids:
+                    wall.room_ids.insert(position, room_id)
+                self._sync_wall_rooms(wall_id)
+            self.rooms[room_id] = room
+            for slab_id, slab in removed_slabs:
+                self.slabs[slab_id] = slab
+
+        return undo
@@ -1,27 +1,80 @@
+import io
 import json
 import dataclasses
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, TextIO
+import numpy as np
 from building import Building
+from bulding_compounds.arrays import build_arrays
 from bulding_compounds.material import Material
-from bulding_compounds.opening import Opening, OpeningTech, OpeningCategory
+from bulding_compounds.opening import Opening
 from bulding_compounds.hvac import HVACDevice, HVACType
 from bulding_compounds.wall import Wall
 from bulding_compounds.room import Room
+from bulding_compounds.slab import Slab
+from bulding_compounds.registry import ComponentRegistry
 
 
 class BuildingSerializer:
     @staticmethod
-    def to_json(building: Building) -> str:
-        """Конвертує об'єкт Building у JSON-рядок."""
+    def to_dict(building: Building) -> Dict[str, Any]:
+        """Конвертує об'єкт Building у словник з простих типів (основа для JSON та хешування)."""
         # dataclasses.asdict рекурсивно перетворює все у словники
         # StrEnum (OpeningCategory, HVACType) автоматично стають рядками
-        return json.dumps(dataclasses.asdict(building), indent=2, ensure_ascii=False)
+        return dataclasses.asdict(building)
+
+    @staticmethod
+    def to_json(building: Building, compact: bool = False) -> str:
+        """Конвертує об'єкт Building у JSON-рядок."""
+        buffer = io.StringIO()
+        BuildingSerializer.dump(building, buffer, compact)
+        return buffer.getvalue()
+
+    @staticmethod
+    def dump(building: Building, fp: TextIO, compact: bool = False):
+        """
+        Потоково пише JSON будівлі у текстовий файловий об'єкт: кожна стіна / кімната
+        перетворюється і записується окремо, тож пам'ять — на один елемент, а не на всю будівлю.
+        Без compact результат такий самий, як json.dumps(to_dict(...), indent=2).
+        """
+        if compact:
+            separators, indent = (",", ":"), None
+        else:
+            separators, indent = (",", ": "), JSON_INDENT
+
+        def newline(depth: int) -> str:
+            return "" if compact else "\n" + " " * (JSON_INDENT * depth)
+
+        def encode(value, depth: int) -> str:
+            text = json.dumps(value, indent=indent, separators=separators, ensure_ascii=False)
+            # Рядки всередині JSON не містять переносів (вони екрануються), тож зсуваємо лише відступи
+            return text if compact else text.replace("\n", newline(depth))
+
+        key_sep = separators[1]
+        fp.write("{")
+        for i, f in enumerate(dataclasses.fields(building)):
+            fp.write(("," if i else "") + newline(1) + encode(f.name, 1) + key_sep)
+            items = getattr(building, f.name)
+            if not items:
+                fp.write("{}")
+                continue
+            fp.write("{")
+            for j, (key, obj) in enumerate(items.items()):
+                fp.write(("," if j else "") + newline(2) + encode(key, 2) + key_sep
+                         + encode(dataclasses.asdict(obj), 2))
+            fp.write(newline(1) + "}")
+        fp.write(newline(0) + "}")
 
     @staticmethod
-    def from_json(json_str: str) -> Building:
-        """Відтворює об'єкт Building з JSON-рядка."""
+    def from_json(json_str: str, registry: Optional[ComponentRegistry] = None) -> Building:
+        """
+        Відтворює об'єкт Building з JSON-рядка.
+        Однакові матеріали та технології отворів стають спільними об'єктами з registry
+        (за замовчуванням — новий реєстр з бібліотеками MATERIALS / OPENING_TYPES).
+        """
         data = json.loads(json_str)
         new_building = Building()
+        if registry is None:
+            registry = ComponentRegistry()
 
         # Відновлюємо стіни
         # Нам треба пройтися по словнику data['walls']
@@ -30,16 +83,13 @@ class BuildingSerializer:
         for w_id, w_info in walls_data.items():
             # А. Відновлюємо Матеріал
             mat_data = w_info['base_material']
-            material = Material(**mat_data)
+            material = registry.material(mat_data) if mat_data else None
 
             #  Відновлюємо Отвори
             openings = []
             for op_data in w_info.get('openings', []):
-                # Відновлюємо OpeningTech
-                tech_data = op_data['tech']
-                # Важливо: конвертуємо рядок категорії назад в Enum
-                tech_data['category'] = OpeningCategory(tech_data['category'])
-                tech = OpeningTech(**tech_data)
+                # Відновлюємо OpeningTech (спільний для однакових отворів)
+                tech = registry.tech(op_data['tech'])
 
                 # Створюємо Opening
                 # Видаляємо tech з op_data, щоб передати його об'єктом, а не словником
@@ -75,8 +125,165 @@ class BuildingSerializer:
             room = Room(hvac_devices=hvacs, **room_params)
             new_building.rooms[r_id] = room
 
+        # Відновлюємо перекриття (у старих файлах їх немає)
+        for s_id, s_info in data.get('slabs', {}).items():
+            mat_data = s_info.get('material')
+            slab_params = {k: v for k, v in s_info.items() if k != 'material'}
+            new_building.slabs[s_id] = Slab(material=registry.material(mat_data) if mat_data else None, **slab_params)
+
         return new_building
 
+    @staticmethod
+    def to_binary(building: Building, compress: bool = True) -> bytes:
+        """
+        Компактний бінарний формат (.npz): геометрія — числові масиви, матеріали та технології
+        отворів — спільні таблиці, на які стіни / отвори посилаються індексами.
+        """
+        arrays = build_arrays(building)
+        walls = list(building.walls.values())
+        rooms = list(building.rooms.values())
+        tech_slots: Dict[int, int] = {}
+        techs: List[Any] = []
+
+        op_wall, op_tech, op_size, op_ids = [], [], [], []
+        for i, wall in enumerate(walls):
+            for op in wall.openings:
+                slot = tech_slots.get(id(op.tech))
+                if slot is None:
+                    slot = tech_slots[id(op.tech)] = len(techs)
+                    techs.append(op.tech)
+                op_wall.append(i)
+                op_tech.append(slot)
+                op_size.append((op.width, op.height))
+                op_ids.append(op.id)
+
+        # Матеріали перекриттів, яких немає серед стін, додаються в кінець тієї ж таблиці
+        materials = arrays.materials + _extra_slab_materials(arrays.materials, building.slabs.values())
+        material_slots = {id(m): i for i, m in enumerate(materials)}
+
+        # Невеликі таблиці з різнорідними полями — JSON усередині архіву
+        meta = {
+            "format": BINARY_FORMAT,
+            "version": BINARY_FORMAT_VERSION,
+            "materials": [_material_record(m) for m in materials],
+            "techs": [dataclasses.asdict(t) for t in techs],
+            "hvac": {i: [dataclasses.asdict(d) for d in room.hvac_devices]
+                     for i, room in enumerate(rooms) if room.hvac_devices},
+            "slabs": [dict(_slab_record(slab), material=material_slots.get(id(slab.material)))
+                      for slab in building.slabs.values()],
+        }
+
+        wall_room_ptr, wall_room_ids = _pack_lists([w.room_ids for w in walls])
+        room_wall_ptr, room_wall_ids = _pack_lists([r.wall_ids for r in rooms])
+        data = dict(
+            meta=np.frombuffer(json.dumps(meta, ensure_ascii=False).encode("utf-8"), dtype=np.uint8),
+            wall_ids=np.array(arrays.wall_ids, dtype=str),
+            wall_segments=arrays.segments,
+            wall_heights=arrays.heights,
+            wall_levels=arrays.levels,
+            wall_materials=arrays.material_index,
+            wall_room_ptr=wall_room_ptr,
+            wall_room_ids=wall_room_ids,
+            opening_wall=np.array(op_wall, dtype=np.int32),
+            opening_tech=np.array(op_tech, dtype=np.int32),
+            opening_size=np.array(op_size, dtype=float).reshape(-1, 2),
+            opening_ids=np.array(op_ids, dtype=str),
+            room_ids=np.array([r.id for r in rooms], dtype=str),
+            room_names=np.array([r.name for r in rooms], dtype=str),
+            # width, length, height, x, y
+            room_dims=np.array([(r.width, r.length, r.height, r.x, r.y) for r in rooms], dtype=float).reshape(-1, 5),
+            room_levels=np.array([r.level for r in rooms], dtype=np.int32),
+            room_wall_ptr=room_wall_ptr,
+            room_wall_ids=room_wall_ids,
+        )
+        buffer = io.BytesIO()
+        (np.savez_compressed if compress else np.savez)(buffer, **data)
+        return buffer.getvalue()
+
+    @staticmethod
+    def from_binary(data: bytes, registry: Optional[ComponentRegistry] = None) -> Building:
+        """Відтворює Building з результату to_binary (без pickle)."""
+        if registry is None:
+            registry = ComponentRegistry()
+        with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+            arrays = {name: archive[name] for name in archive.files}
+        meta = json.loads(arrays["meta"].tobytes().decode("utf-8"))
+        if meta.get("format") != BINARY_FORMAT or meta.get("version") != BINARY_FORMAT_VERSION:
+            raise ValueError("Невідомий формат файлу проєкту")
+
+        materials = [registry.material(m) for m in meta["materials"]]
+        techs = [registry.tech(t) for t in meta["techs"]]
+
+        openings: Dict[int, List[Opening]] = {}
+        for wall_i, tech_i, (width, height), op_id in zip(
+                arrays["opening_wall"].tolist(), arrays["opening_tech"].tolist(),
+                arrays["opening_size"].tolist(), arrays["opening_ids"].tolist()):
+            openings.setdefault(wall_i, []).append(Opening(techs[tech_i], width, height, op_id))
+
+        wall_rooms = _unpack_lists(arrays["wall_room_ptr"], arrays["wall_room_ids"])
+        walls = {}
+        for i, (wid, (x1, y1, x2, y2), height, level, material_i) in enumerate(zip(
+                arrays["wall_ids"].tolist(), arrays["wall_segments"].tolist(), arrays["wall_heights"].tolist(),
+                arrays["wall_levels"].tolist(), arrays["wall_materials"].tolist())):
+            walls[wid] = Wall(x1, y1, x2, y2, height, materials[material_i] if material_i >= 0 else None,
+                              openings.get(i, []), wall_rooms[i], wid, level)
+
+        hvac = meta["hvac"]
+        room_walls = _unpack_lists(arrays["room_wall_ptr"], arrays["room_wall_ids"])
+        rooms = {}
+        for i, (rid, name, (width, length, height, x, y), level) in enumerate(zip(
+                arrays["room_ids"].tolist(), arrays["room_names"].tolist(),
+                arrays["room_dims"].tolist(), arrays["room_levels"].tolist())):
+            devices = [HVACDevice(**dict(d, device_type=HVACType(d["device_type"]))) for d in hvac.get(str(i), [])]
+            rooms[rid] = Room(name, width, length, height, x, y, room_walls[i], devices, rid, level)
+
+        slabs = {}
+        for s_info in meta["slabs"]:
+            material_i = s_info.pop("material")
+            slabs[s_info["id"]] = Slab(material=materials[material_i] if material_i is not None else None, **s_info)
+        # Словники присвоюються цілком — індекси будуються один раз при першому зверненні
+        return Building(walls=walls, rooms=rooms, slabs=slabs)
+
+
+# Відступ JSON (як у попередньому json.dumps(..., indent=2))
+JSON_INDENT = 2
+# Ідентифікатор і версія бінарного формату (зберігаються в meta)
+BINARY_FORMAT = "building-npz"
+BINARY_FORMAT_VERSION = 1
+
+
+def _pack_lists(lists: List[List[str]]):
+    """Списки рядків -> (indptr, плоский масив), як у CSR."""
+    indptr = np.zeros(len(lists) + 1, dtype=np.int64)
+    np.cumsum([len(items) for items in lists], out=indptr[1:])
+    flat = np.array([item for items in lists for item in items], dtype=str)
+    return indptr, flat
+
+
+def _unpack_lists(indptr: np.ndarray, flat: np.ndarray) -> List[List[str]]:
+    flat = flat.tolist()
+    bounds = indptr.tolist()
+    return [flat[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+
+
+def _extra_slab_materials(materials: List[Material], slabs) -> List[Material]:
+    known = {id(m) for m in materials}
+    extra = []
+    for slab in slabs:
+        if slab.material is not None and id(slab.material) not in known:
+            known.add(id(slab.material))
+            extra.append(slab.material)
+    return extra
+
+
+def _material_record(material: Material) -> dict:
+    return {f.name: getattr(material, f.name) for f in dataclasses.fields(material)}
+
+
+def _slab_record(slab: Slab) -> dict:
+    # Матеріал перекриття зберігається індексом у таблиці матеріалів
+    return {f.name: getattr(slab, f.name) for f in dataclasses.fields(slab) if f.name != "material"}
+
 
 if __name__ == '__main__':
     from bulding_compounds.material import MATERIALS
@@ -0,0 +1,106 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Індекс "сусіда" у CSR для зовнішньої стіни (або кімнати, якої нема в будівлі)
+EXTERIOR = -1
+
+
+@dataclass
+class AdjacencyCSR:
+    """
+    Граф суміжності кімнат у форматі CSR.
+    Для кімнати room_ids[i] її стіни — wall_ids[indptr[i]:indptr[i + 1]],
+    а сусіди через ці стіни — neighbours[indptr[i]:indptr[i + 1]] (індекси в room_ids або EXTERIOR).
+    """
+    room_ids: List[str]
+    indptr: np.ndarray
+    neighbours: np.ndarray
+    wall_ids: List[str]
+
+    def row(self, room_index: int) -> Tuple[List[str], np.ndarray]:
+        start, stop = self.indptr[room_index], self.indptr[room_index + 1]
+        return self.wall_ids[start:stop], self.neighbours[start:stop]
+
+
+class RoomAdjacency:
+    """
+    Суміжність кімнат через стіни: кімната -> {id стіни: id сусідньої кімнати або None}.
+    Будується з wall.room_ids і оновлюється інкрементально при вставці/видаленні стін,
+    тож симуляції та рендеру не треба щоразу розбирати room_ids усіх стін.
+    """
+
+    def __init__(self):
+        self._wall_rooms: Dict[str, Tuple[str, ...]] = {}
+        self._room_walls: Dict[str, Dict[str, Optional[str]]] = {}
+        self.version = 0  # збільшується при кожній зміні — для кешування CSR
+
+    def __len__(self) -> int:
+        return len(self._wall_rooms)
+
+    def __contains__(self, wall_id: str) -> bool:
+        return wall_id in self._wall_rooms
+
+    def insert(self, wall_id: str, room_ids: Sequence[str]):
+        room_ids = tuple(room_ids)
+        # Повторна вставка оновлює записи на місці, щоб порядок стін кімнати не змінювався
+        for room_id in self._wall_rooms.get(wall_id, ()):
+            if room_id not in room_ids:
+                self._drop(room_id, wall_id)
+        self._wall_rooms[wall_id] = room_ids
+        for room_id in room_ids:
+            neighbour = None
+            # Сусід є лише у внутрішньої стіни (рівно дві кімнати)
+            if len(room_ids) == 2:
+                neighbour = room_ids[0] if room_ids[1] == room_id else room_ids[1]
+            self._room_walls.setdefault(room_id, {})[wall_id] = neighbour
+        self.version += 1
+
+    def remove(self, wall_id: str):
+        room_ids = self._wall_rooms.pop(wall_id, None)
+        if room_ids is None:
+            return
+        for room_id in room_ids:
+            self._drop(room_id, wall_id)
+        self.version += 1
+
+    def _drop(self, room_id: str, wall_id: str):
+        walls = self._room_walls.get(room_id)
+        if walls is not None:
+            walls.pop(wall_id, None)
+            if not walls:
+                del self._room_walls[room_id]
+
+    def clear(self):
+        self._wall_rooms.clear()
+        self._room_walls.clear()
+        self.version += 1
+
+    def walls_of(self, room_id: str) -> Dict[str, Optional[str]]:
+        """{id стіни: id сусіда або None для зовнішньої}. Не змінювати — це внутрішній словник."""
+        return self._room_walls.get(room_id, {})
+
+    def rooms_of(self, wall_id: str) -> Tuple[str, ...]:
+        return self._wall_rooms.get(wall_id, ())
+
+    def neighbours(self, room_id: str) -> List[str]:
+        """Унікальні сусідні кімнати у порядку появи стін."""
+        return list(dict.fromkeys(n for n in self.walls_of(room_id).values() if n is not None))
+
+    def exterior_walls(self, room_id: str) -> List[str]:
+        return [wid for wid, neighbour in self.walls_of(room_id).items() if neighbour is None]
+
+    def is_exterior(self, wall_id: str) -> bool:
+        return len(self._wall_rooms.get(wall_id, ())) == 1
+
+    def to_csr(self, room_order: Sequence[str]) -> AdjacencyCSR:
+        room_index = {rid: i for i, rid in enumerate(room_order)}
+        indptr = np.zeros(len(room_order) + 1, dtype=np.intp)
+        wall_ids: List[str] = []
+        neighbours: List[int] = []
+        for i, rid in enumerate(room_order):
+            for wid, neighbour in self.walls_of(rid).items():
+                wall_ids.append(wid)
+                neighbours.append(room_index.get(neighbour, EXTERIOR) if neighbour is not None else EXTERIOR)
+            indptr[i + 1] = len(wall_ids)
+        return AdjacencyCSR(list(room_order), indptr, np.array(neighbours, dtype=np.intp), wall_ids)
@@ -0,0 +1,93 @@
+from dataclasses import dataclass
+from typing import Dict, List
+import numpy as np
+from bulding_compounds.adjacency import EXTERIOR
+from bulding_compounds.material import Material
+
+
+@dataclass
+class BuildingArrays:
+    """
+    Будівля у вигляді "структури масивів" для векторних розрахунків.
+    i-та стіна: wall_ids[i], кінці segments[i] (x1, y1, x2, y2), висота heights[i],
+    поверх levels[i], матеріал materials[material_index[i]] (-1 — без матеріалу),
+    кімнати room_ids[wall_rooms[i, 0]] / room_ids[wall_rooms[i, 1]] (EXTERIOR — немає).
+    wall_numbers / room_numbers — сталі номери з building.wall_numbers / room_numbers
+    для розкладання результатів у масиви довжини capacity.
+    Це знімок: після змін будівлі треба отримати новий (Building.get_arrays).
+    """
+    wall_ids: List[str]
+    segments: np.ndarray  # N x 4, float64
+    heights: np.ndarray  # N, float64
+    levels: np.ndarray  # N, int32
+    material_index: np.ndarray  # N, int32
+    wall_rooms: np.ndarray  # N x 2, int32
+    materials: List[Material]
+    room_ids: List[str]
+    wall_numbers: np.ndarray  # N, int32
+    room_numbers: np.ndarray  # len(room_ids), int32
+
+    def __len__(self) -> int:
+        return len(self.wall_ids)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.hypot(self.segments[:, 2] - self.segments[:, 0], self.segments[:, 3] - self.segments[:, 1])
+
+    @property
+    def areas_gross(self) -> np.ndarray:
+        return self.lengths * self.heights
+
+    @property
+    def material_u(self) -> np.ndarray:
+        """U матеріалу кожної стіни (0 — без матеріалу)."""
+        u_values = np.array([m.U for m in self.materials] + [0.0], dtype=float)
+        # Індекс -1 потрапляє на останній елемент — 0.0
+        return u_values[self.material_index]
+
+    @property
+    def is_exterior(self) -> np.ndarray:
+        """Стіни рівно з однією кімнатою."""
+        has_room = self.wall_rooms != EXTERIOR
+        return has_room.sum(axis=1) == 1
+
+    def wall_index(self) -> Dict[str, int]:
+        return {wid: i for i, wid in enumerate(self.wall_ids)}
+
+
+def build_arrays(building) -> BuildingArrays:
+    """Збирає BuildingArrays з поточних стін і кімнат (один прохід)."""
+    walls = building.walls
+    n = len(walls)
+    room_ids = list(building.rooms)
+    room_index = {rid: i for i, rid in enumerate(room_ids)}
+
+    segments = np.empty((n, 4), dtype=float)
+    heights = np.empty(n, dtype=float)
+    levels = np.empty(n, dtype=np.int32)
+    material_index = np.empty(n, dtype=np.int32)
+    wall_rooms = np.full((n, 2), EXTERIOR, dtype=np.int32)
+    materials: List[Material] = []
+    # id(матеріалу) -> індекс: спільний матеріал зберігається один раз
+    material_slots: Dict[int, int] = {}
+
+    for i, wall in enumerate(walls.values()):
+        segments[i] = wall.start_x, wall.start_y, wall.end_x, wall.end_y
+        heights[i] = wall.height
+        levels[i] = wall.level
+        material = wall.base_material
+        if material is None:
+            material_index[i] = -1
+        else:
+            slot = material_slots.get(id(material))
+            if slot is None:
+                slot = material_slots[id(material)] = len(materials)
+                materials.append(material)
+            material_index[i] = slot
+        # Стіна з більш ніж двома кімнатами — помилка топології, у масиві лише перші дві
+        for j, rid in enumerate(wall.room_ids[:2]):
+            wall_rooms[i, j] = room_index.get(rid, EXTERIOR)
+
+    return BuildingArrays(list(walls), segments, heights, levels, material_index, wall_rooms,
+                          materials, room_ids, building.wall_numbers.numbers(walls),
+                          building.room_numbers.numbers(room_ids))
@@ -0,0 +1,58 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Скільки останніх змін пам'ятати для інкрементального оновлення (план, кеші)
+DEFAULT_CHANGE_LOG_DEPTH = 10_000
+
+
+class ChangeLog:
+    """
+    Лічильник ревізій будівлі з журналом змінених стін і кімнат.
+    Кожна зміна збільшує revision на 1; споживач (наприклад, кеш плану) запам'ятовує ревізію
+    і потім питає changes_since — які саме елементи змінились відтоді.
+    room_revision — ревізія останньої зміни окремої кімнати (або її стін).
+    """
+
+    def __init__(self, depth: int = DEFAULT_CHANGE_LOG_DEPTH):
+        if depth <= 0:
+            raise ValueError(f"Change log depth must be > 0. Got: {depth}")
+        self.depth = depth
+        self.revision = 0
+        self._base = 0  # ревізія, з якої починаються збережені записи
+        self._entries: List[Tuple[Tuple[str, ...], Tuple[str, ...]]] = []
+        self._room_revisions: Dict[str, int] = {}
+
+    def record(self, wall_ids: Iterable[str] = (), room_ids: Iterable[str] = ()):
+        room_ids = tuple(room_ids)
+        self._entries.append((tuple(wall_ids), room_ids))
+        self.revision += 1
+        for room_id in room_ids:
+            self._room_revisions[room_id] = self.revision
+        if len(self._entries) > self.depth:
+            dropped = len(self._entries) - self.depth
+            del self._entries[:dropped]
+            self._base += dropped
+
+    def reset(self):
+        """Зміна, яку не можна описати поелементно (наприклад, заміна словника стін цілком)."""
+        self._entries.clear()
+        self._room_revisions.clear()
+        self.revision += 1
+        self._base = self.revision
+
+    def room_revision(self, room_id: str) -> int:
+        """Ревізія, на якій кімнату (чи одну з її стін) востаннє змінено."""
+        return self._room_revisions.get(room_id, self._base)
+
+    def changes_since(self, revision: Optional[int]) -> Optional[Tuple[Set[str], Set[str]]]:
+        """
+        (id стін, id кімнат), змінені після revision,
+        або None, якщо історії недостатньо і треба все перебудувати.
+        """
+        if revision is None or revision < self._base or revision > self.revision:
+            return None
+        wall_ids: Set[str] = set()
+        room_ids: Set[str] = set()
+        for walls, rooms in self._entries[revision - self._base:]:
+            wall_ids.update(walls)
+            room_ids.update(rooms)
+        return wall_ids, room_ids
@@ -1,2 +1,7 @@
 class RoomOverlapError(Exception):
     pass
+
+
+class FrozenBuildingError(Exception):
+    """Спроба змінити знімок будівлі (Building.snapshot())."""
+    pass
@@ -0,0 +1,72 @@
+import heapq
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+
+
+class IdIndex:
+    """
+    Щільні цілі номери для рядкових id (стін або кімнат).
+    Номер не змінюється, поки елемент є в будівлі; номери видалених елементів
+    використовуються повторно (спершу найменші), тож номери лишаються в межах capacity.
+    Векторні розрахунки можуть тримати стан у масивах довжини capacity замість dict за id.
+    """
+
+    def __init__(self, ids: Iterable[str] = ()):
+        self._numbers: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []  # номер -> id (None — вільний номер)
+        self._free: List[int] = []  # купа вільних номерів
+        for id_ in ids:
+            self.add(id_)
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def __contains__(self, id_: str) -> bool:
+        return id_ in self._numbers
+
+    @property
+    def capacity(self) -> int:
+        """Довжина масиву, що вміщує всі номери (разом з вільними)."""
+        return len(self._ids)
+
+    def add(self, id_: str) -> int:
+        number = self._numbers.get(id_)
+        if number is not None:
+            return number
+        if self._free:
+            number = heapq.heappop(self._free)
+            self._ids[number] = id_
+        else:
+            number = len(self._ids)
+            self._ids.append(id_)
+        self._numbers[id_] = number
+        return number
+
+    def remove(self, id_: str):
+        number = self._numbers.pop(id_, None)
+        if number is not None:
+            self._ids[number] = None
+            heapq.heappush(self._free, number)
+
+    def number(self, id_: str) -> int:
+        """Номер елемента; KeyError, якщо такого id немає."""
+        return self._numbers[id_]
+
+    def id_at(self, number: int) -> Optional[str]:
+        """id за номером або None для вільного номера."""
+        return self._ids[number]
+
+    def numbers(self, ids: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self._numbers[id_] for id_ in ids), dtype=np.int32)
+
+    @property
+    def ids(self) -> List[Optional[str]]:
+        """Таблиця номер -> id (копія, None на місці вільних номерів)."""
+        return list(self._ids)
+
+    def copy(self) -> "IdIndex":
+        clone = IdIndex()
+        clone._numbers = dict(self._numbers)
+        clone._ids = list(self._ids)
+        clone._free = list(self._free)
+        return clone
@@ -0,0 +1,67 @@
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+# Скільки останніх операцій зберігати для скасування
+DEFAULT_JOURNAL_DEPTH = 100
+
+
+@dataclass
+class Operation:
+    """
+    Одна зворотна операція над будівлею.
+    undo / redo тримають лише посилання на змінені об'єкти, а не копії будівлі,
+    тож пам'ять історії пропорційна правкам, а не розміру плану.
+    """
+    name: str
+    undo: Callable[[], None]
+    redo: Callable[[], None]
+
+
+class EditJournal:
+    """Журнал правок з підтримкою скасування (undo) та повтору (redo)."""
+
+    def __init__(self, depth: int = DEFAULT_JOURNAL_DEPTH):
+        if depth <= 0:
+            raise ValueError(f"Journal depth must be > 0. Got: {depth}")
+        self.depth = depth
+        self._undo: List[Operation] = []
+        self._redo: List[Operation] = []
+
+    def __len__(self) -> int:
+        return len(self._undo)
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def record(self, operation: Operation):
+        """Записує вже виконану операцію. Нова правка скидає гілку redo."""
+        self._undo.append(operation)
+        if len(self._undo) > self.depth:
+            del self._undo[0]
+        self._redo.clear()
+
+    def undo(self) -> Optional[str]:
+        """Скасовує останню операцію. Повертає її назву або None, якщо скасовувати нічого."""
+        if not self._undo:
+            return None
+        operation = self._undo.pop()
+        operation.undo()
+        self._redo.append(operation)
+        return operation.name
+
+    def redo(self) -> Optional[str]:
+        if not self._redo:
+            return None
+        operation = self._redo.pop()
+        operation.redo()
+        self._undo.append(operation)
+        return operation.name
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
@@ -1,14 +1,24 @@
 from dataclasses import dataclass, field
 from typing import Optional, List, Dict
 import uuid
+from bulding_compounds.slotted import CacheSlots
 
 # Матеріал
 import uuid
 from dataclasses import dataclass, field
 
+# Поля, від яких залежить U
+U_FIELDS = frozenset(("thickness", "conductivity"))
+# Поля, від яких залежить теплоємність 1 м²
+THERMAL_MASS_FIELDS = frozenset(("thickness", "density", "specific_heat"))
 
-@dataclass
-class Material:
+
+class _MaterialCaches(CacheSlots):
+    __slots__ = ("_U", "_thermal_mass")
+
+
+@dataclass(slots=True)
+class Material(_MaterialCaches):
     name: str = "Default material"
     thickness: float = 1.0  # м
     conductivity: float = 1.0  # Вт/(м·К)
@@ -17,6 +27,13 @@ class Material:
     color: str = "#888888"
     id: str = field(default_factory=lambda: str(uuid.uuid4())[:8])
 
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name in U_FIELDS:
+            self._drop("_U")
+        if name in THERMAL_MASS_FIELDS:
+            self._drop("_thermal_mass")
+
     def __post_init__(self):
         """Перевірка фізичних параметрів на адекватність."""
         if not self.name:
@@ -40,16 +57,23 @@ class Material:
         R = thickness / conductivity
         U = 1 / (R + 0.17)
         """
-        # Тут ділення на 0 вже неможливе завдяки post_init
-        r_value = self.thickness / self.conductivity
-        return round(1 / (r_value + 0.17), 3)
+        # Кешується до зміни thickness / conductivity
+        u_value = self._cached("_U")
+        if u_value is None:
+            # Тут ділення на 0 вже неможливе завдяки post_init
+            r_value = self.thickness / self.conductivity
+            u_value = self._store("_U", round(1 / (r_value + 0.17), 3))
+        return u_value
 
     @property
     def thermal_mass(self) -> float:
         """
-        Теплоємність 1 м² стіни (Дж/К).
+        Теплоємність 1 м² стіни (Дж/К). Кешується, як і U.
         """
-        return self.density * self.thickness * self.specific_heat
+        thermal_mass = self._cached("_thermal_mass")
+        if thermal_mass is None:
+            thermal_mass = self._store("_thermal_mass", self.density * self.thickness * self.specific_heat)
+        return thermal_mass
 
 
 MATERIALS = {
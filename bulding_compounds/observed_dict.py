@@ -0,0 +1,69 @@
+from typing import Any, Callable, Optional
+
+# Маркер "ключа не було" (None може бути валідним значенням)
+MISSING = object()
+
+
+class ObservedDict(dict):
+    """
+    Звичайний dict, який повідомляє власника про вставку та видалення елементів.
+    Building використовує його для walls / rooms, щоб індекси оновлювались
+    навіть при прямому записі building.walls[wid] = wall.
+    """
+    __slots__ = ("_on_set", "_on_delete")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._on_set: Optional[Callable[[Any, Any, Any], None]] = None
+        self._on_delete: Optional[Callable[[Any, Any], None]] = None
+
+    def bind(self, on_set: Callable[[Any, Any, Any], None], on_delete: Callable[[Any, Any], None]):
+        """on_set(key, old_value | MISSING, new_value), on_delete(key, old_value)"""
+        self._on_set = on_set
+        self._on_delete = on_delete
+
+    def __setitem__(self, key, value):
+        old = dict.get(self, key, MISSING)
+        super().__setitem__(key, value)
+        if self._on_set is not None:
+            self._on_set(key, old, value)
+
+    def __delitem__(self, key):
+        old = self[key]
+        super().__delitem__(key)
+        if self._on_delete is not None:
+            self._on_delete(key, old)
+
+    def pop(self, key, *default):
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        value = self[key]
+        del self[key]
+        return value
+
+    def popitem(self):
+        key = next(reversed(self))
+        return key, self.pop(key)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        for key in list(self):
+            del self[key]
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __reduce__(self):
+        # Копії та pickle — звичайні dict: підписки належать лише власнику
+        return dict, (dict(self),)
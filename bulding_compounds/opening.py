@@ -1,15 +1,31 @@
+import itertools
 import uuid
 from dataclasses import dataclass, field
 from enum import StrEnum
 from typing import List, Dict
 
+# Лічильник змін отворів і технологій (як geometry_clock у стін):
+# не змінився — жоден отвір чи технологію не редагували на місці
+_changes = itertools.count(1)
+_last_change = 0
+
+
+def _touch():
+    global _last_change
+    _last_change = next(_changes)
+
+
+def openings_clock() -> int:
+    """Остання зміна будь-якого Opening / OpeningTech (включно зі створенням)."""
+    return _last_change
+
 
 class OpeningCategory(StrEnum):
     WINDOW = "Вікно"
     DOOR = "Двері"
 
 
-@dataclass
+@dataclass(slots=True)
 class OpeningTech:
     """
     Технологія виготовлення отвору.
@@ -20,6 +36,10 @@ class OpeningTech:
     category: OpeningCategory = OpeningCategory.WINDOW
     color: str = "#A0C4FF"
 
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        _touch()
+
     def __post_init__(self):
         if self.U < 0:
             raise ValueError(f"U-value cannot be negative. Got: {self.U}")
@@ -29,7 +49,7 @@ class OpeningTech:
             raise ValueError("Name cannot be empty")
 
 
-@dataclass
+@dataclass(slots=True)
 class Opening:
     """
     Конкретний екземпляр отвору.
@@ -39,6 +59,10 @@ class Opening:
     height: float = 1.0
     id: str = field(default_factory=lambda: str(uuid.uuid4())[:8])
 
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        _touch()
+
     def __post_init__(self):
         # Валідація розмірів
         if self.width <= 0:
@@ -60,6 +84,82 @@ class Opening:
         return self.tech.U * self.area
 
 
+class OpeningList(list):
+    """
+    Список отворів стіни з лічильником змін: кожна вставка, видалення чи заміна
+    збільшує revision, тож кеші стіни порівнюють одне ціле число замість вмісту списку.
+    """
+    __slots__ = ("revision",)
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.revision = 0
+
+    def _changed(self):
+        self.revision += 1
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._changed()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._changed()
+
+    def __iadd__(self, other):
+        result = super().__iadd__(other)
+        self._changed()
+        return result
+
+    def __imul__(self, count):
+        result = super().__imul__(count)
+        self._changed()
+        return result
+
+    def append(self, opening):
+        super().append(opening)
+        self._changed()
+
+    def extend(self, openings):
+        super().extend(openings)
+        self._changed()
+
+    def insert(self, index, opening):
+        super().insert(index, opening)
+        self._changed()
+
+    def remove(self, opening):
+        super().remove(opening)
+        self._changed()
+
+    def pop(self, *index):
+        opening = super().pop(*index)
+        self._changed()
+        return opening
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._changed()
+
+    def reverse(self):
+        super().reverse()
+        self._changed()
+
+    def __reduce__(self):
+        # Копії та pickle зберігають лічильник разом із вмістом
+        return _restore_opening_list, (list(self), self.revision)
+
+
+def _restore_opening_list(openings: List[Opening], revision: int) -> OpeningList:
+    restored = OpeningList(openings)
+    restored.revision = revision
+    return restored
+
+
 OPENING_TYPES = {
     "Win_Standard": OpeningTech("Металопластик (1-кам)", U=1.4, g=0.65, category=OpeningCategory.WINDOW,
                                 color="#B0E0E6"),
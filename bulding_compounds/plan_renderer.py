@@ -0,0 +1,348 @@
+import math
+from typing import Dict, List, Optional, Set, Tuple
+import plotly.graph_objects as go
+
+# Стилі плану
+ROOM_FILL_COLOR = "rgba(173, 216, 230, 0.5)"
+DEFAULT_WALL_COLOR = "#555555"
+EXTERNAL_WALL_WIDTH = 8  # зовнішні стіни малюємо товщими
+INTERNAL_WALL_WIDTH = 4
+HITBOX_WIDTH = 20
+
+# Режими рендерингу: SVG (go.Scatter), WebGL (go.Scattergl) або автоматичний вибір
+RENDER_MODES = ("auto", "svg", "webgl")
+WEBGL_WALL_THRESHOLD = 1500  # з цієї кількості стін "auto" перемикається на WebGL
+# Рівень деталізації (за кількістю видимих елементів — план "віддалений")
+DETAIL_WALL_LIMIT = 3000  # більше видимих стін — без отворів і хітбоксів
+LABEL_TEXT_LIMIT = 500  # більше видимих кімнат — лише невидимі маркери без тексту
+# Скільки планів (поверх / режим / область) тримати в кеші будівлі
+PLAN_CACHE_LIMIT = 8
+
+BBox = Tuple[float, float, float, float]
+Style = Tuple[str, int]  # (колір, товщина лінії)
+
+
+class _Polyline:
+    """Накопичує відрізки однієї лінії, розділені None (один trace на весь стиль)."""
+
+    def __init__(self):
+        self.x: List[Optional[float]] = []
+        self.y: List[Optional[float]] = []
+        self.hover: List[Optional[str]] = []
+        self.customdata: List[list] = []
+
+    def add(self, x1: float, y1: float, x2: float, y2: float, hover: Optional[str] = None, data=None):
+        self.x.extend((x1, x2, None))
+        self.y.extend((y1, y2, None))
+        self.hover.extend((hover, hover, None))
+        self.customdata.extend((data, data, [None, None]))
+
+
+def room_polygon(building, room) -> Optional[Tuple[List[float], List[float], float, float]]:
+    """Замкнений контур кімнати та її центр: (xs, ys, center_x, center_y) або None."""
+    room_walls = [building.walls[wid] for wid in room.wall_ids if wid in building.walls]
+    if len(room_walls) < 3:
+        return None
+
+    vertices = set()
+    for w in room_walls:
+        vertices.add((round(w.start_x, 4), round(w.start_y, 4)))
+        vertices.add((round(w.end_x, 4), round(w.end_y, 4)))
+    unique_points = list(vertices)
+    if len(unique_points) < 3:
+        return None
+
+    # Центр кімнати та сортування вершин за кутом
+    center_x = sum(p[0] for p in unique_points) / len(unique_points)
+    center_y = sum(p[1] for p in unique_points) / len(unique_points)
+    unique_points.sort(key=lambda p: math.atan2(p[1] - center_y, p[0] - center_x))
+    xs = [p[0] for p in unique_points] + [unique_points[0][0]]
+    ys = [p[1] for p in unique_points] + [unique_points[0][1]]
+    return xs, ys, center_x, center_y
+
+
+def room_label(room) -> str:
+    label_text = room.name
+    # Якщо є девайси, додаємо іконку
+    if room.hvac_devices:
+        has_heat = any(d.power_heating > 0 for d in room.hvac_devices)
+        has_cool = any(d.power_cooling > 0 for d in room.hvac_devices)
+
+        if has_heat and has_cool:
+            label_text += " 🌡️"
+        elif has_heat:
+            label_text += " 🔥"
+        elif has_cool:
+            label_text += " ❄️"
+    return label_text
+
+
+def opening_segments(wall) -> List[Tuple[object, float, float, float, float]]:
+    """(отвір, x1, y1, x2, y2) для кожного отвору — з готової розкладки Wall.opening_layout."""
+    if not wall.openings:
+        return []
+    return [(op, x1, y1, x2, y2)
+            for op, (_, x1, y1, x2, y2) in zip(wall.openings, wall.opening_layout.tolist())]
+
+
+def _in_viewport(viewport: Optional[BBox], x1: float, y1: float, x2: float, y2: float) -> bool:
+    if viewport is None:
+        return True
+    v_min_x, v_min_y, v_max_x, v_max_y = viewport
+    return min(x1, x2) <= v_max_x and v_min_x <= max(x1, x2) and min(y1, y2) <= v_max_y and v_min_y <= max(y1, y2)
+
+
+def build_plan_figure(building, level: Optional[int] = None, mode: str = "auto",
+                      viewport: Optional[BBox] = None) -> go.Figure:
+    """
+    План будівлі з фіксованою кількістю trace-ів: заливки кімнат, стіни (по одному
+    на стиль), отвори (по одному на колір), хітбокси стін та підписи кімнат.
+    Кожен trace — лінії, розділені None, тож розмір фігури лінійний від розміру будівлі.
+
+    mode: "svg", "webgl" або "auto" (WebGL від WEBGL_WALL_THRESHOLD стін).
+    viewport: (min_x, min_y, max_x, max_y) — показати лише цю область; деталізація
+              (отвори, хітбокси, текст підписів) залежить від кількості видимих елементів.
+    Контракт кліку не змінюється: підписи кімнат завжди мають customdata [id, "room"].
+    """
+    return PlanCache(level, mode, viewport).build(building)
+
+
+class PlanCache:
+    """
+    План будівлі, що оновлюється інкрементально.
+    Для кожної кімнати / стіни зберігається готовий запис (контур, стиль, отвори),
+    а trace-и збираються із записів. get_figure перераховує лише елементи,
+    змінені після попередньої ревізії (building.changes_since), і оновлює
+    в фігурі лише trace-и, яких ці елементи стосуються.
+    """
+
+    def __init__(self, level: Optional[int] = None, mode: str = "auto", viewport: Optional[BBox] = None):
+        if mode not in RENDER_MODES:
+            raise ValueError(f"Unknown render mode '{mode}'. Use one of: {list(RENDER_MODES)}")
+        self.level = level
+        self.mode = mode
+        self.viewport = viewport
+        self.revision: Optional[int] = None
+        self.figure: Optional[go.Figure] = None
+        # id кімнати -> (xs, ys, center_x, center_y, підпис, назва)
+        self._rooms: Dict[str, tuple] = {}
+        # id стіни -> (стиль, (x1, y1, x2, y2), [(стиль отвору, x1, y1, x2, y2, підказка)], підказка)
+        self._walls: Dict[str, tuple] = {}
+        # стиль -> id стін цього стилю (dict як упорядкована множина)
+        self._wall_styles: Dict[Style, Dict[str, None]] = {}
+        self._opening_styles: Dict[Style, Dict[str, None]] = {}
+        self._structure = None  # набір trace-ів поточної фігури
+        self._trace_index: Dict[tuple, int] = {}
+
+    def get_figure(self, building) -> go.Figure:
+        """Фігура для поточної ревізії будівлі (та сама, якщо змін не було)."""
+        revision = building.revision
+        if self.figure is not None and revision == self.revision:
+            return self.figure
+        changes = building.changes_since(self.revision) if self.figure is not None else None
+        if changes is None:
+            self.build(building)
+        else:
+            self._patch(building, *changes)
+        self.revision = revision
+        return self.figure
+
+    def build(self, building) -> go.Figure:
+        """Повна побудова з нуля."""
+        self._rooms.clear()
+        self._walls.clear()
+        self._wall_styles.clear()
+        self._opening_styles.clear()
+        for room_id in building.rooms:
+            self._update_room(building, room_id)
+        for wall_id in building.walls:
+            self._update_wall(building, wall_id)
+        self._assemble()
+        return self.figure
+
+    # --- Записи елементів ---
+
+    def _update_room(self, building, room_id: str):
+        room = building.rooms.get(room_id)
+        record = None
+        if room is not None and (self.level is None or room.level == self.level):
+            polygon = room_polygon(building, room)
+            if polygon is not None:
+                xs, ys, center_x, center_y = polygon
+                if _in_viewport(self.viewport, min(xs), min(ys), max(xs), max(ys)):
+                    record = (xs, ys, center_x, center_y, room_label(room), room.name)
+        if record is None:
+            self._rooms.pop(room_id, None)
+        else:
+            # Запис на місці зберігає порядок підписів
+            self._rooms[room_id] = record
+
+    def _update_wall(self, building, wall_id: str) -> Set[tuple]:
+        """Оновлює запис стіни; повертає ключі trace-ів, яких стосувалась зміна."""
+        touched = set()
+        old = self._walls.get(wall_id)
+        if old is not None:
+            touched.add(("walls", old[0]))
+            self._discard(self._wall_styles, old[0], wall_id)
+            for op_style, *_ in old[2]:
+                touched.add(("openings", op_style))
+                self._discard(self._opening_styles, op_style, wall_id)
+
+        wall = building.walls.get(wall_id)
+        if (wall is None or (self.level is not None and wall.level != self.level)
+                or not _in_viewport(self.viewport, wall.start_x, wall.start_y, wall.end_x, wall.end_y)):
+            self._walls.pop(wall_id, None)
+            return touched
+
+        color = getattr(wall.base_material, "color", DEFAULT_WALL_COLOR)
+        width_px = EXTERNAL_WALL_WIDTH if building.is_exterior_wall(wall_id) else INTERNAL_WALL_WIDTH
+        style = (color, width_px)
+        # Вікна накладаються поверх стіни іншим кольором
+        openings = [((op.tech.color, width_px), x1, y1, x2, y2,
+                     f"{op.tech.category}: {op.tech.name}<br>{op.width}x{op.height}м")
+                    for op, x1, y1, x2, y2 in opening_segments(wall)]
+        material_name = getattr(wall.base_material, 'name', 'Стіна')
+        self._walls[wall_id] = (style, (wall.start_x, wall.start_y, wall.end_x, wall.end_y),
+                                openings, f"Стіна: {material_name}")
+
+        self._wall_styles.setdefault(style, {})[wall_id] = None
+        touched.add(("walls", style))
+        for op_style, *_ in openings:
+            self._opening_styles.setdefault(op_style, {})[wall_id] = None
+            touched.add(("openings", op_style))
+        return touched
+
+    @staticmethod
+    def _discard(styles: Dict[Style, Dict[str, None]], style: Style, wall_id: str):
+        members = styles.get(style)
+        if members is not None:
+            members.pop(wall_id, None)
+            if not members:
+                del styles[style]
+
+    def _patch(self, building, wall_ids: Set[str], room_ids: Set[str]):
+        touched = set()
+        for room_id in room_ids:
+            self._update_room(building, room_id)
+        if room_ids:
+            touched.update((("fill",), ("labels",)))
+        for wall_id in wall_ids:
+            touched.update(self._update_wall(building, wall_id))
+        if wall_ids:
+            touched.add(("hitboxes",))
+
+        if self._current_structure() != self._structure:
+            # З'явився / зник стиль або змінився рівень деталізації — нова фігура
+            self._assemble()
+            return
+        for key in touched:
+            index = self._trace_index.get(key)
+            if index is not None:
+                self.figure.data[index].update(**self._trace_data(key))
+
+    # --- Збирання trace-ів ---
+
+    def _current_structure(self) -> tuple:
+        # _walls / _rooms містять лише елементи у viewport: при наближенні деталізація повертається
+        webgl = self.mode == "webgl" or (self.mode == "auto" and len(self._walls) >= WEBGL_WALL_THRESHOLD)
+        show_details = len(self._walls) <= DETAIL_WALL_LIMIT
+        show_text = len(self._rooms) <= LABEL_TEXT_LIMIT
+        keys = [("fill",)]
+        keys += [("walls", style) for style in self._wall_styles]
+        if show_details:
+            keys += [("openings", style) for style in self._opening_styles]
+            keys.append(("hitboxes",))
+        keys.append(("labels",))
+        return webgl, show_text, tuple(keys)
+
+    def _trace_data(self, key: tuple) -> dict:
+        """Дані trace-а (координати, підказки, customdata) з поточних записів."""
+        kind = key[0]
+        if kind == "fill":
+            xs, ys = [], []
+            for record in self._rooms.values():
+                xs.extend(record[0] + [None])
+                ys.extend(record[1] + [None])
+            return dict(x=xs, y=ys)
+        if kind == "labels":
+            records = list(self._rooms.items())
+            return dict(x=[r[2] for _, r in records], y=[r[3] for _, r in records],
+                        text=[r[4] for _, r in records], hovertext=[r[5] for _, r in records],
+                        customdata=[[room_id, "room"] for room_id, _ in records])
+        line = _Polyline()
+        if kind == "walls":
+            for wall_id in self._wall_styles.get(key[1], ()):
+                line.add(*self._walls[wall_id][1])
+            return dict(x=line.x, y=line.y)
+        if kind == "openings":
+            for wall_id in self._opening_styles.get(key[1], ()):
+                for op_style, x1, y1, x2, y2, hover in self._walls[wall_id][2]:
+                    if op_style == key[1]:
+                        line.add(x1, y1, x2, y2, hover=hover)
+            return dict(x=line.x, y=line.y, hovertext=line.hover)
+        # hitboxes
+        for wall_id, record in self._walls.items():
+            line.add(*record[1], hover=record[3], data=[wall_id, "wall"])
+        return dict(x=line.x, y=line.y, customdata=line.customdata, hovertext=line.hover)
+
+    def _assemble(self):
+        webgl, show_text, keys = self._structure = self._current_structure()
+        trace = go.Scattergl if webgl else go.Scatter
+        self._trace_index = {key: i for i, key in enumerate(keys)}
+
+        fig = go.Figure()
+        for key in keys:
+            data = self._trace_data(key)
+            kind = key[0]
+            if kind == "fill":
+                # А. Візуальна заливка (не для кліку)
+                fig.add_trace(go.Scatter(
+                    **data, fill="toself", fillcolor=ROOM_FILL_COLOR,
+                    line=dict(width=0), mode="none", hoverinfo="skip", showlegend=False
+                ))
+            elif kind == "walls":
+                color, width_px = key[1]
+                fig.add_trace(trace(
+                    **data, mode="lines", line=dict(color=color, width=width_px),
+                    hoverinfo="skip", showlegend=False
+                ))
+            elif kind == "openings":
+                color, width_px = key[1]
+                fig.add_trace(trace(
+                    **data, mode="lines", line=dict(color=color, width=width_px),
+                    hoverinfo="text", showlegend=False
+                ))
+            elif kind == "hitboxes":
+                # Б. Невидимі хітбокси стін (для кліку) — лише при достатньому наближенні
+                fig.add_trace(trace(
+                    **data, mode="lines",
+                    line=dict(color="rgba(0,0,0,0)", width=HITBOX_WIDTH),
+                    hovertemplate="%{hovertext}<extra></extra>", showlegend=False
+                ))
+            else:
+                # В. Назви кімнат (головна точка кліку для кімнати) — поверх усього.
+                # Віддалений план: текст ховається, але невидимі маркери лишаються клікабельними
+                fig.add_trace(trace(
+                    **data,
+                    mode="text+markers" if show_text else "markers",  # Маркер невидимий, але розширює зону кліку
+                    marker=dict(size=20, opacity=0),
+                    textfont=dict(size=14, color="black", weight="bold"),
+                    hovertemplate="Кімната: %{hovertext}<extra></extra>", showlegend=False
+                ))
+
+        viewport = self.viewport
+        fig.update_layout(
+            title="План будівлі",
+            uirevision='constant',
+            xaxis=dict(title="X", showgrid=True, zeroline=True, scaleanchor="y", scaleratio=1,
+                       range=[viewport[0], viewport[2]] if viewport else None),
+            yaxis=dict(title="Y", showgrid=True, zeroline=True,
+                       range=[viewport[1], viewport[3]] if viewport else None),
+            height=600,
+            hovermode="closest",
+            clickmode="event+select",
+            margin=dict(l=20, r=20, t=40, b=20),
+            showlegend=False
+        )
+        fig.update_traces(selectedpoints=None)
+        self.figure = fig
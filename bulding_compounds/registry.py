@@ -0,0 +1,61 @@
+import dataclasses
+from typing import Dict, Iterable, List, Optional
+from bulding_compounds.material import Material, MATERIALS
+from bulding_compounds.opening import OpeningTech, OpeningCategory, OPENING_TYPES
+
+
+def _content_key(obj, skip=("id",)) -> tuple:
+    """Ключ за вмістом: значення всіх полів, крім id (id бібліотечних матеріалів різні між запусками)."""
+    return tuple(getattr(obj, f.name) for f in dataclasses.fields(obj) if f.name not in skip)
+
+
+class ComponentRegistry:
+    """
+    Реєстр спільних матеріалів і технологій отворів.
+    Однакові за вмістом записи (наприклад, з JSON) замінюються одним об'єктом,
+    тож стіни тримають посилання на спільний матеріал, а кешовані U / теплоємність
+    рахуються один раз на матеріал. За замовчуванням заповнений бібліотеками
+    MATERIALS та OPENING_TYPES. Спільні об'єкти не слід змінювати на місці.
+    """
+
+    def __init__(self, materials: Optional[Iterable[Material]] = None,
+                 techs: Optional[Iterable[OpeningTech]] = None):
+        self._materials: Dict[tuple, Material] = {}
+        self._techs: Dict[tuple, OpeningTech] = {}
+        for material in MATERIALS.values() if materials is None else materials:
+            self._materials.setdefault(_content_key(material), material)
+        for tech in OPENING_TYPES.values() if techs is None else techs:
+            self._techs.setdefault(_content_key(tech), tech)
+
+    @property
+    def materials(self) -> List[Material]:
+        return list(self._materials.values())
+
+    @property
+    def techs(self) -> List[OpeningTech]:
+        return list(self._techs.values())
+
+    def intern_material(self, material: Material) -> Material:
+        """Спільний матеріал з тим самим вмістом (або сам material, якщо такого ще немає)."""
+        return self._intern(self._materials, material)
+
+    def intern_tech(self, tech: OpeningTech) -> OpeningTech:
+        return self._intern(self._techs, tech)
+
+    @staticmethod
+    def _intern(table: Dict[tuple, object], obj):
+        key = _content_key(obj)
+        shared = table.get(key)
+        # Запис, змінений на місці після додавання, більше не відповідає своєму ключу
+        if shared is None or _content_key(shared) != key:
+            table[key] = shared = obj
+        return shared
+
+    def material(self, data: dict) -> Material:
+        """Матеріал зі словника (JSON): наявний спільний або новий."""
+        return self.intern_material(Material(**data))
+
+    def tech(self, data: dict) -> OpeningTech:
+        # Важливо: конвертуємо рядок категорії назад в Enum
+        data = dict(data, category=OpeningCategory(data['category']))
+        return self.intern_tech(OpeningTech(**data))
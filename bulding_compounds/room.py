@@ -1,10 +1,10 @@
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 import uuid
 from bulding_compounds.hvac import HVACDevice
 
 
-@dataclass
+@dataclass(slots=True)
 class Room:
     name: str
     width: float  # розмір по осі X (м)
@@ -17,6 +17,7 @@ class Room:
     wall_ids: List[str] = field(default_factory=lambda: ["", "", "", ""])
     hvac_devices: List['HVACDevice'] = field(default_factory=list)
     id: str = field(default_factory=lambda: str(uuid.uuid4())[:8])
+    level: int = 0  # поверх (0 — перший)
 
     def __post_init__(self):
         """Валідація геометрії кімнати."""
@@ -34,21 +35,41 @@ class Room:
 
     def get_center(self, building) -> tuple[float, float]:
         """Центр кімнати — з координат стін (надійний спосіб)"""
-        xs = []
-        ys = []
-        for wall_id in self.wall_ids:
-            wall = building.walls.get(wall_id)
-            if wall:
-                xs.extend([wall.start_x, wall.end_x])
-                ys.extend([wall.start_y, wall.end_y])
-
-        if not xs:
+        geometry = building.get_room_geometry(self)
+        if geometry is None:
             raise ValueError("Кімната не має валідних стін")
-
-        return sum(xs) / len(xs), sum(ys) / len(ys)
+        return geometry.center
 
     def add_hvac(self, device: HVACDevice):
         self.hvac_devices.append(device)
 
     def remove_hvac(self, device_id: str):
-        self.hvac_devices = [d for d in self.hvac_devices if d.id != device_id]
\ No newline at end of file
+        self.hvac_devices = [d for d in self.hvac_devices if d.id != device_id]
+
+
+@dataclass
+class RoomGeometry:
+    """
+    Обчислена з координат стін геометрія кімнати.
+    Кешується в Building і перераховується лише коли змінюються стіни цієї кімнати.
+    """
+    center: Tuple[float, float]  # середнє кінців стін
+    bounds: Tuple[float, float, float, float]  # min_x, min_y, max_x, max_y
+    height: float
+    wall_directions: Dict[str, str]  # id стіни -> "N" / "E" / "S" / "W"
+
+    @property
+    def width(self) -> float:
+        return self.bounds[2] - self.bounds[0]
+
+    @property
+    def length(self) -> float:
+        return self.bounds[3] - self.bounds[1]
+
+    @property
+    def floor_area(self) -> float:
+        return self.width * self.length
+
+    @property
+    def volume(self) -> float:
+        return self.floor_area * self.height
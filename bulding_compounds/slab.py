@@ -0,0 +1,24 @@
+from dataclasses import dataclass, field
+from typing import Optional
+import uuid
+from bulding_compounds.material import Material
+
+
+# Перекриття між поверхами
+@dataclass
+class Slab:
+    lower_room_id: str  # кімната під перекриттям (стеля)
+    upper_room_id: str  # кімната над перекриттям (підлога)
+    area: float  # площа перетину контурів кімнат (м²)
+    material: Optional[Material] = None
+    id: str = field(default_factory=lambda: str(uuid.uuid4())[:8])
+
+    def __post_init__(self):
+        if self.area <= 0:
+            raise ValueError(f"Slab area must be > 0. Got: {self.area}")
+        if self.lower_room_id == self.upper_room_id:
+            raise ValueError("Перекриття має з'єднувати дві різні кімнати")
+
+    def other_room_id(self, room_id: str) -> str:
+        """Кімната з іншого боку перекриття."""
+        return self.upper_room_id if room_id == self.lower_room_id else self.lower_room_id
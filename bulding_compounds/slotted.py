@@ -0,0 +1,18 @@
+class CacheSlots:
+    """
+    База для dataclass(slots=True) з кешами, що не є полями.
+    Нащадок оголошує базовий клас з __slots__ = (імена кешів); поки слот не заповнено,
+    _cached повертає None. Кеші не потрапляють в asdict / JSON і порівняння.
+    """
+    __slots__ = ()
+
+    def _cached(self, name: str):
+        return getattr(self, name, None)
+
+    def _store(self, name: str, value):
+        object.__setattr__(self, name, value)
+        return value
+
+    def _drop(self, *names: str):
+        for name in names:
+            object.__setattr__(self, name, None)
@@ -0,0 +1,83 @@
+import math
+from typing import Dict, Hashable, List, Set, Tuple
+
+# Розмір клітинки сітки (м) — порядку довжини типової стіни
+DEFAULT_CELL_SIZE = 5.0
+
+Cell = Tuple[int, int]
+BBox = Tuple[float, float, float, float]
+
+
+class SegmentGridIndex:
+    """
+    Рівномірна сітка над відрізками стін.
+    Кожен відрізок реєструється у всіх клітинках свого bounding box,
+    тож пошук кандидатів на перетин дивиться лише на сусідні клітинки,
+    а вставка/видалення коштують O(кількість клітинок відрізка).
+    """
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE):
+        if cell_size <= 0:
+            raise ValueError(f"Cell size must be > 0. Got: {cell_size}")
+        self.cell_size = cell_size
+        self._cells: Dict[Cell, Set[Hashable]] = {}
+        self._items: Dict[Hashable, Tuple[BBox, List[Cell]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
+
+    def _cells_for(self, bbox: BBox) -> List[Cell]:
+        min_x, min_y, max_x, max_y = bbox
+        cs = self.cell_size
+        return [(i, j)
+                for i in range(math.floor(min_x / cs), math.floor(max_x / cs) + 1)
+                for j in range(math.floor(min_y / cs), math.floor(max_y / cs) + 1)]
+
+    @staticmethod
+    def _bbox(x1: float, y1: float, x2: float, y2: float) -> BBox:
+        return min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+
+    def insert(self, key: Hashable, x1: float, y1: float, x2: float, y2: float):
+        if key in self._items:
+            self.remove(key)
+        bbox = self._bbox(x1, y1, x2, y2)
+        cells = self._cells_for(bbox)
+        for cell in cells:
+            self._cells.setdefault(cell, set()).add(key)
+        self._items[key] = (bbox, cells)
+
+    def remove(self, key: Hashable):
+        entry = self._items.pop(key, None)
+        if entry is None:
+            return
+        for cell in entry[1]:
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._cells[cell]
+
+    def clear(self):
+        self._cells.clear()
+        self._items.clear()
+
+    def query(self, x1: float, y1: float, x2: float, y2: float) -> List[Hashable]:
+        """
+        Ключі відрізків, чиї bounding box перетинаються (або торкаються)
+        з bounding box заданого відрізка.
+        """
+        q_min_x, q_min_y, q_max_x, q_max_y = self._bbox(x1, y1, x2, y2)
+        seen: Set[Hashable] = set()
+        result = []
+        for cell in self._cells_for((q_min_x, q_min_y, q_max_x, q_max_y)):
+            for key in self._cells.get(cell, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                min_x, min_y, max_x, max_y = self._items[key][0]
+                if min_x <= q_max_x and q_min_x <= max_x and min_y <= q_max_y and q_min_y <= max_y:
+                    result.append(key)
+        return result
@@ -0,0 +1,128 @@
+from dataclasses import dataclass, field
+from typing import Iterable, List, Tuple
+import numpy as np
+from bulding_compounds.wall import segment_pairs_intersect_properly
+
+# Скільки пар-кандидатів перевіряти за один векторний виклик (обмеження пам'яті)
+PAIR_CHUNK_SIZE = 1_000_000
+# Мінімальний розмір клітинки сітки кандидатів (усі відрізки — точки)
+CELL_MIN_SIZE = 1e-6
+
+
+@dataclass
+class ValidationReport:
+    """Результат перевірки топології всієї будівлі."""
+    improper_intersections: List[Tuple[str, str]] = field(default_factory=list)  # пари id стін
+    duplicate_walls: List[List[str]] = field(default_factory=list)  # групи стін з однаковою геометрією
+    orphan_wall_ids: List[Tuple[str, str]] = field(default_factory=list)  # (id кімнати, відсутній id стіни)
+    overfull_walls: List[str] = field(default_factory=list)  # стіни, що мають більше двох кімнат
+    orphan_slab_ids: List[str] = field(default_factory=list)  # перекриття з відсутньою кімнатою
+
+    @property
+    def is_valid(self) -> bool:
+        return not (self.improper_intersections or self.duplicate_walls
+                    or self.orphan_wall_ids or self.overfull_walls or self.orphan_slab_ids)
+
+    def restricted_to(self, wall_ids: Iterable[str]) -> "ValidationReport":
+        """Лише проблеми, що стосуються вказаних стін (наприклад, щойно доданих)."""
+        wall_ids = set(wall_ids)
+        return ValidationReport(
+            improper_intersections=[p for p in self.improper_intersections if p[0] in wall_ids or p[1] in wall_ids],
+            duplicate_walls=[g for g in self.duplicate_walls if wall_ids.intersection(g)],
+            orphan_wall_ids=[o for o in self.orphan_wall_ids if o[1] in wall_ids],
+            overfull_walls=[w for w in self.overfull_walls if w in wall_ids],
+        )
+
+    def messages(self) -> List[str]:
+        """Опис проблем для користувача."""
+        result = []
+        for a, b in self.improper_intersections:
+            result.append(f"Стіни {a} та {b} перетинаються або накладаються")
+        for group in self.duplicate_walls:
+            result.append(f"Стіни з однаковою геометрією: {', '.join(group)}")
+        for room_id, wall_id in self.orphan_wall_ids:
+            result.append(f"Кімната {room_id} посилається на відсутню стіну {wall_id}")
+        for wall_id in self.overfull_walls:
+            result.append(f"Стіна {wall_id} належить більше ніж двом кімнатам")
+        for slab_id in self.orphan_slab_ids:
+            result.append(f"Перекриття {slab_id} посилається на відсутню кімнату")
+        return result
+
+
+def find_improper_pairs(segments: np.ndarray) -> np.ndarray:
+    """
+    Пошук усіх неправильних перетинів серед N відрізків (N x 4).
+    Габарити відрізків розкладаються по рівномірній 2-D сітці (клітинка — медіанний розмір
+    відрізка); кандидати — пари в одній клітинці, тож і рядок, і стовпчик кімнат дають
+    ~O(N) пар. Пару перевіряє лише клітинка з кутом (max min_x, max min_y) перетину габаритів,
+    тому кожна пара векторно перевіряється один раз. Повертає масив K x 2 індексів пар.
+    """
+    segments = np.asarray(segments, dtype=float).reshape(-1, 4)
+    n = len(segments)
+    if n < 2:
+        return np.empty((0, 2), dtype=np.intp)
+
+    min_x = np.minimum(segments[:, 0], segments[:, 2])
+    max_x = np.maximum(segments[:, 0], segments[:, 2])
+    min_y = np.minimum(segments[:, 1], segments[:, 3])
+    max_y = np.maximum(segments[:, 1], segments[:, 3])
+
+    extent = np.maximum(max_x - min_x, max_y - min_y)
+    cell = max(float(np.median(extent)), CELL_MIN_SIZE)
+    origin_x, origin_y = min_x.min(), min_y.min()
+
+    def cell_x(x):
+        return np.floor((x - origin_x) / cell).astype(np.int64)
+
+    def cell_y(y):
+        return np.floor((y - origin_y) / cell).astype(np.int64)
+
+    x0, x1 = cell_x(min_x), cell_x(max_x)
+    y0, y1 = cell_y(min_y), cell_y(max_y)
+    height = int(y1.max()) + 1
+
+    # Запис (відрізок, клітинка) для кожної клітинки, яку накриває габарит відрізка
+    nx = x1 - x0 + 1
+    per_segment = nx * (y1 - y0 + 1)
+    seg = np.repeat(np.arange(n), per_segment)
+    local = np.arange(len(seg)) - np.repeat(np.cumsum(per_segment) - per_segment, per_segment)
+    keys = (x0[seg] + local % nx[seg]) * height + (y0[seg] + local // nx[seg])
+
+    order = np.argsort(keys, kind="stable")
+    keys, seg = keys[order], seg[order]
+    m = len(keys)
+    # Для p-го запису кандидати — наступні записи тієї ж клітинки: позиції (p, end[p])
+    end = np.searchsorted(keys, keys, side="right")
+    counts = end - np.arange(m) - 1
+
+    found = []
+    # Обробляємо записи блоками, щоб кількість пар у блоці була обмеженою
+    start = 0
+    while start < m:
+        stop = start
+        total = 0
+        while stop < m and (total == 0 or total + counts[stop] <= PAIR_CHUNK_SIZE):
+            total += counts[stop]
+            stop += 1
+        if total:
+            block = np.arange(start, stop)
+            block_counts = counts[start:stop]
+            first = np.repeat(block, block_counts)
+            offsets = np.arange(total) - np.repeat(np.cumsum(block_counts) - block_counts, block_counts)
+            second = first + 1 + offsets
+
+            i, j = seg[first], seg[second]
+            # Габарити мають перетинатись, а пара — належати цій клітинці
+            corner_key = cell_x(np.maximum(min_x[i], min_x[j])) * height + cell_y(np.maximum(min_y[i], min_y[j]))
+            keep = ((min_x[i] <= max_x[j]) & (min_x[j] <= max_x[i])
+                    & (min_y[i] <= max_y[j]) & (min_y[j] <= max_y[i])
+                    & (corner_key == keys[first]))
+            i, j = i[keep], j[keep]
+            bad = ~segment_pairs_intersect_properly(segments[i], segments[j])
+            if bad.any():
+                found.append(np.column_stack([i[bad], j[bad]]))
+        start = stop
+
+    if not found:
+        return np.empty((0, 2), dtype=np.intp)
+    return np.concatenate(found)
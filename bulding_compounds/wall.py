@@ -2,23 +2,90 @@ from dataclasses import dataclass, field
 from typing import List, Optional
 import uuid
 from bulding_compounds.material import Material
-from bulding_compounds.opening import Opening
-from shapely.geometry import LineString
+from bulding_compounds.opening import Opening, OpeningList, openings_clock
+from bulding_compounds.slotted import CacheSlots
+import numpy as np
 import math
+import itertools
+
+# Точність, з якою координати вважаються однаковими (м)
+GEOMETRY_TOLERANCE = 1e-6
+
+
+def segment_key(x1: float, y1: float, x2: float, y2: float, tolerance: float = GEOMETRY_TOLERANCE) -> tuple:
+    """
+    Канонічний ключ відрізка: квантовані кінці, впорядковані незалежно від напрямку.
+    Стіни (0,0)-(5,0) та (5,0)-(0,0) мають однаковий ключ.
+    """
+    a = (round(x1 / tolerance), round(y1 / tolerance))
+    b = (round(x2 / tolerance), round(y2 / tolerance))
+    return (a, b) if a <= b else (b, a)
+
+
+def geometry_key(x1: float, y1: float, x2: float, y2: float, level: int = 0) -> tuple:
+    """Ключ стіни: поверх + канонічний ключ відрізка (стіни різних поверхів різні)."""
+    return (level,) + segment_key(x1, y1, x2, y2)
+
+
+# Поля, зміна яких змінює геометрію стіни
+GEOMETRY_FIELDS = frozenset(("start_x", "start_y", "end_x", "end_y"))
+# Спільний лічильник ревізій: дві різні стіни ніколи не мають однакової ревізії
+_revisions = itertools.count(1)
+_last_revision = 0  # остання видана ревізія (geometry_clock)
+# Стовпці Wall.opening_layout
+OPENING_OFFSET, OPENING_X1, OPENING_Y1, OPENING_X2, OPENING_Y2 = range(5)
+# Спільна розкладка для стін без отворів (щоб не тримати порожній масив у кожній)
+_NO_OPENINGS = np.empty((0, 5))
+_NO_OPENINGS.flags.writeable = False
+
+
+def _next_geometry_revision() -> int:
+    global _last_revision
+    _last_revision = next(_revisions)
+    return _last_revision
+
+
+def geometry_clock() -> int:
+    """Остання видана ревізія координат: не змінилась — жодна стіна не рухалась."""
+    return _last_revision
+
+
+class _WallCaches(CacheSlots):
+    # Службові атрибути стіни (не поля dataclass). Кеші лишаються None, поки їх не прочитали;
+    # довжина не кешується — hypot дешевший за слот із float на кожну стіну
+    __slots__ = ("geometry_revision", "_aggregates", "_opening_layout")
 
 
 # Стіна
-@dataclass
-class Wall:
+@dataclass(slots=True)
+class Wall(_WallCaches):
     start_x: float = 0
     start_y: float = 0
     end_x: float = 1
     end_y: float = 1
     height: float = 2.8
     base_material: Optional[Material] = None
-    openings: List[Opening] = field(default_factory=list)
+    openings: List[Opening] = field(default_factory=OpeningList)
     room_ids: List[str] = field(default_factory=list)
     id: str = field(default_factory=lambda: str(uuid.uuid4())[:8])
+    level: int = 0  # поверх
+
+    def __setattr__(self, name, value):
+        if name == "openings":
+            # Власний список з лічильником змін: кеші порівнюють його revision
+            if not isinstance(value, OpeningList):
+                value = OpeningList(value)
+            object.__setattr__(self, name, value)
+            self.invalidate_cache()
+            return
+        object.__setattr__(self, name, value)
+        if name in GEOMETRY_FIELDS:
+            # Нова ревізія — кеші, що залежать від координат (геометрія кімнат), стають недійсними
+            object.__setattr__(self, "geometry_revision", _next_geometry_revision())
+
+    def invalidate_cache(self):
+        """Скидає кешовані суми по отворах (зміни отворів і так видно з лічильників)."""
+        self._drop("_aggregates")
 
     def __post_init__(self):
         """Валідація параметрів стіни після ініціалізації."""
@@ -39,13 +106,35 @@ class Wall:
 
     @property
     def length(self) -> float:
-        """Допоміжна властивість для обчислення довжини"""
+        """Довжина стіни"""
         return math.hypot(self.end_x - self.start_x, self.end_y - self.start_y)
 
+    @property
+    def geometry_key(self) -> tuple:
+        """Ключ геометрії для пошуку однакових стін через dict"""
+        return geometry_key(self.start_x, self.start_y, self.end_x, self.end_y, self.level)
+
+    @property
+    def segment(self) -> tuple:
+        """Кінці стіни як (x1, y1, x2, y2)"""
+        return self.start_x, self.start_y, self.end_x, self.end_y
+
     def is_equeal_wall(self, wall2) -> bool:
-        line1 = LineString([(self.start_x, self.start_y), (self.end_x, self.end_y)])
-        line2 = LineString([(wall2.start_x, wall2.start_y), (wall2.end_x, wall2.end_y)])
-        return line1.equals(line2)
+        return self.geometry_key == wall2.geometry_key
+
+    def _opening_totals(self) -> tuple:
+        """
+        (Σ площ отворів, Σ U · площа отворів) — єдина частина площ / UA, що залежить
+        від кількості отворів; рахується один раз до зміни стіни чи її отворів.
+        """
+        # Два цілих: зміни списку отворів стіни та будь-якого отвору / технології на місці
+        revision, clock = self.openings.revision, openings_clock()
+        cached = self._cached("_aggregates")
+        if cached is not None and cached[0] == revision and cached[1] == clock:
+            return cached[2:]
+        area = sum(op.area for op in self.openings)
+        ua = sum(op.tech.U * op.area for op in self.openings)
+        return self._store("_aggregates", (revision, clock, area, ua))[2:]
 
     @property
     def area_gross(self) -> float:
@@ -55,13 +144,23 @@ class Wall:
     @property
     def area_openings(self) -> float:
         """Сумарна площа всіх отворів"""
-        return sum(op.area for op in self.openings)
+        return self._opening_totals()[0]
 
     @property
     def area_net(self) -> float:
         """Чиста площа стіни (матеріалу)"""
         return max(0.0, self.area_gross - self.area_openings)
 
+    @property
+    def total_ua(self) -> float:
+        """
+        Сумарна теплопередача стіни UA (Вт/К): U матеріалу · чиста площа + Σ U отвору · площа.
+        Сума по отворах кешується, решта — кілька множень (U матеріалу кешує сам матеріал).
+        """
+        material = self.base_material
+        ua = material.U * self.area_net if material is not None else 0.0
+        return ua + self._opening_totals()[1]
+
     def add_opening(self, opening: Opening):
         """
         Додає отвір. Перевіряє тільки сумарні габарити.
@@ -77,30 +176,97 @@ class Wall:
             raise ValueError(f"Сумарна ширина отворів перевищує довжину стіни! (Стіна: {self.length:.2f}м)")
 
         self.openings.append(opening)
+        # Розкладка рахується один раз тут, далі її беруть рендер, симуляція та експорт
+        self._update_opening_layout()
+
+    def _update_opening_layout(self) -> np.ndarray:
+        """Рівномірний розподіл уздовж стіни: [GAP] [WIN1] [GAP] [WIN2] [GAP]."""
+        if not self.openings:
+            self._drop("_opening_layout")
+            return _NO_OPENINGS
+        layout = np.empty((len(self.openings), 5))
+        wall_len = self.length
+        # Нормалізований вектор напрямку стіни
+        ux = (self.end_x - self.start_x) / wall_len
+        uy = (self.end_y - self.start_y) / wall_len
+        widths = np.array([op.width for op in self.openings], dtype=float)
+        gap_size = (wall_len - widths.sum()) / (len(widths) + 1)
+        # Відстань від start_x до початку кожного отвору
+        offsets = gap_size * np.arange(1, len(widths) + 1) + np.concatenate(([0.0], np.cumsum(widths)[:-1]))
+        layout[:, OPENING_OFFSET] = offsets
+        layout[:, OPENING_X1] = self.start_x + ux * offsets
+        layout[:, OPENING_Y1] = self.start_y + uy * offsets
+        layout[:, OPENING_X2] = layout[:, OPENING_X1] + ux * widths
+        layout[:, OPENING_Y2] = layout[:, OPENING_Y1] + uy * widths
+        layout.flags.writeable = False
+        # Не поле dataclass: не потрапляє в asdict / JSON і порівняння стін
+        # Розкладка залежить від координат стіни та ширини / порядку отворів
+        self._store("_opening_layout", (self.geometry_revision, self.openings.revision, openings_clock(), layout))
+        return layout
+
+    @property
+    def opening_layout(self) -> np.ndarray:
+        """
+        Положення отворів (рядок на отвір, у порядку openings):
+        [відступ від початку стіни, x1, y1, x2, y2]. Масив лише для читання;
+        перераховується, тільки якщо змінились координати стіни чи список отворів.
+        """
+        if not self.openings:
+            return _NO_OPENINGS
+        cached = self._cached("_opening_layout")
+        if (cached is None or cached[0] != self.geometry_revision or cached[1] != self.openings.revision
+                or cached[2] != openings_clock()):
+            return self._update_opening_layout()
+        return cached[3]
+
+
+def segment_pairs_intersect_properly(first, second) -> np.ndarray:
+    """
+    Векторна перевірка пар відрізків: first[i] проти second[i] (масиви N x 4: x1, y1, x2, y2).
+    Повертає масив bool: True — перетин допустимий.
+
+    Допустимо: стіни не торкаються, торкаються кінцем (кут, Т-стик) або ідентичні.
+    Недопустимо: перетин у внутрішніх точках обох стін (X) або накладання (колінеарний відрізок).
+    Перевірка через знаки орієнтації трійок точок, без створення геометричних об'єктів.
+    """
+    first = np.asarray(first, dtype=float).reshape(-1, 4)
+    second = np.asarray(second, dtype=float).reshape(-1, 4)
+    ax, ay, bx, by = first[:, 0], first[:, 1], first[:, 2], first[:, 3]
+    cx, cy, dx, dy = second[:, 0], second[:, 1], second[:, 2], second[:, 3]
+
+    # Орієнтація точки відносно прямої (знак векторного добутку)
+    o1 = np.sign((bx - ax) * (cy - ay) - (by - ay) * (cx - ax))
+    o2 = np.sign((bx - ax) * (dy - ay) - (by - ay) * (dx - ax))
+    o3 = np.sign((dx - cx) * (ay - cy) - (dy - cy) * (ax - cx))
+    o4 = np.sign((dx - cx) * (by - cy) - (dy - cy) * (bx - cx))
+
+    # X-перетин: кінці кожного відрізка строго по різні боки від іншого
+    crossing = (o1 * o2 < 0) & (o3 * o4 < 0)
+
+    # Колінеарні відрізки: довжина спільної частини по домінуючій осі першого відрізка
+    collinear = (o1 == 0) & (o2 == 0)
+    along_x = np.abs(bx - ax) >= np.abs(by - ay)
+    overlap = np.where(
+        along_x,
+        np.minimum(np.maximum(ax, bx), np.maximum(cx, dx)) - np.maximum(np.minimum(ax, bx), np.minimum(cx, dx)),
+        np.minimum(np.maximum(ay, by), np.maximum(cy, dy)) - np.maximum(np.minimum(ay, by), np.minimum(cy, dy)),
+    )
+
+    identical = (((cx == ax) & (cy == ay) & (dx == bx) & (dy == by)) |
+                 ((cx == bx) & (cy == by) & (dx == ax) & (dy == ay)))
+
+    return ~(crossing | (collinear & (overlap > 0) & ~identical))
+
+
+def segments_intersect_properly(segment, others) -> np.ndarray:
+    """Один відрізок (x1, y1, x2, y2) проти масиву відрізків N x 4."""
+    others = np.asarray(others, dtype=float).reshape(-1, 4)
+    first = np.broadcast_to(np.asarray(segment, dtype=float), others.shape)
+    return segment_pairs_intersect_properly(first, others)
 
 
 def walls_intersect_properly(wall1: Wall, wall2: Wall) -> bool:
-    line1 = LineString([(wall1.start_x, wall1.start_y), (wall1.end_x, wall1.end_y)])
-    line2 = LineString([(wall2.start_x, wall2.start_y), (wall2.end_x, wall2.end_y)])
-
-    if line1.equals(line2):
-        return True  # однакові стіни — ок
-
-    if not line1.intersects(line2):
-        return True  # не перетинаються — ок
-
-    # Є перетин — перевіряємо, чи він у кінцевих точках
-    intersection = line1.intersection(line2)
-
-    # intersection може бути Point або MultiPoint
-    if intersection.geom_type == "Point":
-        px, py = intersection.x, intersection.y
-        # Перевіряємо, чи це одна з 4 кінцевих точок
-        ends1 = [(wall1.start_x, wall1.start_y), (wall1.end_x, wall1.end_y)]
-        ends2 = [(wall2.start_x, wall2.start_y), (wall2.end_x, wall2.end_y)]
-        return (px, py) in ends1 or (px, py) in ends2
-    else:
-        return False  # перетин не точка (наприклад, накладання) — погано
+    return bool(segments_intersect_properly(wall1.segment, [wall2.segment])[0])
 
 
 if __name__ == '__main__':
@@ -2,8 +2,12 @@ import streamlit as st
 import pandas as pd
 from simulation.controls import RoomControlProfile, ControlMode
 from simulation.thermal_sim import ThermalSimulation
+from simulation.result_cache import ResultCache
+from simulation.incremental import run_incremental
 import json
 
+SIM_DT_SECONDS = 60
+
 
 def make_simulation():
     """
@@ -113,8 +117,16 @@ def _get_profile_for_room(room, room_id):
     return profile
 
 
+@st.cache_resource
+def _get_result_cache():
+    """Один кеш результатів на процес (файли на диску спільні для всіх воркерів)."""
+    return ResultCache()
+
+
 def _run_simulation_process(building, params, profiles):
     """Виконує симуляцію, оновлює прогрес і викликає рендер результатів."""
+    # Симуляція працює з незмінним знімком: правки плану під час розрахунку її не зачеплять
+    building = building.snapshot()
 
     sim = ThermalSimulation(building)
     sim.initialize(
@@ -129,17 +141,28 @@ def _run_simulation_process(building, params, profiles):
     progress_bar = st.progress(0)
     status_text = st.empty()
 
-    total_hours = params["duration"]
-    chunk_hours = total_hours / 10.0
-
-    for i in range(10):
-        status_text.text(f"Обрахунок... {int((i + 1) * 10)}%")
-
-        sim.run_simulation(duration_hours=chunk_hours, dt_seconds=60)
-
-        progress_bar.progress((i + 1) * 10)
+    def on_progress(fraction):
+        status_text.text(f"Обрахунок... {int(fraction * 100)}%")
+        progress_bar.progress(int(fraction * 100))
+
+    # Кеш ведеться по зв'язних зонах будівлі: після зміни налаштувань однієї кімнати
+    # перераховується лише її зона, решта береться з кешу.
+    # Тариф на фізику не впливає, тому в ключ не входить.
+    run = run_incremental(
+        _get_result_cache(), building, profiles,
+        start_temp=params["start_t"], t_min=params["t_min"], t_max=params["t_max"],
+        internal_gain=params["internal_gain"], duration_hours=params["duration"],
+        dt_seconds=SIM_DT_SECONDS, chunks=10, on_progress=on_progress
+    )
+    run.result.apply_to(sim)
+    progress_bar.progress(100)
 
-    status_text.text("Симуляцію завершено успішно!")
+    if run.recomputed:
+        status_text.text(
+            f"Симуляцію завершено успішно! Перераховано зон: {len(run.recomputed)} з {len(run.components)}."
+        )
+    else:
+        status_text.text("Результат взято з кешу (вхідні дані не змінились).")
 
     _render_results(sim, building, params["tariff"])
 
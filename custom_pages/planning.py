@@ -15,6 +15,8 @@ def make_planning():
     _ensure_state()
     building = st.session_state.building
 
+    _render_history_controls(building)
+
     st.divider()
     # Головна розвилка логіки
     if len(building.rooms) > 0:
@@ -29,6 +31,20 @@ def _ensure_state():
         st.session_state.building = Building()
 
 
+def _render_history_controls(building):
+    """Кнопки скасування / повтору останньої правки."""
+    journal = building.journal
+    c_undo, c_redo = st.columns(2)
+    with c_undo:
+        if st.button("↩️ Скасувати", disabled=not journal.can_undo, width='stretch', key="plan_undo"):
+            building.undo()
+            st.rerun()
+    with c_redo:
+        if st.button("↪️ Повторити", disabled=not journal.can_redo, width='stretch', key="plan_redo"):
+            building.redo()
+            st.rerun()
+
+
 def _render_initial_setup(building):
     """
     Відображає форму створення першої кімнати (фундаменту).
@@ -94,17 +110,53 @@ def _render_main_workspace(building):
 
 def _render_plot(building):
     """Відповідає виключно за рендеринг Plotly графіка"""
-    fig = building.get_building_plan()
+    level = _select_level(building)
+    # Область перегляду: план будується лише для неї, тож при наближенні
+    # великого плану повертаються отвори, хітбокси та підписи
+    viewport = st.session_state.get("plan_viewport")
+    if viewport is None:
+        st.caption("Виділіть область інструментом Box Select, щоб наблизити її.")
+    elif st.button("🔍 Показати весь план", key="plan_reset_view"):
+        st.session_state.plan_viewport = None
+        st.rerun()
+
+    # Кешований план: повторний rerun без правок не перебудовує фігуру
+    fig = building.get_cached_building_plan(level, viewport=viewport)
     event = st.plotly_chart(
         fig,
         on_select="rerun",
-        selection_mode="points",
+        selection_mode=("points", "box"),
         width='stretch',
         key="room_selector"
     )
+
+    # Подія вибору лишається у віджеті між rerun-ами — застосовуємо лише нову рамку
+    box = _selected_box(event)
+    if box is not None and box != st.session_state.get("plan_box_seen"):
+        st.session_state.plan_box_seen = box
+        st.session_state.plan_viewport = box
+        st.rerun()
     return event
 
 
+def _selected_box(event):
+    """Рамка Box Select як (min_x, min_y, max_x, max_y) або None."""
+    if event and event.selection and event.selection.get("box"):
+        box = event.selection["box"][0]
+        xs, ys = box["x"], box["y"]
+        # Округлення: дрібні відмінності рамки не створюють нових кешів плану
+        return round(min(xs), 1), round(min(ys), 1), round(max(xs), 1), round(max(ys), 1)
+    return None
+
+
+def _select_level(building):
+    """Вибір поверху для плану; для одноповерхової будівлі — без віджета."""
+    levels = sorted({room.level for room in building.rooms.values()})
+    if len(levels) < 2:
+        return None
+    return st.selectbox("Поверх", options=levels, format_func=lambda lvl: f"Поверх {lvl}", key="plan_level")
+
+
 def _render_inspector_panel(building, event):
     """
     Ліва панель управління.
@@ -120,12 +172,15 @@ def _render_inspector_panel(building, event):
 
         # Глобальні дії
         if st.button("Видалити все", type="primary", width='stretch'):
-            st.session_state.building = Building()
+            building.clear()
             st.rerun()
 
 
 def _parse_selection(building, event):
     """Парсить подію Plotly і повертає об'єкт Room або None"""
+    # Рамка — це наближення, а не вибір кімнати
+    if _selected_box(event) is not None:
+        return None
     if event and event.selection and event.selection["points"]:
         point = event.selection["points"][0]
         if "customdata" in point:
@@ -175,7 +230,7 @@ def _render_room_details(building, room):
                     st.caption(device.description)
                 with c_btn:
                     if st.button("❌", key=f"rm_hvac_{device.id}"):
-                        room.remove_hvac(device.id)
+                        building.remove_hvac(room.id, device.id)
                         st.rerun()
     else:
         st.caption("Немає встановлених пристроїв (кімната пасивна)")
@@ -206,7 +261,7 @@ def _render_room_details(building, room):
                     efficiency=template.efficiency
                 )
 
-                room.add_hvac(new_device)
+                building.add_hvac(room.id, new_device)
                 st.success("Пристрій встановлено!")
                 st.rerun()
 
@@ -234,7 +289,7 @@ def _render_walls_list(building, room):
         if wid in building.walls:
             wall = building.walls[wid]
             direction = building.get_wall_direction(wid, room.id)
-            is_ext = len(wall.room_ids) == 1
+            is_ext = building.is_exterior_wall(wid)
             walls_data.append({
                 "obj": wall,
                 "dir": direction,
@@ -313,7 +368,7 @@ def _render_wall_card(building, room, item, dir_icons):
                             height=op_height
                         )
 
-                        w.add_opening(new_opening)
+                        building.add_opening(w.id, new_opening)
 
                         st.success(f"{tech.category} додано!")
                         st.rerun()
@@ -378,7 +433,7 @@ def _render_wall_card(building, room, item, dir_icons):
 
                 if st.form_submit_button("Застосувати"):
                     # Оновлюємо посилання на матеріал стіни
-                    w.base_material = MATERIALS[new_mat_key]
+                    building.set_wall_material(w.id, MATERIALS[new_mat_key])
                     st.success(f"Матеріал змінено на: {w.base_material.name}")
                     # Перезавантажуємо, щоб оновити колір на графіку і U-value в інфо
                     st.rerun()
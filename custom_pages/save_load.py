@@ -1,7 +1,31 @@
 import streamlit as st
+import io
 import json
 from building_serializer import BuildingSerializer
 
+MAX_SHOWN_PROBLEMS = 20
+
+
+# Формат експорту -> (назва, ім'я файлу, MIME)
+EXPORT_FORMATS = {
+    "json": ("JSON", "house_project.json", "application/json"),
+    "json_compact": ("JSON без відступів", "house_project.json", "application/json"),
+    "npz": ("NPZ (компактний бінарний)", "house_project.npz", "application/octet-stream"),
+}
+
+
+def _export_file(building, fmt: str) -> io.BytesIO:
+    """Файл експорту у форматі fmt (див. EXPORT_FORMATS) у пам'яті, готовий до читання."""
+    if fmt == "npz":
+        return io.BytesIO(BuildingSerializer.to_binary(building))
+    out = io.BytesIO()
+    # JSON пишеться потоково одразу в байти, без проміжного рядка
+    text = io.TextIOWrapper(out, encoding="utf-8", write_through=True)
+    BuildingSerializer.dump(building, text, compact=fmt == "json_compact")
+    text.detach()
+    out.seek(0)
+    return out
+
 
 def apply_load_callback(new_building_obj):
     st.session_state.building = new_building_obj
@@ -19,16 +43,25 @@ def render_save_load_controls():
             if "building" in st.session_state and st.session_state.building.rooms:
                 building = st.session_state.building
                 st.info(f"Кімнат: {len(building.rooms)} | Стін: {len(building.walls)}")
+                fmt = st.radio("Формат", options=list(EXPORT_FORMATS), horizontal=True,
+                               format_func=lambda key: EXPORT_FORMATS[key][0], key="export_format")
                 try:
-                    json_str = BuildingSerializer.to_json(building)
-                    st.download_button(
-                        label="Завантажити (.json)",
-                        data=json_str,
-                        file_name="house_project.json",
-                        mime="application/json",
-                        width='stretch',
-                        type="primary"
-                    )
+                    # Файл будується лише на запит і лише для цього rerun-у: у session_state
+                    # нічого не зберігається, наступний rerun (зміна будівлі тощо) його відпускає
+                    data = None
+                    if st.button("Підготувати файл", width='stretch', key="export_prepare"):
+                        data = _export_file(building, fmt)
+                    if data is not None:
+                        _, file_name, mime = EXPORT_FORMATS[fmt]
+                        st.download_button(
+                            label=f"Завантажити ({file_name})",
+                            data=data,
+                            file_name=file_name,
+                            mime=mime,
+                            on_click="ignore",  # завантаження не перезапускає сторінку
+                            width='stretch',
+                            type="primary"
+                        )
                 except Exception as e:
                     st.error(f"Помилка: {e}")
             else:
@@ -37,14 +70,26 @@ def render_save_load_controls():
     with col_load:
         with st.container(border=True):
             st.subheader("Імпорт")
-            uploaded_file = st.file_uploader("Оберіть файл", type=["json"], label_visibility="collapsed")
+            uploaded_file = st.file_uploader("Оберіть файл", type=["json", "npz"], label_visibility="collapsed")
 
             if uploaded_file is not None:
                 try:
-                    json_data = uploaded_file.getvalue().decode("utf-8")
-                    loaded_building = BuildingSerializer.from_json(json_data)
+                    if uploaded_file.name.endswith(".npz"):
+                        loaded_building = BuildingSerializer.from_binary(uploaded_file.getvalue())
+                    else:
+                        json_data = uploaded_file.getvalue().decode("utf-8")
+                        loaded_building = BuildingSerializer.from_json(json_data)
 
-                    st.success("Файл валідний!")
+                    # Файл міг бути змінений вручну — перевіряємо всю топологію одразу
+                    report = loaded_building.validate()
+                    if report.is_valid:
+                        st.success("Файл валідний!")
+                    else:
+                        messages = report.messages()
+                        shown = "\n".join(f"- {msg}" for msg in messages[:MAX_SHOWN_PROBLEMS])
+                        if len(messages) > MAX_SHOWN_PROBLEMS:
+                            shown += f"\n- ... та ще {len(messages) - MAX_SHOWN_PROBLEMS}"
+                        st.warning(f"У файлі знайдено проблеми з геометрією:\n\n{shown}")
                     st.markdown(f"**Знайдено:** {len(loaded_building.rooms)} кімнат.")
                     st.divider()
 
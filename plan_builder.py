@@ -0,0 +1,135 @@
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+from building import Building
+from bulding_compounds.material import Material
+from bulding_compounds.room import Room
+from bulding_compounds.wall import Wall, geometry_key, GEOMETRY_TOLERANCE
+from bulding_compounds.custom_errors import RoomOverlapError, FrozenBuildingError
+from bulding_compounds.journal import Operation
+
+
+@dataclass
+class RoomFootprint:
+    """Прямокутний контур кімнати: лівий нижній кут (x, y) та розміри по X / Y."""
+    x: float
+    y: float
+    width: float
+    length: float
+    name: str = "Room"
+    height: Optional[float] = None  # None — висота, передана в build_rooms
+    level: int = 0  # поверх
+
+
+def build_rooms(building: Building, footprints: Iterable[RoomFootprint], height: float,
+                material: Material) -> List[Room]:
+    """
+    Додає до будівлі багато прямокутних кімнат за один прохід.
+    Спільні стіни (однакові відрізки, у тому числі з уже наявними стінами) створюються один раз.
+    Перевірка топології виконується один раз у кінці; якщо нові стіни перетинаються
+    неправильно — усі зміни відкочуються і кидається RoomOverlapError.
+    Успішна побудова записується в журнал правок однією операцією (building.undo() скасовує її всю).
+    """
+    if building.is_snapshot:
+        raise FrozenBuildingError("Знімок будівлі не можна змінювати")
+    new_rooms: List[Room] = []
+    new_wall_ids: List[str] = []
+    # Стіни, створені в цьому виклику, за ключем геометрії
+    created = {}
+    # Наявні стіни, до яких додано кімнату: (стіна, id кімнати)
+    linked: List[Tuple[Wall, str]] = []
+    # Квантована точка -> перші побачені координати: сусідні кімнати ділять точно ті самі кути,
+    # навіть якщо x + width дає похибку округлення
+    points = {}
+
+    def snap(x: float, y: float, level: int) -> Tuple[float, float]:
+        return points.setdefault((level, round(x / GEOMETRY_TOLERANCE), round(y / GEOMETRY_TOLERANCE)), (x, y))
+
+    try:
+        # Спершу будуємо все в пам'яті, в будівлю стіни потрапляють одним блоком
+        for fp in footprints:
+            room_height = fp.height if fp.height is not None else height
+            room = Room(fp.name, fp.width, fp.length, room_height, fp.x, fp.y, wall_ids=[], level=fp.level)
+            x1, y1 = fp.x, fp.y
+            x2, y2 = fp.x + fp.width, fp.y + fp.length
+            # S, E, N, W — як у create_initial_room
+            corners = [snap(x1, y1, fp.level), snap(x2, y1, fp.level), snap(x2, y2, fp.level), snap(x1, y2, fp.level)]
+            for i in range(4):
+                (sx, sy), (ex, ey) = corners[i], corners[(i + 1) % 4]
+                key = geometry_key(sx, sy, ex, ey, fp.level)
+                wall = created.get(key)
+                if wall is None:
+                    wall = building.find_wall_by_geometry_key(key)
+                    if wall is not None:
+                        # Наявна стіна змінюється — її власна версія, не спільна зі знімком
+                        wall = building.mutable_wall(wall.id)
+                        linked.append((wall, room.id))
+                if wall is None:
+                    wall = Wall(sx, sy, ex, ey, room_height, material, level=fp.level)
+                    created[key] = wall
+                    new_wall_ids.append(wall.id)
+                if len(wall.room_ids) >= 2:
+                    raise RoomOverlapError(f"Неможливо створити кімнату {fp.name}: стіна вже має дві кімнати")
+                wall.room_ids.append(room.id)
+                room.wall_ids.append(wall.id)
+            new_rooms.append(room)
+
+        for wall in created.values():
+            building.walls[wall.id] = wall
+        for wall, _ in linked:
+            building.walls[wall.id] = wall  # оновлює суміжність наявної стіни
+        for room in new_rooms:
+            building.rooms[room.id] = room
+
+        report = building.validate().restricted_to(new_wall_ids + [w.id for w, _ in linked])
+        if not report.is_valid:
+            raise RoomOverlapError("Неможливо створити кімнати: " + "; ".join(report.messages()[:5]))
+    except Exception:
+        _rollback(building, new_rooms, new_wall_ids, [(wall.id, room_id) for wall, room_id in linked])
+        raise
+
+    new_walls = [building.walls[wid] for wid in new_wall_ids]
+    links = [(wall.id, room_id) for wall, room_id in linked]
+
+    def undo():
+        _rollback(building, new_rooms, new_wall_ids, links)
+
+    def redo():
+        for wall in new_walls:
+            building.walls[wall.id] = wall
+        for wall_id, room_id in links:
+            wall = building.mutable_wall(wall_id)
+            wall.room_ids.append(room_id)
+            building.walls[wall_id] = wall  # оновлює суміжність
+        for room in new_rooms:
+            building.rooms[room.id] = room
+
+    building.journal.record(Operation(f"Додати кімнати ({len(new_rooms)})", undo, redo))
+    return new_rooms
+
+
+def build_room_grid(building: Building, rows: int, cols: int, cell_width: float, cell_length: float,
+                    height: float, material: Material, origin: Tuple[float, float] = (0.0, 0.0),
+                    name_prefix: str = "Room", level: int = 0) -> List[List[Room]]:
+    """Сітка rows x cols однакових кімнат. Повертає кімнати по рядках (знизу вгору)."""
+    if rows <= 0 or cols <= 0:
+        raise ValueError(f"Grid size must be > 0. Got: {rows}x{cols}")
+    ox, oy = origin
+    footprints = [RoomFootprint(ox + c * cell_width, oy + r * cell_length, cell_width, cell_length,
+                                f"{name_prefix} {r + 1}-{c + 1}", level=level)
+                  for r in range(rows) for c in range(cols)]
+    rooms = build_rooms(building, footprints, height, material)
+    return [rooms[r * cols:(r + 1) * cols] for r in range(rows)]
+
+
+def _rollback(building: Building, rooms: List[Room], wall_ids: List[str], linked: List[Tuple[str, str]]):
+    """Прибирає додані кімнати та стіни; linked — пари (id наявної стіни, id доданої кімнати)."""
+    for wall_id, room_id in linked:
+        if room_id in building.walls[wall_id].room_ids:
+            # Власна копія стіни, якщо оригінал є в знімку
+            wall = building.mutable_wall(wall_id)
+            wall.room_ids.remove(room_id)
+            building.walls[wall_id] = wall  # оновлює індекси
+    for wid in wall_ids:
+        building.walls.pop(wid, None)
+    for room in rooms:
+        building.rooms.pop(room.id, None)
@@ -0,0 +1,45 @@
+from typing import List, Iterable
+from building import Building
+
+
+def find_room_components(building: Building) -> List[List[str]]:
+    """
+    Розбиває кімнати на зв'язні компоненти графа суміжності
+    (кімнати зв'язані спільною стіною або перекриттям).
+    Кімнати з різних компонент термічно незалежні: їх єднає лише вулиця.
+    Порядок компонент і кімнат всередині — як у building.rooms.
+    """
+    order = {rid: i for i, rid in enumerate(building.rooms)}
+    seen = set()
+    components: List[List[str]] = []
+    for rid in building.rooms:
+        if rid in seen:
+            continue
+        # Обхід у ширину по готовому графу суміжності будівлі
+        seen.add(rid)
+        queue = [rid]
+        for current in queue:
+            neighbours = building.get_adjacent_room_ids(current) + list(building.get_room_slabs(current).values())
+            for neighbour in neighbours:
+                if neighbour in order and neighbour not in seen:
+                    seen.add(neighbour)
+                    queue.append(neighbour)
+        components.append(sorted(queue, key=order.__getitem__))
+    return components
+
+
+def extract_component(building: Building, room_ids: Iterable[str]) -> Building:
+    """
+    Створює під-будівлю з вказаних кімнат, їхніх стін та перекриттів.
+    Об'єкти не копіюються — під-будівля посилається на ті ж стіни та кімнати.
+    """
+    sub = Building()
+    for rid in room_ids:
+        room = building.rooms[rid]
+        sub.rooms[rid] = room
+        for wid in room.wall_ids:
+            if wid in building.walls:
+                sub.walls[wid] = building.walls[wid]
+        for slab_id in building.get_room_slabs(rid):
+            sub.slabs[slab_id] = building.slabs[slab_id]
+    return sub
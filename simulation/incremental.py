@@ -0,0 +1,130 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+from building import Building
+from simulation.controls import RoomControlProfile
+from simulation.thermal_sim import ThermalSimulation, PARALLEL_MIN_COMPONENTS
+from simulation.components import find_room_components, extract_component
+from simulation.result_cache import ResultCache, SimulationResult, make_cache_key
+
+
+@dataclass
+class IncrementalRun:
+    """Результат інкрементального запуску та інформація, що саме перераховано."""
+    result: SimulationResult
+    components: List[List[str]]
+    recomputed: List[List[str]]
+
+
+def run_incremental(cache: ResultCache, building: Building, profiles: Dict[str, RoomControlProfile],
+                    start_temp: float, t_min: float, t_max: float, internal_gain: float,
+                    duration_hours: float, dt_seconds: int = 60, chunks: int = 1,
+                    on_progress: Optional[Callable[[float], None]] = None,
+                    workers: Optional[int] = None) -> IncrementalRun:
+    """
+    Симулює будівлю по зв'язних компонентах графа кімнат.
+    Кожна компонента має власний ключ кешу (її стіни, кімнати, профілі та параметри),
+    тому після зміни налаштувань однієї кімнати перераховується лише її компонента.
+    chunks — на скільки частин ділити прогін (для оновлення прогресу).
+    workers — як у ThermalSimulation.run_simulation: якщо перерахувати треба не менше
+    PARALLEL_MIN_COMPONENTS компонент, вони рахуються в окремих процесах
+    (прогрес тоді оновлюється по завершених компонентах).
+    """
+    if chunks <= 0:
+        raise ValueError(f"chunks must be > 0. Got: {chunks}")
+
+    options = dict(start_temp=start_temp, t_min=t_min, t_max=t_max, internal_gain=internal_gain,
+                   duration_hours=duration_hours, dt_seconds=dt_seconds, chunks=chunks)
+
+    components = find_room_components(building)
+    results: List[Optional[SimulationResult]] = [None] * len(components)
+    # (індекс компоненти, ключ кешу, під-будівля, профілі) — що треба перерахувати
+    pending = []
+
+    for index, room_ids in enumerate(components):
+        sub = extract_component(building, room_ids)
+        sub_profiles = {rid: profiles[rid] for rid in room_ids if rid in profiles}
+        key = make_cache_key(sub, sub_profiles, **options)
+        results[index] = cache.get(key)
+        if results[index] is None:
+            pending.append((index, key, sub, sub_profiles))
+
+    done = len(components) - len(pending)
+    if on_progress and done:
+        on_progress(done / len(components))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers > 1 and len(pending) >= PARALLEL_MIN_COMPONENTS:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+            futures = {pool.submit(_simulate_component, sub, sub_profiles, options): (index, key)
+                       for index, key, sub, sub_profiles in pending}
+            for future in as_completed(futures):
+                index, key = futures[future]
+                results[index] = future.result()
+                cache.put(key, results[index])
+                done += 1
+                if on_progress:
+                    on_progress(done / len(components))
+    else:
+        def on_chunk(fraction):
+            if on_progress:
+                on_progress((done + fraction) / len(components))
+
+        for index, key, sub, sub_profiles in pending:
+            results[index] = _simulate_component(sub, sub_profiles, options, on_chunk)
+            cache.put(key, results[index])
+            done += 1
+
+    return IncrementalRun(
+        result=merge_results(building, results),
+        components=components,
+        recomputed=[components[index] for index, *_ in pending],
+    )
+
+
+def _simulate_component(sub: Building, profiles: Dict[str, RoomControlProfile], options: dict,
+                        on_chunk: Optional[Callable[[float], None]] = None) -> SimulationResult:
+    """Прогін однієї компоненти частинами (виконується і в процесі-воркері)."""
+    chunks = options["chunks"]
+    duration_hours = options["duration_hours"]
+    dt_seconds = options["dt_seconds"]
+    sim = ThermalSimulation(sub)
+    sim.initialize(start_temp=options["start_temp"], profiles=profiles, t_min=options["t_min"],
+                   t_max=options["t_max"], internal_gain=options["internal_gain"])
+    # Проріджування історії — на весь прогін, а не на кожну частину окремо
+    sim.plan_history(duration_hours, dt_seconds)
+    for chunk in range(chunks):
+        # Одна компонента — процеси всередині не потрібні
+        sim.run_simulation(duration_hours=duration_hours / chunks, dt_seconds=dt_seconds, workers=1)
+        if on_chunk:
+            on_chunk((chunk + 1) / chunks)
+    return SimulationResult.from_simulation(sim)
+
+
+def merge_results(building: Building, results: List[SimulationResult]) -> SimulationResult:
+    """
+    Зводить результати незалежних компонент в один (кімнати — в порядку building.rooms).
+    Час та вулична температура однакові для всіх компонент.
+    """
+    if not results:
+        return SimulationResult([], [], {}, {}, {}, 0.0)
+
+    temps, energy, current = {}, {}, {}
+    for result in results:
+        temps.update(result.history_temps)
+        energy.update(result.total_energy_kwh)
+        current.update(result.current_temperatures)
+
+    order = [rid for rid in building.rooms if rid in temps]
+    first = results[0]
+    return SimulationResult(
+        history_time=list(first.history_time),
+        history_outdoor=list(first.history_outdoor),
+        history_temps={rid: temps[rid] for rid in order},
+        total_energy_kwh={rid: energy[rid] for rid in order},
+        current_temperatures={rid: current[rid] for rid in order},
+        current_time_sec=first.current_time_sec,
+    )
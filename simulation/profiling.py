@@ -0,0 +1,102 @@
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Dict
+
+# Фази кроку симуляції, які вимірюються
+PHASES = ("weather", "transmission", "hvac", "mass", "history")
+
+
+@dataclass
+class PhaseStats:
+    calls: int = 0
+    total_sec: float = 0.0
+
+    @property
+    def mean_sec(self) -> float:
+        return self.total_sec / self.calls if self.calls else 0.0
+
+
+@dataclass
+class ProfileReport:
+    """
+    Структурований звіт профілювання симуляції.
+    Прогін з відстеженням алокацій (tracemalloc) окремий: у ньому є лише кількість викликів
+    і пам'ять, час фаз не вимірюється (tracemalloc його спотворює).
+    """
+    phases: Dict[str, PhaseStats]
+    steps: int
+    wall_time_sec: float
+    allocated_bytes: int  # приріст пам'яті за час прогонів
+    peak_allocated_bytes: int
+    allocations_tracked: bool = False
+
+    @property
+    def steps_per_second(self) -> float:
+        return self.steps / self.wall_time_sec if self.wall_time_sec > 0 else 0.0
+
+    def summary(self) -> str:
+        """Текстова таблиця для логів / консолі."""
+        if self.allocations_tracked:
+            lines = [f"Кроків: {self.steps} | пам'ять: +{self.allocated_bytes} Б (пік {self.peak_allocated_bytes} Б)"]
+            lines += [f"  {name:<13} {stats.calls:>9} викл." for name, stats in self.phases.items()]
+            return "\n".join(lines)
+        lines = [f"Кроків: {self.steps} | {self.steps_per_second:.1f} кроків/с | час: {self.wall_time_sec:.3f} с"]
+        for name, stats in self.phases.items():
+            share = stats.total_sec / self.wall_time_sec * 100 if self.wall_time_sec > 0 else 0.0
+            lines.append(f"  {name:<13} {stats.calls:>9} викл. {stats.total_sec:>9.4f} с ({share:5.1f}%)")
+        return "\n".join(lines)
+
+
+@dataclass
+class SimulationProfiler:
+    """
+    Накопичує час та кількість викликів по фазах кроку.
+    Створюється лише коли профілювання увімкнене — інакше симуляція його не торкається.
+    track_allocations: окремий прохід з tracemalloc — рахує пам'ять і виклики,
+    але не час (під трасуванням він не відповідає звичайному прогону).
+    """
+    track_allocations: bool = False
+    phases: Dict[str, PhaseStats] = field(default_factory=lambda: {name: PhaseStats() for name in PHASES})
+    steps: int = 0
+    wall_time_sec: float = 0.0
+    allocated_bytes: int = 0
+    peak_allocated_bytes: int = 0
+    _run_started: float = field(default=0.0, init=False, repr=False)
+    _mem_started: int = field(default=0, init=False, repr=False)
+    _owns_tracing: bool = field(default=False, init=False, repr=False)
+
+    def add(self, phase: str, seconds: float):
+        stats = self.phases[phase]
+        stats.calls += 1
+        if not self.track_allocations:
+            stats.total_sec += seconds
+
+    def start_run(self):
+        if self.track_allocations:
+            self._owns_tracing = not tracemalloc.is_tracing()
+            if self._owns_tracing:
+                tracemalloc.start()
+            self._mem_started = tracemalloc.get_traced_memory()[0]
+        self._run_started = time.perf_counter()
+
+    def stop_run(self):
+        if not self.track_allocations:
+            self.wall_time_sec += time.perf_counter() - self._run_started
+        else:
+            current, peak = tracemalloc.get_traced_memory()
+            self.allocated_bytes += current - self._mem_started
+            self.peak_allocated_bytes = max(self.peak_allocated_bytes, peak - self._mem_started)
+            if self._owns_tracing:
+                tracemalloc.stop()
+                self._owns_tracing = False
+
+    def report(self) -> ProfileReport:
+        return ProfileReport(
+            phases={name: PhaseStats(s.calls, s.total_sec) for name, s in self.phases.items()},
+            steps=self.steps,
+            wall_time_sec=self.wall_time_sec,
+            allocated_bytes=self.allocated_bytes,
+            peak_allocated_bytes=self.peak_allocated_bytes,
+            allocations_tracked=self.track_allocations,
+        )
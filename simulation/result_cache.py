@@ -0,0 +1,193 @@
+import os
+import json
+import hashlib
+import tempfile
+import dataclasses
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any
+from building_serializer import BuildingSerializer
+from simulation.controls import RoomControlProfile
+
+# Спільна для всіх процесів на машині директорія з результатами
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "building_thermal_cache")
+DEFAULT_MAX_ENTRIES = 32
+# Скільки файлів тримати на диску; найдавніше використані видаляються
+DEFAULT_MAX_DISK_ENTRIES = 256
+# Версія фізичної моделі / розв'язувача. Збільшувати при зміні формул симуляції,
+# щоб старі результати (зокрема на диску) не використовувались
+ENGINE_VERSION = 1
+
+
+def make_cache_key(building, profiles: Dict[str, RoomControlProfile], **options: Any) -> str:
+    """
+    Детермінований хеш вмісту: будівля + профілі кімнат + погода та параметри розв'язувача.
+    Однакові вхідні дані завжди дають однаковий ключ (незалежно від процесу чи порядку словників).
+    До ключа входить ENGINE_VERSION — нова версія моделі не бачить старих результатів.
+    """
+    payload = {
+        "engine": ENGINE_VERSION,
+        "building": BuildingSerializer.to_dict(building),
+        "profiles": {rid: dataclasses.asdict(p) for rid, p in profiles.items()},
+        "options": options,
+    }
+    # sort_keys + компактні роздільники = канонічне представлення
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class SimulationResult:
+    """Знімок завершеної симуляції (все, що потрібно для графіків та звітів)."""
+    history_time: List[float]
+    history_outdoor: List[float]
+    history_temps: Dict[str, List[float]]
+    total_energy_kwh: Dict[str, float]
+    current_temperatures: Dict[str, float]
+    current_time_sec: float
+
+    @classmethod
+    def from_simulation(cls, sim) -> "SimulationResult":
+        return cls(
+            history_time=list(sim.history_time),
+            history_outdoor=list(sim.history_outdoor),
+            history_temps={rid: list(temps) for rid, temps in sim.history_temps.items()},
+            total_energy_kwh=dict(sim.total_energy_kwh),
+            current_temperatures=dict(sim.current_temperatures),
+            current_time_sec=sim.current_time_sec,
+        )
+
+    def apply_to(self, sim):
+        """Переносить збережений стан у симуляцію (замість повторного обрахунку)."""
+        sim.history_time = list(self.history_time)
+        sim.history_outdoor = list(self.history_outdoor)
+        sim.history_temps = {rid: list(temps) for rid, temps in self.history_temps.items()}
+        sim.total_energy_kwh = dict(self.total_energy_kwh)
+        sim.current_temperatures = dict(self.current_temperatures)
+        sim.current_time_sec = self.current_time_sec
+
+
+class ResultCache:
+    """
+    Дворівневий кеш результатів: LRU в пам'яті + файли на диску.
+    Запис на диск атомарний (tmp-файл + os.replace), тому директорію
+    можуть одночасно використовувати кілька воркерів.
+    Диск теж обмежений (max_disk_entries): час використання файлу — його mtime,
+    після запису найстаріші файли понад ліміт видаляються.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                 max_disk_entries: int = DEFAULT_MAX_DISK_ENTRIES):
+        if max_entries <= 0:
+            raise ValueError(f"max_entries must be > 0. Got: {max_entries}")
+        if max_disk_entries <= 0:
+            raise ValueError(f"max_disk_entries must be > 0. Got: {max_disk_entries}")
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.cache_dir = cache_dir
+        self._memory: "OrderedDict[str, SimulationResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[SimulationResult]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        result = self._load_from_disk(key)
+        if result is not None:
+            self._remember(key, result)
+        return result
+
+    def put(self, key: str, result: SimulationResult):
+        self._remember(key, result)
+        self._save_to_disk(key, result)
+
+    def clear(self):
+        """Очищує пам'ять та файли цього кешу."""
+        with self._lock:
+            self._memory.clear()
+        if self.cache_dir and os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".json"):
+                    try:
+                        os.remove(os.path.join(self.cache_dir, name))
+                    except OSError:
+                        pass  # файл вже прибрав інший воркер
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            if key in self._memory:
+                return True
+        return bool(self.cache_dir) and os.path.exists(self._path(key))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._memory)
+
+    def _remember(self, key: str, result: SimulationResult):
+        with self._lock:
+            self._memory[key] = result
+            self._memory.move_to_end(key)
+            # Викидаємо найдавніше використані записи
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _load_from_disk(self, key: str) -> Optional[SimulationResult]:
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = SimulationResult(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            # Немає файлу або він пошкоджений — вважаємо промахом
+            return None
+        try:
+            os.utime(path)  # позначаємо як нещодавно використаний
+        except OSError:
+            pass  # файл щойно видалив інший воркер
+        return result
+
+    def _save_to_disk(self, key: str, result: SimulationResult):
+        if not self.cache_dir:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(dataclasses.asdict(result), f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """Видаляє найдавніше використані файли понад max_disk_entries."""
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".json"):
+                        try:
+                            entries.append((entry.stat().st_mtime, entry.path))
+                        except OSError:
+                            pass
+        except OSError:
+            return
+        if len(entries) <= self.max_disk_entries:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # файл вже прибрав інший воркер
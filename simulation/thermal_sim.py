@@ -1,18 +1,67 @@
 from building import Building
 from bulding_compounds.room import Room
 import plotly.graph_objects as go
-from typing import Dict, List
+from typing import Dict, List, Optional
 from simulation.controls import RoomControlProfile, ControlMode
+from simulation.components import find_room_components, extract_component
+from simulation.profiling import SimulationProfiler, ProfileReport
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from array import array
+import numpy as np
 import math
+import os
 # Константи фізики
 AIR_DENSITY = 1.225  # кг/м³
 AIR_SPECIFIC_HEAT = 1005  # Дж/(кг·К)
 WALL_MASS_FACTOR = 0.5  # Яка частина маси стіни бере участь в інерції (внутрішня половина)
 
+# Паралельний прогін має сенс лише коли незалежних зон достатньо багато
+PARALLEL_MIN_COMPONENTS = 4
+
+# Скільки байт займає одна точка історії:
+# float64 — елемент списку (вказівник 8 + об'єкт float 24), float32 — елемент array('f')
+HISTORY_BYTES_PER_SAMPLE = {"float64": 32, "float32": 4}
+# Час зберігається завжди з подвійною точністю (у float32 ~24 біти мантиси —
+# на довгих прогонах сусідні моменти часу злипаються): у режимі float32 це array('d')
+TIME_BYTES_PER_SAMPLE = {"float64": 32, "float32": 8}
+
+
+def _round_f32(value: float) -> float:
+    """Округлює число до точності float32."""
+    return array("f", (value,))[0]
+
 
 class ThermalSimulation:
-    def __init__(self, building):
+    def __init__(self, building, precision: str = "float64", memory_budget: Optional[int] = None,
+                 profile: bool = False, profile_allocations: bool = False):
+        """
+        precision: "float64" (списки Python) або "float32" (компактні array('f') для історії,
+                   температури кімнат округлюються до float32 після кожного кроку).
+        memory_budget: ліміт пам'яті на історію в байтах. Якщо прогін його перевищить,
+                   історія автоматично проріджується (записується кожен N-й крок).
+        profile: вмикає заміри часу по фазах кроку (див. get_profile_report).
+        profile_allocations: окремий прохід профілювання пам'яті (tracemalloc) — лише виклики
+                   та алокації, без часу фаз. Разом з profile не вмикається.
+        """
+        if precision not in HISTORY_BYTES_PER_SAMPLE:
+            raise ValueError(f"Unknown precision '{precision}'. Use one of: {list(HISTORY_BYTES_PER_SAMPLE)}")
+        if memory_budget is not None and memory_budget <= 0:
+            raise ValueError(f"memory_budget must be > 0. Got: {memory_budget}")
+        if profile and profile_allocations:
+            raise ValueError("profile and profile_allocations are separate passes; enable only one")
+
         self.building = building
+        self.precision = precision
+        self.memory_budget = memory_budget
+        # Записуємо в історію кожен history_stride-й крок
+        self.history_stride = 1
+        self._steps_done = 0
+        # Загальна кількість кроків прогону (plan_history), з неї рахується проріджування
+        self._planned_steps = 0
+        self.profiler: Optional[SimulationProfiler] = None
+        if profile or profile_allocations:
+            self.profiler = SimulationProfiler(track_allocations=profile_allocations)
 
         self.t_min_outdoor = -5.0
         self.t_max_outdoor = 0.0
@@ -25,9 +74,21 @@ class ThermalSimulation:
         self.current_time_sec = 0.0
 
         # Історія (ініціалізуємо порожніми списками для існуючих кімнат)
-        self.history_temps: Dict[str, List[float]] = {rid: [] for rid in building.rooms}
-        self.history_outdoor: List[float] = []
-        self.history_time: List[float] = []
+        self.history_temps: Dict[str, List[float]] = {rid: self._new_series() for rid in building.rooms}
+        self.history_outdoor: List[float] = self._new_series()
+        self.history_time: List[float] = self._new_time_series()
+
+    def _new_series(self, values=()):
+        """Контейнер для часового ряду відповідно до обраної точності."""
+        if self.precision == "float32":
+            return array("f", values)
+        return list(values)
+
+    def _new_time_series(self, values=()):
+        """Контейнер для моментів часу: завжди float64 (компактний array('d') у режимі float32)."""
+        if self.precision == "float32":
+            return array("d", values)
+        return list(values)
 
     def initialize(self, start_temp: float, profiles: Dict[str, 'RoomControlProfile'],
                    t_min: float, t_max: float, internal_gain: float = 200.0):
@@ -50,6 +111,9 @@ class ThermalSimulation:
 
         # --- 2. СКИДАННЯ СТАНУ ---
         self.current_time_sec = 0.0
+        self._steps_done = 0
+        self._planned_steps = 0
+        self.history_stride = 1
         self.t_min_outdoor = t_min
         self.t_max_outdoor = t_max
         self.internal_heat_gain = internal_gain
@@ -59,19 +123,22 @@ class ThermalSimulation:
         self.total_energy_kwh = {rid: 0.0 for rid in self.building.rooms}
 
         # Скидаємо історію (починаємо з чистого аркуша)
-        self.history_time = [0.0]
+        self.history_time = self._new_time_series([0.0])
 
         # Температура вулиці на старті
         initial_outdoor = self._get_current_outdoor_temp()
-        self.history_outdoor = [initial_outdoor]
+        self.history_outdoor = self._new_series([initial_outdoor])
 
         # Ініціалізуємо температури кімнат
         self.current_temperatures = {}
         self.history_temps = {}
 
+        if self.precision == "float32":
+            start_temp = _round_f32(start_temp)
+
         for room_id in self.building.rooms:
             self.current_temperatures[room_id] = start_temp
-            self.history_temps[room_id] = [start_temp]
+            self.history_temps[room_id] = self._new_series([start_temp])
 
     def _get_current_outdoor_temp(self) -> float:
         """
@@ -110,37 +177,46 @@ class ThermalSimulation:
             if wid in self.building.walls:
                 wall = self.building.walls[wid]
                 mat = wall.base_material
+                # Стіна без матеріалу не має теплоємності (як і теплопередачі)
+                if mat is None: continue
 
-                # Маса стіни = Об'єм * Щільність
-                # Об'єм = Довжина * Висота * Товщина (з матеріалу)
-                # Треба брати чисту площу (без вікон)
-                wall_volume = wall.area_net * mat.thickness
-                wall_mass = wall_volume * mat.density
-
-                # Теплоємність цієї стіни = Mass * specific_heat
+                # Теплоємність стіни = чиста площа (без вікон) * теплоємність 1 м² матеріалу
+                # (щільність * товщина * питома теплоємність, кешується в матеріалі).
                 # Множимо на фактор (наприклад 0.5), бо гріється не вся стіна миттєво
-                c_walls += wall_mass * mat.specific_heat * WALL_MASS_FACTOR
+                c_walls += wall.area_net * mat.thermal_mass * WALL_MASS_FACTOR
 
         total_c = c_air + c_walls
         return max(total_c, 1000.0)  # Захист від ділення на нуль
 
     def _calculate_transmission_heat_flow(self, room: Room, current_temp: float, outdoor_temp: float) -> float:
         heat_flow = 0.0
+        walls = self.building.walls
+        # Сусіди кімнати беруться з готового графа суміжності будівлі
+        neighbours = self.building.get_room_adjacency(room.id)
         for wid in room.wall_ids:
-            if wid not in self.building.walls: continue
-            wall = self.building.walls[wid]
+            wall = walls.get(wid)
+            if wall is None: continue
 
             # Визначаємо сусідню температуру
             t_neighbor = outdoor_temp
 
-            if len(wall.room_ids) == 2:
-                other_id = wall.room_ids[0] if wall.room_ids[1] == room.id else wall.room_ids[1]
+            other_id = neighbours.get(wid)
+            if other_id is not None:
                 t_neighbor = self.current_temperatures.get(other_id, outdoor_temp)
 
             dt = t_neighbor - current_temp
-            heat_flow += wall.base_material.U * wall.area_net * dt
-            for op in wall.openings:
-                heat_flow += op.tech.U * op.area * dt
+            # UA стіни разом з отворами кешується на самій стіні
+            heat_flow += wall.total_ua * dt
+
+        # Перекриття: обмін теплом з кімнатами поверхом вище / нижче
+        slabs = self.building.slabs
+        for slab_id, other_id in self.building.get_room_slabs(room.id).items():
+            t_other = self.current_temperatures.get(other_id)
+            if t_other is None: continue
+            slab = slabs[slab_id]
+            # Перекриття без матеріалу не проводить тепло (як стіна без матеріалу)
+            if slab.material is None: continue
+            heat_flow += slab.material.U * slab.area * (t_other - current_temp)
         return heat_flow
 
     def _calculate_hvac_power(self, room: Room, current_temp: float) -> float:
@@ -207,9 +283,21 @@ class ThermalSimulation:
         return total_power
 
     def step(self, dt_seconds: float):
+        # Профайлер є лише при profile=True; без нього — лише перевірки на None
+        prof = self.profiler
+        if prof is not None:
+            t0 = perf_counter()
+
         # Визначаємо погоду зараз
         current_outdoor = self._get_current_outdoor_temp()
-        self.history_outdoor.append(current_outdoor)
+        if prof is not None:
+            prof.add("weather", perf_counter() - t0)
+
+        # При проріджуванні історії записуємо лише кроки, що закінчуються на кратному
+        # history_stride номері: точки рівномірні від стартової (час 0)
+        record = (self._steps_done + 1) % self.history_stride == 0
+        if record:
+            self.history_outdoor.append(current_outdoor)
 
         temp_changes = {}
 
@@ -217,8 +305,15 @@ class ThermalSimulation:
             current_t = self.current_temperatures[room_id]
 
             # Потоки (Втрати + HVAC + Люди)
+            if prof is not None:
+                t0 = perf_counter()
             q_transmission = self._calculate_transmission_heat_flow(room, current_t, current_outdoor)
+            if prof is not None:
+                t1 = perf_counter()
+                prof.add("transmission", t1 - t0)
             q_hvac = self._calculate_hvac_power(room, current_t)
+            if prof is not None:
+                prof.add("hvac", perf_counter() - t1)
 
             # Power (W) * Time (h) / 1000 = kWh
             # Беремо модуль, бо охолодження теж витрачає електрику
@@ -228,32 +323,185 @@ class ThermalSimulation:
             # Сумарний потік: Стіни + Обігрів + Побутове тепло
             q_total = q_transmission + q_hvac + self.internal_heat_gain
 
+            if prof is not None:
+                t0 = perf_counter()
             c_mass = self._calculate_room_thermal_mass(room)
+            if prof is not None:
+                prof.add("mass", perf_counter() - t0)
             delta_t = (q_total * dt_seconds) / c_mass
             temp_changes[room_id] = delta_t
 
+        if prof is not None:
+            t0 = perf_counter()
+
         self.current_time_sec += dt_seconds
-        self.history_time.append(self.current_time_sec / 3600.0)
+        self._steps_done += 1
+        if record:
+            self.history_time.append(self.current_time_sec / 3600.0)
 
+        is_f32 = self.precision == "float32"
         for rid, change in temp_changes.items():
-            self.current_temperatures[rid] += change
-            self.history_temps[rid].append(self.current_temperatures[rid])
-
-    def run_simulation(self, duration_hours: int, dt_seconds: int = 60):
+            new_t = self.current_temperatures[rid] + change
+            if is_f32:
+                new_t = _round_f32(new_t)
+            self.current_temperatures[rid] = new_t
+            if record:
+                self.history_temps[rid].append(new_t)
+
+        if prof is not None:
+            prof.add("history", perf_counter() - t0)
+            prof.steps += 1
+
+    def run_simulation(self, duration_hours: int, dt_seconds: int = 60, workers: Optional[int] = None):
         """
         Запускає цикл на заданий час.
+        Термічно незалежні зони будівлі (зв'язні компоненти графа кімнат) рахуються в окремих
+        процесах, якщо їх не менше PARALLEL_MIN_COMPONENTS; інакше — послідовно.
+        workers: кількість процесів (None — всі ядра, 1 — завжди послідовно).
+        Результат зводиться у звичайні history_temps / total_energy_kwh.
         """
         steps = int((duration_hours * 3600) / dt_seconds)
+        self._apply_memory_budget(steps)
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        # Профілюється лише послідовний цикл (заміри з процесів-воркерів не збираються)
+        if self.profiler is not None:
+            self.profiler.start_run()
+            for _ in range(steps):
+                self.step(dt_seconds)
+            self.profiler.stop_run()
+            return
+
+        if workers > 1:
+            components = find_room_components(self.building)
+            if len(components) >= PARALLEL_MIN_COMPONENTS:
+                self._run_parallel(components, steps, dt_seconds, workers)
+                return
+
         for _ in range(steps):
             self.step(dt_seconds)
 
+    def get_profile_report(self) -> Optional[ProfileReport]:
+        """Звіт профілювання або None, якщо симуляцію створено без profile=True."""
+        if self.profiler is None:
+            return None
+        return self.profiler.report()
+
+    def room_vector(self, values: Dict[str, float]) -> np.ndarray:
+        """
+        Словник за id кімнат (current_temperatures, total_energy_kwh) як масив
+        за номерами building.room_numbers; NaN — вільні номери та кімнати без значення.
+        """
+        numbers = self.building.room_numbers
+        vector = np.full(numbers.capacity, np.nan)
+        for room_id, value in values.items():
+            if room_id in numbers:
+                vector[numbers.number(room_id)] = value
+        return vector
+
+    def plan_history(self, duration_hours: float, dt_seconds: int = 60):
+        """
+        Повідомляє загальну тривалість прогону, який виконуватиметься частинами
+        (кілька run_simulation поспіль). Проріджування під memory_budget тоді
+        розраховується один раз на весь прогін, і точки історії рівномірні.
+        Викликати після initialize.
+        """
+        self._planned_steps = self._steps_done + int((duration_hours * 3600) / dt_seconds)
+        self._apply_memory_budget(0)
+
+    def estimate_history_bytes(self, steps: int) -> int:
+        """Оцінка пам'яті на всю історію (кімнати + час + вулиця) після ще steps кроків."""
+        done = self._steps_done
+        recorded = (done + steps) // self.history_stride - done // self.history_stride
+        samples = len(self.history_time) + recorded
+        return samples * self._sample_bytes()
+
+    def _sample_bytes(self) -> int:
+        """Пам'ять на одну точку історії: температури кімнат і вулиці + момент часу."""
+        values = (len(self.building.rooms) + 1) * HISTORY_BYTES_PER_SAMPLE[self.precision]
+        return values + TIME_BYTES_PER_SAMPLE[self.precision]
+
+    def _apply_memory_budget(self, steps: int):
+        """
+        Підбирає history_stride так, щоб історія всього прогону (запланованого через
+        plan_history або поточного) влізла в memory_budget. Якщо крок треба збільшити
+        посеред прогону, новий крок кратний старому, а вже записана історія проріджується
+        тим самим множником — інтервали між точками лишаються рівними.
+        """
+        if self.memory_budget is None:
+            return
+        total = max(self._planned_steps, self._steps_done + steps)
+        if total <= 0:
+            return
+
+        max_samples = self.memory_budget // self._sample_bytes()
+        stride = self.history_stride
+        # Стартова точка + по одній на кожні stride кроків
+        if 1 + total // stride <= max_samples:
+            return
+
+        # Бюджет менший за дві точки — лишаємо лише початок і кінець
+        needed = total if max_samples < 2 else math.ceil(total / (max_samples - 1))
+        factor = math.ceil(needed / stride)
+        self.history_stride = stride * factor
+
+        # Точка i записана після кроку i * stride; лишаємо кратні новому кроку
+        self.history_time = self.history_time[::factor]
+        self.history_outdoor = self.history_outdoor[::factor]
+        self.history_temps = {rid: temps[::factor] for rid, temps in self.history_temps.items()}
+
+    def _run_parallel(self, components: List[List[str]], steps: int, dt_seconds: int, workers: int):
+        """Розкидає компоненти по процесах (балансуючи за кількістю кімнат) і зводить результати."""
+        batches: List[List[str]] = [[] for _ in range(min(workers, len(components)))]
+        for room_ids in sorted(components, key=len, reverse=True):
+            min(batches, key=len).extend(room_ids)
+
+        tasks = []
+        for room_ids in batches:
+            tasks.append((
+                extract_component(self.building, room_ids),
+                {
+                    "t_min": self.t_min_outdoor,
+                    "t_max": self.t_max_outdoor,
+                    "internal_gain": self.internal_heat_gain,
+                    "time_sec": self.current_time_sec,
+                    "precision": self.precision,
+                    "stride": self.history_stride,
+                    "steps_done": self._steps_done,
+                    "temperatures": {rid: self.current_temperatures[rid] for rid in room_ids},
+                    "energy": {rid: self.total_energy_kwh[rid] for rid in room_ids},
+                    "profiles": {rid: self.control_profiles[rid]
+                                 for rid in room_ids if rid in self.control_profiles},
+                },
+                steps,
+                dt_seconds,
+            ))
+
+        with ProcessPoolExecutor(max_workers=len(tasks)) as pool:
+            partials = list(pool.map(_simulate_batch, tasks))
+
+        # Час та погода однакові для всіх пакетів — беремо з першого
+        first = partials[0]
+        self.history_time.extend(first["history_time"])
+        self.history_outdoor.extend(first["history_outdoor"])
+        self.current_time_sec = first["time_sec"]
+        self._steps_done = first["steps_done"]
+
+        for part in partials:
+            for rid, temps in part["history_temps"].items():
+                self.history_temps[rid].extend(temps)
+            self.total_energy_kwh.update(part["energy"])
+            self.current_temperatures.update(part["temperatures"])
+
     def get_results_chart(self) -> go.Figure:
         fig = go.Figure()
+        history_time = _plot_values(self.history_time)
 
         # Нам треба масив часу такої ж довжини, як і масив температур
         fig.add_trace(go.Scatter(
-            x=self.history_time,
-            y=self.history_outdoor,
+            x=history_time,
+            y=_plot_values(self.history_outdoor),
             mode="lines",
             name="Вулиця",
             line=dict(color="blue", dash="dash", width=2),
@@ -264,8 +512,8 @@ class ThermalSimulation:
         for room_id, temps in self.history_temps.items():
             room_name = self.building.rooms[room_id].name
             fig.add_trace(go.Scatter(
-                x=self.history_time,
-                y=temps,
+                x=history_time,
+                y=_plot_values(temps),
                 mode="lines",
                 name=room_name,
                 line=dict(width=3)
@@ -290,3 +538,44 @@ class ThermalSimulation:
         )
 
         return fig
+
+
+def _plot_values(series):
+    """Plotly не приймає array('f') / array('d'), тому подаємо його як numpy-вигляд без копіювання."""
+    if isinstance(series, array):
+        return np.frombuffer(series, dtype=np.float64 if series.typecode == "d" else np.float32)
+    return series
+
+
+def _simulate_batch(task) -> dict:
+    """
+    Виконується у процесі-воркері: продовжує симуляцію під-будівлі з переданого стану
+    і повертає лише нові точки історії та кінцеві лічильники енергії.
+    """
+    sub_building, state, steps, dt_seconds = task
+
+    sim = ThermalSimulation(sub_building, precision=state["precision"])
+    sim.history_stride = state["stride"]
+    sim._steps_done = state["steps_done"]
+    sim.t_min_outdoor = state["t_min"]
+    sim.t_max_outdoor = state["t_max"]
+    sim.internal_heat_gain = state["internal_gain"]
+    sim.current_time_sec = state["time_sec"]
+    sim.control_profiles = state["profiles"]
+    sim.current_temperatures = dict(state["temperatures"])
+    sim.total_energy_kwh = dict(state["energy"])
+    sim.history_time = sim._new_time_series()
+    sim.history_outdoor = sim._new_series()
+
+    for _ in range(steps):
+        sim.step(dt_seconds)
+
+    return {
+        "history_time": sim.history_time,
+        "history_outdoor": sim.history_outdoor,
+        "history_temps": sim.history_temps,
+        "energy": sim.total_energy_kwh,
+        "temperatures": sim.current_temperatures,
+        "time_sec": sim.current_time_sec,
+        "steps_done": sim._steps_done,
+    }
@@ -0,0 +1,88 @@
+import pytest
+from building import Building, Wall, Room, Material
+from bulding_compounds.adjacency import EXTERIOR
+from simulation.components import find_room_components
+
+
+@pytest.fixture
+def three_rooms():
+    """Base -> East (через східну стіну) -> North-East (через північну стіну East)."""
+    b = Building()
+    base = b.create_initial_room(4, 4, 3, Material(name="Brick"), "Base")
+    east = b.add_room_to_wall(b.get_wall_by_direction(base.id, "E").id, 3, "East")
+    north_east = b.add_room_to_wall(b.get_wall_by_direction(east.id, "N").id, 2, "NorthEast")
+    return b, base, east, north_east
+
+
+class TestRoomAdjacency:
+
+    def test_neighbours_after_add_room(self, three_rooms):
+        b, base, east, north_east = three_rooms
+        assert b.get_adjacent_room_ids(base.id) == [east.id]
+        assert set(b.get_adjacent_room_ids(east.id)) == {base.id, north_east.id}
+        assert b.get_adjacent_room_ids(north_east.id) == [east.id]
+
+    def test_exterior_walls(self, three_rooms):
+        b, base, east, _ = three_rooms
+        shared = b.get_wall_by_direction(base.id, "E").id
+        assert shared not in b.get_exterior_wall_ids(base.id)
+        assert len(b.get_exterior_wall_ids(base.id)) == 3
+        assert not b.is_exterior_wall(shared)
+        assert b.get_room_adjacency(base.id)[shared] == east.id
+
+    def test_matches_wall_room_ids(self, three_rooms):
+        b = three_rooms[0]
+        for wid, wall in b.walls.items():
+            assert b.is_exterior_wall(wid) == (len(wall.room_ids) == 1)
+            for rid in wall.room_ids:
+                assert wid in b.get_room_adjacency(rid)
+
+    def test_delete_room_updates_adjacency(self, three_rooms):
+        b, base, east, north_east = three_rooms
+        shared = b.get_wall_by_direction(east.id, "N").id
+        b.delete_room(north_east.id)
+
+        assert b.get_adjacent_room_ids(east.id) == [base.id]
+        assert b.is_exterior_wall(shared)
+        assert b.get_room_adjacency(north_east.id) == {}
+
+    def test_direct_wall_assignment(self):
+        b = Building()
+        b.walls["w"] = Wall(0, 0, 1, 0, room_ids=["r1", "r2"])
+        assert b.get_adjacent_room_ids("r1") == ["r2"]
+        del b.walls["w"]
+        assert b.get_adjacent_room_ids("r1") == []
+
+    def test_invalidate_after_manual_edit(self, three_rooms):
+        b, base, _, _ = three_rooms
+        wid = b.get_exterior_wall_ids(base.id)[0]
+        b.walls[wid].room_ids.append("outside")
+        b.invalidate_indexes()
+        assert "outside" in b.get_adjacent_room_ids(base.id)
+
+
+class TestAdjacencyCSR:
+
+    def test_rows(self, three_rooms):
+        b, base, east, north_east = three_rooms
+        csr = b.get_adjacency_csr()
+        assert csr.room_ids == list(b.rooms)
+        assert csr.indptr[-1] == len(csr.wall_ids) == len(csr.neighbours)
+
+        walls, neighbours = csr.row(csr.room_ids.index(east.id))
+        expected = b.get_room_adjacency(east.id)
+        assert walls == list(expected)
+        for wid, n in zip(walls, neighbours):
+            assert (csr.room_ids[n] if n != EXTERIOR else None) == expected[wid]
+
+    def test_cached_until_change(self, three_rooms):
+        b, base, east, north_east = three_rooms
+        csr = b.get_adjacency_csr()
+        assert b.get_adjacency_csr() is csr
+        b.delete_room(north_east.id)
+        assert b.get_adjacency_csr() is not csr
+
+
+def test_components_use_adjacency(three_rooms):
+    b, base, east, north_east = three_rooms
+    assert find_room_components(b) == [[base.id, east.id, north_east.id]]
@@ -0,0 +1,47 @@
+import pytest
+from building import Building, Material, MATERIALS, Opening, OPENING_TYPES
+from building_serializer import BuildingSerializer
+from bulding_compounds.hvac import HVACDevice, HVACType
+from plan_builder import build_room_grid
+
+
+@pytest.fixture
+def project():
+    b = Building()
+    brick = MATERIALS["Brick_Red_250"]
+    build_room_grid(b, 2, 3, 3, 4, 3, brick)
+    build_room_grid(b, 1, 2, 3, 4, 3, Material(name="Custom", thickness=0.2), level=1)
+    b.connect_levels(Material(name="Slab concrete", thickness=0.2, conductivity=1.5))
+    walls = list(b.walls)
+    b.add_opening(walls[0], Opening(OPENING_TYPES["Win_Standard"], 1.0, 1.2))
+    b.add_opening(walls[0], Opening(OPENING_TYPES["Door_Wood"], 0.9, 2.0))
+    b.add_hvac(next(iter(b.rooms)), HVACDevice("Heater", HVACType.HEATER, power_heating=1500))
+    return b
+
+
+class TestBinaryFormat:
+
+    def test_roundtrip(self, project):
+        restored = BuildingSerializer.from_binary(BuildingSerializer.to_binary(project))
+        assert BuildingSerializer.to_dict(restored) == BuildingSerializer.to_dict(project)
+        assert restored.validate().is_valid
+
+    def test_uncompressed_roundtrip(self, project):
+        restored = BuildingSerializer.from_binary(BuildingSerializer.to_binary(project, compress=False))
+        assert BuildingSerializer.to_dict(restored) == BuildingSerializer.to_dict(project)
+
+    def test_shared_tables(self, project):
+        restored = BuildingSerializer.from_binary(BuildingSerializer.to_binary(project))
+        assert len({id(w.base_material) for w in restored.walls.values()}) == 2
+        assert next(iter(restored.walls.values())).base_material is MATERIALS["Brick_Red_250"]
+
+    def test_smaller_than_json(self, project):
+        assert len(BuildingSerializer.to_binary(project)) < len(BuildingSerializer.to_json(project).encode())
+
+    def test_empty_building(self):
+        restored = BuildingSerializer.from_binary(BuildingSerializer.to_binary(Building()))
+        assert not restored.walls and not restored.rooms
+
+    def test_rejects_other_files(self):
+        with pytest.raises(Exception):
+            BuildingSerializer.from_binary(b"not a project")
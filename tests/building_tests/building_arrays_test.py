@@ -0,0 +1,72 @@
+import pytest
+import numpy as np
+from building import Building, Material
+from bulding_compounds.adjacency import EXTERIOR
+from bulding_compounds.wall import Wall
+from bulding_compounds.room import Room
+from bulding_compounds.opening import Opening, OPENING_TYPES
+from plan_builder import build_room_grid
+
+
+@pytest.fixture
+def brick():
+    return Material(name="Brick", thickness=0.5, conductivity=0.5)
+
+
+@pytest.fixture
+def grid(brick):
+    b = Building()
+    build_room_grid(b, 2, 3, 3, 4, 3, brick)
+    return b
+
+
+class TestSlots:
+
+    @pytest.mark.parametrize("obj", [
+        Wall(0, 0, 1, 0, 3),
+        Room("R", 1, 1, 3, 0, 0),
+        Material(),
+        Opening(OPENING_TYPES["Win_Standard"]),
+    ])
+    def test_no_instance_dict(self, obj):
+        assert not hasattr(obj, "__dict__")
+
+    def test_caches_survive_copy(self, brick):
+        import copy
+        wall = Wall(0, 0, 4, 0, 3, brick)
+        ua = wall.total_ua
+        clone = copy.deepcopy(wall)
+        assert clone == wall
+        assert clone.total_ua == pytest.approx(ua)
+        clone.end_x = 2
+        assert clone.length == 2.0 and wall.length == 4.0
+
+
+class TestBuildingArrays:
+
+    def test_shapes_and_values(self, grid, brick):
+        arrays = grid.get_arrays()
+        n = len(grid.walls)
+        assert arrays.segments.shape == (n, 4)
+        assert arrays.materials == [brick]
+        assert (arrays.material_index == 0).all()
+        index = arrays.wall_index()
+        for wid, wall in grid.walls.items():
+            assert tuple(arrays.segments[index[wid]]) == wall.segment
+        np.testing.assert_allclose(arrays.lengths, [w.length for w in grid.walls.values()])
+        np.testing.assert_allclose(arrays.material_u, brick.U)
+
+    def test_room_pairs(self, grid):
+        arrays = grid.get_arrays()
+        for i, wid in enumerate(arrays.wall_ids):
+            rooms = {arrays.room_ids[r] for r in arrays.wall_rooms[i] if r != EXTERIOR}
+            assert rooms == set(grid.walls[wid].room_ids)
+            assert arrays.is_exterior[i] == grid.is_exterior_wall(wid)
+
+    def test_cached_until_change(self, grid):
+        arrays = grid.get_arrays()
+        assert grid.get_arrays() is arrays
+        grid.set_wall_material(arrays.wall_ids[0], Material(name="Wood"))
+        fresh = grid.get_arrays()
+        assert fresh is not arrays
+        assert len(fresh.materials) == 2
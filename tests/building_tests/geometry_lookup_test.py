@@ -0,0 +1,66 @@
+import pytest
+from building import Building, Wall, Material
+from bulding_compounds.wall import segment_key
+
+
+class TestSegmentKey:
+
+    def test_direction_independent(self):
+        assert segment_key(0, 0, 5, 0) == segment_key(5, 0, 0, 0)
+
+    def test_tolerance_quantized(self):
+        assert segment_key(0.1 + 0.2, 0, 1, 0) == segment_key(0.3, 0, 1, 0)
+
+    def test_different_segments(self):
+        assert segment_key(0, 0, 5, 0) != segment_key(0, 0, 5, 1)
+
+
+class TestFindWallWithGeometry:
+
+    @pytest.fixture
+    def building(self):
+        b = Building()
+        b.create_initial_room(10, 10, 3, Material(name="Brick"), name="Base")
+        return b
+
+    def test_finds_reversed_wall(self, building):
+        south = next(w for w in building.walls.values() if w.start_y == 0 and w.end_y == 0)
+        found = building.find_wall_with_geometry(Wall(10, 0, 0, 0, 3, Material()))
+        assert found is south
+
+    def test_missing_geometry(self, building):
+        assert building.find_wall_with_geometry(Wall(0, 0, 3, 3, 3, Material())) is None
+
+    def test_follows_direct_mutations(self, building):
+        w = Wall(20, 0, 30, 0, 3, Material())
+        building.walls["extra"] = w
+        assert building.find_wall_with_geometry(Wall(30, 0, 20, 0)) is w
+        del building.walls["extra"]
+        assert building.find_wall_with_geometry(Wall(30, 0, 20, 0)) is None
+
+    def test_duplicates_resolve_to_first_inserted(self, building):
+        first = Wall(20, 0, 30, 0)
+        second = Wall(30, 0, 20, 0)
+        building.walls["first"] = first
+        building.walls["second"] = second
+        assert building.find_wall_with_geometry(Wall(20, 0, 30, 0)) is first
+        del building.walls["first"]
+        assert building.find_wall_with_geometry(Wall(20, 0, 30, 0)) is second
+
+    def test_shared_wall_reused_when_closing_a_corner(self, building):
+        """
+        Базова кімната + прибудова на Півночі + прибудова на Сході від північної.
+        Потім прибудова на Сході від базової має перевикористати спільну стіну.
+        """
+        base = next(iter(building.rooms.values()))
+        north = building.add_room_to_wall(building.get_wall_by_direction(base.id, "N").id, 10, "N")
+        north_east = building.add_room_to_wall(building.get_wall_by_direction(north.id, "E").id, 10, "NE")
+        walls_before = len(building.walls)
+
+        east = building.add_room_to_wall(building.get_wall_by_direction(base.id, "E").id, 10, "E")
+
+        # Нова кімната додала лише 2 стіни: верхня стіна спільна з NE
+        assert len(building.walls) == walls_before + 2
+        shared = set(east.wall_ids) & set(north_east.wall_ids)
+        assert len(shared) == 1
+        assert set(building.walls[shared.pop()].room_ids) == {east.id, north_east.id}
@@ -0,0 +1,56 @@
+import pytest
+import numpy as np
+from building import Building, Material
+from bulding_compounds.id_index import IdIndex
+from simulation.thermal_sim import ThermalSimulation
+from plan_builder import build_room_grid
+
+
+@pytest.fixture
+def grid():
+    b = Building()
+    build_room_grid(b, 2, 2, 3, 3, 3, Material(name="Brick"))
+    return b
+
+
+class TestIdIndex:
+
+    def test_dense_and_reused(self):
+        index = IdIndex(["a", "b", "c"])
+        assert [index.number(i) for i in "abc"] == [0, 1, 2]
+        index.remove("b")
+        assert index.id_at(1) is None and index.capacity == 3
+        assert index.add("d") == 1
+        assert index.add("a") == 0  # повторне додавання не змінює номер
+
+
+class TestBuildingNumbers:
+
+    def test_numbers_follow_edits(self, grid):
+        rooms = list(grid.rooms)
+        assert [grid.room_numbers.number(r) for r in rooms] == [0, 1, 2, 3]
+        walls_before = {w: grid.wall_numbers.number(w) for w in grid.walls}
+        grid.delete_room(rooms[1])
+        # У кімнат, що лишились, номери не змінились
+        assert [grid.room_numbers.number(r) for r in rooms if r in grid.rooms] == [0, 2, 3]
+        assert all(grid.wall_numbers.number(w) == walls_before[w] for w in grid.walls)
+        assert len(grid.wall_numbers) == len(grid.walls)
+        grid.undo()
+        assert grid.room_numbers.number(rooms[1]) == 1
+
+    def test_snapshot_shares_numbers(self, grid):
+        grid.delete_room(next(iter(grid.rooms)))
+        snap = grid.snapshot()
+        assert all(snap.room_numbers.number(r) == grid.room_numbers.number(r) for r in grid.rooms)
+
+    def test_arrays_and_sim_vectors(self, grid):
+        arrays = grid.get_arrays()
+        assert [grid.wall_numbers.id_at(n) for n in arrays.wall_numbers] == arrays.wall_ids
+        sim = ThermalSimulation(grid)
+        temps = {rid: float(i) for i, rid in enumerate(grid.rooms)}
+        vector = sim.room_vector(temps)
+        assert vector[arrays.room_numbers].tolist() == [temps[r] for r in arrays.room_ids]
+
+    def test_replacing_dict_renumbers(self, grid):
+        grid.clear()
+        assert grid.room_numbers.capacity == 0
@@ -0,0 +1,152 @@
+import pytest
+from building import Building, Material, Opening, OPENING_TYPES
+from bulding_compounds.hvac import HVACDevice, HVACType
+from bulding_compounds.journal import EditJournal, Operation
+from building_serializer import BuildingSerializer
+
+
+@pytest.fixture
+def brick():
+    return Material(name="Brick", thickness=0.25, conductivity=0.7)
+
+
+@pytest.fixture
+def building(brick):
+    b = Building()
+    base = b.create_initial_room(4, 4, 3, brick, "Base")
+    b.add_room_to_wall(b.get_wall_by_direction(base.id, "E").id, 3, "East")
+    return b
+
+
+def state(b: Building) -> str:
+    return BuildingSerializer.to_json(b)
+
+
+class TestEditJournal:
+
+    def test_depth_limit(self):
+        journal = EditJournal(depth=2)
+        for i in range(3):
+            journal.record(Operation(str(i), lambda: None, lambda: None))
+        assert len(journal) == 2
+
+    def test_new_edit_drops_redo(self):
+        journal = EditJournal()
+        journal.record(Operation("a", lambda: None, lambda: None))
+        journal.undo()
+        assert journal.can_redo
+        journal.record(Operation("b", lambda: None, lambda: None))
+        assert not journal.can_redo
+
+    def test_empty(self):
+        assert EditJournal().undo() is None
+        assert EditJournal().redo() is None
+
+
+class TestBuildingUndoRedo:
+
+    def test_undo_add_room(self, building):
+        before_rooms = dict(building.rooms)
+        base = next(iter(building.rooms.values()))
+        snapshot = state(building)
+
+        building.add_room_to_wall(building.get_wall_by_direction(base.id, "N").id, 2, "North")
+        after = state(building)
+
+        assert building.undo() == "Прибудувати кімнату North"
+        assert state(building) == snapshot
+        assert building.rooms == before_rooms
+        assert building.get_adjacent_room_ids(base.id) == [r for r in before_rooms if r != base.id]
+
+        building.redo()
+        assert state(building) == after
+        assert building.validate().is_valid
+
+    def test_undo_delete_room(self, building):
+        east = list(building.rooms.values())[1]
+        base = list(building.rooms.values())[0]
+        snapshot = state(building)
+
+        building.delete_room(east.id)
+        after = state(building)
+        building.undo()
+
+        assert sorted(building.rooms) == sorted([base.id, east.id])
+        assert building.get_adjacent_room_ids(base.id) == [east.id]
+        assert sorted(building.walls) == sorted(BuildingSerializer.from_json(snapshot).walls)
+
+        building.redo()
+        assert state(building) == after
+
+    def test_undo_opening_material_hvac(self, building, brick):
+        base = next(iter(building.rooms.values()))
+        wall = building.get_wall_by_direction(base.id, "S")
+        snapshot = state(building)
+
+        building.add_opening(wall.id, Opening(OPENING_TYPES["Win_Standard"], 1.0, 1.0))
+        building.set_wall_material(wall.id, Material(name="Concrete"))
+        heater = HVACDevice("Heater", HVACType.HEATER, power_heating=1000)
+        building.add_hvac(base.id, heater)
+        building.remove_hvac(base.id, heater.id)
+
+        for _ in range(4):
+            building.undo()
+        assert state(building) == snapshot
+        assert wall.base_material is brick
+
+        for _ in range(4):
+            building.redo()
+        assert len(wall.openings) == 1
+        assert wall.base_material.name == "Concrete"
+        assert base.hvac_devices == []
+
+    def test_undo_clear(self, building):
+        snapshot = state(building)
+        building.clear()
+        assert not building.rooms and not building.walls
+        building.undo()
+        assert state(building) == snapshot
+        assert building.validate().is_valid
+
+    def test_failed_edit_not_recorded(self, building):
+        depth = len(building.journal)
+        base = next(iter(building.rooms.values()))
+        wall = building.get_wall_by_direction(base.id, "S")
+        with pytest.raises(ValueError):
+            building.add_opening(wall.id, Opening(OPENING_TYPES["Win_Standard"], 100.0, 1.0))
+        assert len(building.journal) == depth
+
+    def test_history_keeps_references_not_copies(self, building):
+        base = next(iter(building.rooms.values()))
+        building.delete_room(base.id)
+        building.undo()
+        # Відновлено той самий об'єкт, а не копію
+        assert building.rooms[base.id] is base
+
+    def test_snapshot_between_undo_and_redo(self, building):
+        base = next(iter(building.rooms.values()))
+        north = building.add_room_to_wall(building.get_wall_by_direction(base.id, "N").id, 2, "North")
+        before_delete = state(building)
+
+        building.delete_room(north.id)
+        building.undo()
+        frozen = building.snapshot()
+        building.redo()
+        assert north.id not in building.rooms
+        building.undo()
+
+        assert state(building) == before_delete
+        for wall in building.walls.values():
+            assert len(wall.room_ids) == len(set(wall.room_ids))
+        assert building.validate().is_valid
+        # Знімок не зачеплено
+        assert north.id in frozen.rooms
+        assert all(len(w.room_ids) == len(set(w.room_ids)) for w in frozen.walls.values())
+
+        # Ще один цикл зі знімком посередині
+        building.redo()
+        building.snapshot()
+        building.undo()
+        building.redo()
+        building.undo()
+        assert state(building) == before_delete
@@ -0,0 +1,53 @@
+import io
+import json
+import dataclasses
+import pytest
+from building import Building, Material, MATERIALS, Opening, OPENING_TYPES
+from building_serializer import BuildingSerializer
+from bulding_compounds.hvac import HVACDevice, HVACType
+from plan_builder import build_room_grid
+
+
+@pytest.fixture
+def project():
+    b = Building()
+    build_room_grid(b, 2, 2, 3, 4, 3, MATERIALS["Brick_Red_250"], name_prefix='Кімната "А"')
+    build_room_grid(b, 1, 1, 3, 4, 3, Material(name="Custom"), level=1)
+    b.connect_levels(Material(name="Slab"))
+    b.add_opening(next(iter(b.walls)), Opening(OPENING_TYPES["Win_Standard"], 1.0, 1.2))
+    b.add_hvac(next(iter(b.rooms)), HVACDevice("Heater", HVACType.HEATER, power_heating=1500))
+    return b
+
+
+class TestStreamingJson:
+
+    def test_same_as_asdict_dump(self, project):
+        expected = json.dumps(dataclasses.asdict(project), indent=2, ensure_ascii=False)
+        assert BuildingSerializer.to_json(project) == expected
+
+    def test_compact(self, project):
+        compact = BuildingSerializer.to_json(project, compact=True)
+        assert "\n" not in compact
+        assert json.loads(compact) == json.loads(BuildingSerializer.to_json(project))
+        assert len(compact) < len(BuildingSerializer.to_json(project))
+
+    def test_writes_incrementally(self, project):
+        class CountingWriter(io.StringIO):
+            writes = 0
+
+            def write(self, text):
+                CountingWriter.writes += 1
+                return super().write(text)
+
+        fp = CountingWriter()
+        BuildingSerializer.dump(project, fp)
+        assert CountingWriter.writes > len(project.walls) + len(project.rooms)
+        restored = BuildingSerializer.from_json(fp.getvalue())
+        assert BuildingSerializer.to_dict(restored) == BuildingSerializer.to_dict(project)
+
+    @pytest.mark.parametrize("compact", [False, True])
+    def test_empty_building(self, compact):
+        b = Building()
+        assert json.loads(BuildingSerializer.to_json(b, compact)) == {"walls": {}, "rooms": {}, "slabs": {}}
+        if not compact:
+            assert BuildingSerializer.to_json(b) == json.dumps(dataclasses.asdict(b), indent=2)
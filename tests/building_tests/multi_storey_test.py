@@ -0,0 +1,133 @@
+import time
+import pytest
+from building import Building, Material
+from building_serializer import BuildingSerializer
+from plan_builder import RoomFootprint, build_rooms, build_room_grid
+from simulation.thermal_sim import ThermalSimulation, RoomControlProfile
+from simulation.components import find_room_components
+
+
+@pytest.fixture
+def brick():
+    return Material(name="Brick", thickness=0.25, conductivity=0.7, density=1800, specific_heat=880)
+
+
+@pytest.fixture
+def two_storeys(brick):
+    """Нижня кімната 6x4 та над нею дві кімнати 3x4."""
+    b = Building()
+    (low,) = build_rooms(b, [RoomFootprint(0, 0, 6, 4, "Low")], 3, brick)
+    up_left, up_right = build_rooms(b, [RoomFootprint(0, 0, 3, 4, "UpL", level=1),
+                                        RoomFootprint(3, 0, 3, 4, "UpR", level=1)], 3, brick)
+    return b, low, up_left, up_right
+
+
+class TestLevels:
+
+    def test_same_geometry_on_different_levels(self, two_storeys):
+        b, low, up_left, _ = two_storeys
+        # Південні стіни мають однакові координати, але різні поверхи
+        assert len(b.walls) == 4 + 7
+        assert b.validate().is_valid
+        assert b.get_adjacent_room_ids(low.id) == []
+
+    def test_add_room_keeps_level(self, brick):
+        b = Building()
+        base = b.create_initial_room(4, 4, 3, brick, "Base", level=2)
+        east = b.add_room_to_wall(b.get_wall_by_direction(base.id, "E").id, 3, "East")
+        assert east.level == 2
+        assert all(b.walls[wid].level == 2 for wid in east.wall_ids)
+
+
+class TestSlabs:
+
+    def test_overlapping_footprints(self, two_storeys):
+        b, low, up_left, up_right = two_storeys
+        assert b.find_overlapping_rooms(low.id, 1) == {up_left.id: 12.0, up_right.id: 12.0}
+        assert b.find_overlapping_rooms(up_left.id, 0) == {low.id: 12.0}
+        assert b.find_overlapping_rooms(low.id, 2) == {}
+
+    def test_connect_levels(self, two_storeys, brick):
+        b, low, up_left, up_right = two_storeys
+        slabs = b.connect_levels(brick)
+        assert len(slabs) == 2
+        assert set(b.get_room_slabs(low.id).values()) == {up_left.id, up_right.id}
+        assert find_room_components(b) == [[low.id, up_left.id, up_right.id]]
+
+    def test_delete_room_removes_slabs(self, two_storeys, brick):
+        b, low, up_left, up_right = two_storeys
+        b.connect_levels(brick)
+        b.delete_room(up_left.id)
+        assert list(b.get_room_slabs(low.id).values()) == [up_right.id]
+        assert b.validate().is_valid
+
+    def test_connect_levels_undo_redo(self, two_storeys, brick):
+        b, low, up_left, up_right = two_storeys
+        b.connect_levels(brick)
+        slab_ids = set(b.slabs)
+        b.undo()
+        assert b.slabs == {}
+        assert b.get_room_slabs(low.id) == {}
+        b.redo()
+        assert set(b.slabs) == slab_ids
+        assert set(b.get_room_slabs(low.id).values()) == {up_left.id, up_right.id}
+
+    def test_undo_room_then_slabs_stay_consistent(self, two_storeys, brick):
+        b, low, up_left, _ = two_storeys
+        b.connect_levels(brick)
+        b.delete_room(up_left.id)
+        b.undo()  # повертає кімнату разом з її перекриттям
+        assert b.validate().is_valid
+        b.undo()  # скасовує з'єднання поверхів
+        assert b.slabs == {}
+        assert b.validate().is_valid
+
+    def test_serializer_roundtrip(self, two_storeys, brick):
+        b, low, up_left, _ = two_storeys
+        b.connect_levels(brick)
+        restored = BuildingSerializer.from_json(BuildingSerializer.to_json(b))
+        assert restored.rooms[up_left.id].level == 1
+        assert set(restored.get_room_slabs(low.id)) == set(b.slabs)
+
+    def test_many_floors_scale(self, brick):
+        b = Building()
+        floors = 20
+        for level in range(floors):
+            build_room_grid(b, 10, 10, 3, 3, 3, brick, level=level)
+        start = time.perf_counter()
+        slabs = b.connect_levels(brick)
+        assert len(slabs) == (floors - 1) * 100
+        assert time.perf_counter() - start < 5
+
+
+class TestSlabHeatFlow:
+
+    def test_warm_room_heats_room_above(self, two_storeys, brick):
+        b, low, up_left, up_right = two_storeys
+        b.connect_levels(brick)
+        sim = ThermalSimulation(b)
+        sim.initialize(start_temp=20.0, profiles={rid: RoomControlProfile() for rid in b.rooms},
+                       t_min=20, t_max=20, internal_gain=0)
+        sim.current_temperatures[low.id] = 30.0
+
+        q = sim._calculate_transmission_heat_flow(b.rooms[up_left.id], 20.0, 20.0)
+        assert q == pytest.approx(brick.U * 12.0 * 10.0)
+
+    def test_no_slabs_no_coupling(self, two_storeys):
+        b, low, up_left, _ = two_storeys
+        sim = ThermalSimulation(b)
+        sim.initialize(start_temp=20.0, profiles={rid: RoomControlProfile() for rid in b.rooms},
+                       t_min=20, t_max=20, internal_gain=0)
+        sim.current_temperatures[low.id] = 30.0
+        assert sim._calculate_transmission_heat_flow(b.rooms[up_left.id], 20.0, 20.0) == 0.0
+
+    def test_slab_without_material_is_skipped(self, two_storeys, brick):
+        b, low, up_left, _ = two_storeys
+        b.connect_levels(brick)
+        for slab in b.slabs.values():
+            slab.material = None
+        sim = ThermalSimulation(b)
+        sim.initialize(start_temp=20.0, profiles={rid: RoomControlProfile() for rid in b.rooms},
+                       t_min=20, t_max=20, internal_gain=0)
+        sim.current_temperatures[low.id] = 30.0
+        assert sim._calculate_transmission_heat_flow(b.rooms[up_left.id], 20.0, 20.0) == 0.0
@@ -0,0 +1,106 @@
+import time
+import pytest
+from building import Building, Material
+from bulding_compounds.custom_errors import RoomOverlapError
+from plan_builder import RoomFootprint, build_rooms, build_room_grid
+
+
+@pytest.fixture
+def brick():
+    return Material(name="Brick", thickness=0.25, conductivity=0.7)
+
+
+class TestBuildRooms:
+
+    def test_two_rooms_share_wall(self, brick):
+        b = Building()
+        left, right = build_rooms(b, [RoomFootprint(0, 0, 4, 3, "L"), RoomFootprint(4, 0, 5, 3, "R")], 3, brick)
+        assert len(b.walls) == 7
+        assert b.get_adjacent_room_ids(left.id) == [right.id]
+        assert b.get_wall_direction(b.get_exterior_wall_ids(left.id)[0], left.id) == "S"
+        assert b.calculate_room_dimensions(right.id) == (5.0, 3.0)
+
+    def test_links_to_existing_walls(self, brick):
+        b = Building()
+        base = b.create_initial_room(4, 3, 3, brick, "Base")
+        (east,) = build_rooms(b, [RoomFootprint(4, 0, 2, 3, "East")], 3, brick)
+        assert len(b.walls) == 7
+        assert b.get_adjacent_room_ids(base.id) == [east.id]
+
+    def test_overlap_rolls_back(self, brick):
+        b = Building()
+        base = b.create_initial_room(4, 4, 3, brick, "Base")
+        walls_before = {k: list(w.room_ids) for k, w in b.walls.items()}
+
+        with pytest.raises(RoomOverlapError):
+            # Права кімната накриває половину базової
+            build_rooms(b, [RoomFootprint(4, 0, 2, 4, "Ok"), RoomFootprint(2, 2, 4, 4, "Bad")], 3, brick)
+
+        assert list(b.rooms) == [base.id]
+        assert {k: list(w.room_ids) for k, w in b.walls.items()} == walls_before
+        assert b.validate().is_valid
+
+    def test_room_height_override(self, brick):
+        b = Building()
+        (room,) = build_rooms(b, [RoomFootprint(0, 0, 2, 2, "Tall", height=5)], 3, brick)
+        assert room.height == 5
+        assert all(b.walls[wid].height == 5 for wid in room.wall_ids)
+
+
+class TestBuildRoomGrid:
+
+    def test_grid_topology(self, brick):
+        b = Building()
+        grid = build_room_grid(b, 3, 4, 2.5, 3.5, 3, brick)
+        assert len(b.rooms) == 12
+        # (rows + 1) * cols горизонтальних + (cols + 1) * rows вертикальних
+        assert len(b.walls) == 4 * 4 + 5 * 3
+        assert len(b.get_adjacent_room_ids(grid[1][1].id)) == 4
+        assert len(b.get_adjacent_room_ids(grid[0][0].id)) == 2
+        assert b.validate().is_valid
+
+    def test_fractional_cells_share_exact_corners(self, brick):
+        b = Building()
+        build_room_grid(b, 3, 7, 0.1, 0.3, 3, brick, origin=(0.7, 1.1))
+        assert b.validate().is_valid
+
+    def test_invalid_size(self, brick):
+        with pytest.raises(ValueError):
+            build_room_grid(Building(), 0, 3, 1, 1, 3, brick)
+
+    def test_large_floor_plate(self, brick):
+        b = Building()
+        start = time.perf_counter()
+        build_room_grid(b, 50, 100, 3, 4, 3, brick)
+        assert len(b.rooms) == 5000
+        assert time.perf_counter() - start < 10
+
+
+class TestBuildRoomsJournal:
+    def test_undo_removes_only_bulk_rooms(self, brick):
+        b = Building()
+        base = b.create_initial_room(4, 3, 3, brick, "Base")
+        walls_before = {k: list(w.room_ids) for k, w in b.walls.items()}
+
+        # Східна кімната ділить стіну з базовою
+        (east,) = build_rooms(b, [RoomFootprint(4, 0, 2, 3, "East")], 3, brick)
+        assert b.undo() is not None
+
+        assert list(b.rooms) == [base.id]
+        assert {k: list(w.room_ids) for k, w in b.walls.items()} == walls_before
+        assert b.get_adjacent_room_ids(base.id) == []
+        assert b.validate().is_valid
+
+        b.redo()
+        assert set(b.rooms) == {base.id, east.id}
+        assert len(b.walls) == 7
+        assert b.get_adjacent_room_ids(base.id) == [east.id]
+        assert b.validate().is_valid
+
+    def test_grid_is_one_operation(self, brick):
+        b = Building()
+        base = b.create_initial_room(2, 2, 3, brick, "Base")
+        build_room_grid(b, 2, 2, 2, 2, 3, brick, origin=(2, 0))
+        b.undo()
+        assert list(b.rooms) == [base.id]
+        assert len(b.walls) == 4
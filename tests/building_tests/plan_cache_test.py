@@ -0,0 +1,89 @@
+import pytest
+from building import Building, Material, Opening, OPENING_TYPES
+from bulding_compounds.hvac import HVACDevice, HVACType
+from plan_builder import build_room_grid
+
+
+@pytest.fixture
+def grid():
+    b = Building()
+    build_room_grid(b, 3, 4, 3, 3, 3, Material(name="Brick", color="#aa0000"))
+    return b
+
+
+def same_as_full_build(b):
+    cached = b.get_cached_building_plan()
+    fresh = b.get_building_plan()
+    assert len(cached.data) == len(fresh.data)
+    # новий стиль додається в кінець групи, тож trace-и зіставляємо за стилем, а не позицією
+    def style(t):
+        return t.mode, t.line.color, t.line.width, t.hovertemplate, t.hoverinfo
+    assert sorted(map(style, cached.data), key=repr) == sorted(map(style, fresh.data), key=repr)
+    cached_by_style = {style(t): t for t in cached.data}
+    for f in fresh.data:
+        c = cached_by_style[style(f)]
+        assert c.type == f.type
+        # порядок відрізків у trace-і може відрізнятись після правок — порівнюємо множини
+        assert sorted(zip(c.x, c.y), key=repr) == sorted(zip(f.x, f.y), key=repr)
+        if f.customdata is not None:
+            assert sorted(map(tuple, c.customdata), key=repr) == sorted(map(tuple, f.customdata), key=repr)
+        if f.text is not None:
+            assert sorted(c.text) == sorted(f.text)
+    return cached
+
+
+class TestPlanCache:
+
+    def test_same_figure_without_changes(self, grid):
+        fig = grid.get_cached_building_plan()
+        assert grid.get_cached_building_plan() is fig
+
+    def test_material_change_patches_only_its_style(self, grid):
+        fig = grid.get_cached_building_plan()
+        wid = next(iter(grid.walls))
+        grid.set_wall_material(wid, Material(name="Wood", color="#00aa00"))
+        patched = same_as_full_build(grid)
+        assert patched is not fig  # з'явився новий стиль — нова фігура
+        patched_again = grid.get_cached_building_plan()
+        assert patched_again is patched
+
+    def test_opening_patches_in_place(self, grid):
+        tech = OPENING_TYPES["Win_Standard"]
+        walls = [w for w in grid.walls if grid.is_exterior_wall(w)]
+        grid.add_opening(walls[0], Opening(tech, 1.0, 1.0))
+        fig = grid.get_cached_building_plan()
+        labels_before = fig.data[-1].x
+        grid.add_opening(walls[1], Opening(tech, 1.0, 1.0))
+        assert same_as_full_build(grid) is fig  # стиль уже був — оновлено trace-и на місці
+        assert fig.data[-1].x == labels_before
+
+    def test_new_room_and_undo(self, grid):
+        grid.get_cached_building_plan()
+        wid = next(w for w in grid.walls if grid.is_exterior_wall(w))
+        grid.add_room_to_wall(wid, 2.0, "Нова")
+        same_as_full_build(grid)
+        grid.undo()
+        same_as_full_build(grid)
+
+    def test_hvac_and_delete_room(self, grid):
+        grid.get_cached_building_plan()
+        rid = next(iter(grid.rooms))
+        grid.add_hvac(rid, HVACDevice("Котел", HVACType.HEATER, power_heating=2000))
+        same_as_full_build(grid)
+        grid.delete_room(rid)
+        same_as_full_build(grid)
+
+    def test_replacing_walls_rebuilds(self, grid):
+        fig = grid.get_cached_building_plan()
+        grid.clear()
+        assert grid.get_cached_building_plan() is not fig
+        assert len(same_as_full_build(grid).data) == 3
+
+    def test_viewport_caches_are_bounded(self, grid):
+        from bulding_compounds.plan_renderer import PLAN_CACHE_LIMIT
+        full = grid.get_cached_building_plan()
+        for i in range(PLAN_CACHE_LIMIT * 2):
+            grid.get_cached_building_plan(viewport=(0.0, 0.0, 1.0 + i, 1.0 + i))
+            # Повний план використовується постійно — його кеш не викидається
+            assert grid.get_cached_building_plan() is full
+        assert len(grid._plan_caches) == PLAN_CACHE_LIMIT
@@ -0,0 +1,87 @@
+import pytest
+from building import Building, Material, Opening, OPENING_TYPES
+from plan_builder import build_room_grid
+
+
+@pytest.fixture
+def grid():
+    b = Building()
+    build_room_grid(b, 4, 5, 3, 3, 3, Material(name="Brick", color="#aa0000"))
+    return b
+
+
+def non_empty(values):
+    return [v for v in values if v is not None]
+
+
+class TestBatchedPlan:
+
+    def test_trace_count_independent_of_size(self, grid):
+        small = Building()
+        build_room_grid(small, 1, 2, 3, 3, 3, Material(name="Brick", color="#aa0000"))
+        # заливка + 2 стилі стін (зовн./внутр.) + хітбокси + підписи
+        assert len(grid.get_building_plan().data) == len(small.get_building_plan().data) == 5
+
+    def test_each_wall_drawn_once(self, grid):
+        fig = grid.get_building_plan()
+        wall_traces = [t for t in fig.data if t.mode == "lines" and t.line.width in (4, 8)]
+        drawn = sum(len(non_empty(t.x)) for t in wall_traces) // 2
+        assert drawn == len(grid.walls)
+
+    def test_click_contract(self, grid):
+        fig = grid.get_building_plan()
+        labels = fig.data[-1]
+        assert [tuple(d) for d in labels.customdata] == [(rid, "room") for rid in grid.rooms]
+        hitbox_ids = {d[0] for d in fig.data[-2].customdata if d[0] is not None}
+        assert hitbox_ids == set(grid.walls)
+        assert all(d[1] == "wall" for d in fig.data[-2].customdata if d[0] is not None)
+
+    def test_openings_batched_by_color(self, grid):
+        tech = OPENING_TYPES["Win_Standard"]
+        walls = list(grid.walls)[:3]
+        for wid in walls:
+            grid.add_opening(wid, Opening(tech, 1.0, 1.0))
+        fig = grid.get_building_plan()
+        opening_traces = [t for t in fig.data if t.line.color == tech.color and t.hovertext is not None]
+        assert sum(len(non_empty(t.x)) for t in opening_traces) == 2 * len(walls)
+
+    def test_level_filter(self, grid):
+        build_room_grid(grid, 1, 1, 3, 3, 3, Material(name="Brick"), level=1)
+        fig = grid.get_building_plan(level=1)
+        assert len(fig.data[-1].customdata) == 1
+
+    def test_empty_building(self):
+        assert len(Building().get_building_plan().data) == 3
+
+
+class TestRenderModes:
+
+    def test_auto_switches_to_webgl(self, grid, monkeypatch):
+        import bulding_compounds.plan_renderer as renderer
+        assert grid.get_building_plan().data[1].type == "scatter"
+        monkeypatch.setattr(renderer, "WEBGL_WALL_THRESHOLD", 10)
+        fig = grid.get_building_plan()
+        assert fig.data[0].type == "scatter"  # заливка лишається SVG
+        assert all(t.type == "scattergl" for t in fig.data[1:])
+
+    def test_explicit_mode(self, grid):
+        assert grid.get_building_plan(mode="webgl").data[-1].type == "scattergl"
+        with pytest.raises(ValueError):
+            grid.get_building_plan(mode="canvas")
+
+    def test_low_detail_keeps_room_click_contract(self, grid, monkeypatch):
+        import bulding_compounds.plan_renderer as renderer
+        grid.add_opening(next(iter(grid.walls)), Opening(OPENING_TYPES["Win_Standard"], 1.0, 1.0))
+        monkeypatch.setattr(renderer, "DETAIL_WALL_LIMIT", 10)
+        monkeypatch.setattr(renderer, "LABEL_TEXT_LIMIT", 10)
+        fig = grid.get_building_plan()
+        # заливка + 2 стилі стін + підписи: без отворів і хітбоксів
+        assert len(fig.data) == 4
+        labels = fig.data[-1]
+        assert labels.mode == "markers"
+        assert [tuple(d) for d in labels.customdata] == [(rid, "room") for rid in grid.rooms]
+
+    def test_viewport_culls(self, grid):
+        fig = grid.get_building_plan(viewport=(0, 0, 2, 2))
+        assert len(fig.data[-1].customdata) == 1
+        assert list(fig.layout.xaxis.range) == [0, 2]
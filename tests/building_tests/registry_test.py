@@ -0,0 +1,45 @@
+import pytest
+from building import Building, Material, MATERIALS, Opening, OPENING_TYPES
+from building_serializer import BuildingSerializer
+from bulding_compounds.registry import ComponentRegistry
+from plan_builder import build_room_grid
+
+
+@pytest.fixture
+def grid():
+    b = Building()
+    build_room_grid(b, 2, 2, 3, 3, 3, MATERIALS["Brick_Red_250"])
+    tech = OPENING_TYPES["Win_Standard"]
+    for wid in list(b.walls)[:3]:
+        b.add_opening(wid, Opening(tech, 1.0, 1.0))
+    return b
+
+
+class TestComponentRegistry:
+
+    def test_loaded_walls_share_library_material(self, grid):
+        restored = BuildingSerializer.from_json(BuildingSerializer.to_json(grid))
+        materials = {id(w.base_material) for w in restored.walls.values()}
+        assert len(materials) == 1
+        assert next(iter(restored.walls.values())).base_material is MATERIALS["Brick_Red_250"]
+
+    def test_loaded_openings_share_tech(self, grid):
+        restored = BuildingSerializer.from_json(BuildingSerializer.to_json(grid))
+        techs = [op.tech for w in restored.walls.values() for op in w.openings]
+        assert len(techs) == 3
+        assert all(t is OPENING_TYPES["Win_Standard"] for t in techs)
+
+    def test_custom_material_interned_once(self):
+        b = Building()
+        build_room_grid(b, 1, 3, 3, 3, 3, Material(name="Custom", thickness=0.3))
+        registry = ComponentRegistry()
+        restored = BuildingSerializer.from_json(BuildingSerializer.to_json(b), registry)
+        assert len({id(w.base_material) for w in restored.walls.values()}) == 1
+        assert any(m.name == "Custom" for m in registry.materials)
+
+    def test_changed_entry_not_reused(self):
+        registry = ComponentRegistry(materials=[], techs=[])
+        first = registry.intern_material(Material(name="A"))
+        assert registry.intern_material(Material(name="A")) is first
+        first.thickness = 2.0  # змінено на місці — більше не відповідає ключу
+        assert registry.intern_material(Material(name="A")) is not first
@@ -0,0 +1,106 @@
+import gc
+import pytest
+from building import Building, Material, Opening, OPENING_TYPES
+from bulding_compounds.custom_errors import FrozenBuildingError
+from bulding_compounds.hvac import HVACDevice, HVACType
+from building_serializer import BuildingSerializer
+from plan_builder import RoomFootprint, build_rooms
+from simulation.thermal_sim import ThermalSimulation, RoomControlProfile
+
+
+@pytest.fixture
+def brick():
+    return Material(name="Brick", thickness=0.25, conductivity=0.7, density=1800, specific_heat=880)
+
+
+@pytest.fixture
+def building(brick):
+    b = Building()
+    base = b.create_initial_room(4, 4, 3, brick, "Base")
+    b.add_room_to_wall(b.get_wall_by_direction(base.id, "E").id, 3, "East")
+    return b
+
+
+def state(b: Building) -> str:
+    return BuildingSerializer.to_json(b)
+
+
+class TestSnapshot:
+
+    def test_shares_objects(self, building):
+        snap = building.snapshot()
+        assert snap.is_snapshot
+        assert all(snap.walls[k] is w for k, w in building.walls.items())
+        assert all(snap.rooms[k] is r for k, r in building.rooms.items())
+        assert snap.snapshot() is snap
+
+    def test_snapshot_is_read_only(self, building, brick):
+        snap = building.snapshot()
+        room_id = next(iter(snap.rooms))
+        with pytest.raises(FrozenBuildingError):
+            snap.delete_room(room_id)
+        with pytest.raises(FrozenBuildingError):
+            snap.create_initial_room(1, 1, 3, brick)
+        with pytest.raises(FrozenBuildingError):
+            build_rooms(snap, [RoomFootprint(50, 50, 2, 2)], 3, brick)
+
+    def test_edits_do_not_leak_into_snapshot(self, building):
+        base, east = list(building.rooms.values())
+        snap = building.snapshot()
+        frozen = state(snap)
+
+        wall = building.get_wall_by_direction(base.id, "S")
+        building.add_opening(wall.id, Opening(OPENING_TYPES["Win_Standard"], 1.0, 1.0))
+        building.set_wall_material(wall.id, Material(name="Concrete"))
+        building.add_hvac(base.id, HVACDevice("Heater", HVACType.HEATER, power_heating=1000))
+        building.add_room_to_wall(building.get_wall_by_direction(base.id, "N").id, 2, "North")
+        building.delete_room(east.id)
+
+        assert state(snap) == frozen
+        assert snap.validate().is_valid
+        assert set(snap.get_adjacent_room_ids(base.id)) == {east.id}
+
+    def test_only_touched_objects_copied(self, building):
+        base = next(iter(building.rooms.values()))
+        snap = building.snapshot()
+        wall = building.get_wall_by_direction(base.id, "S")
+        building.set_wall_material(wall.id, Material(name="Concrete"))
+
+        changed = [k for k, w in building.walls.items() if snap.walls[k] is not w]
+        assert changed == [wall.id]
+        # Друга правка тієї ж стіни не копіює її знову
+        copy = building.walls[wall.id]
+        building.set_wall_material(wall.id, Material(name="Wood"))
+        assert building.walls[wall.id] is copy
+
+    def test_no_copies_without_live_snapshots(self, building):
+        base = next(iter(building.rooms.values()))
+        wall = building.get_wall_by_direction(base.id, "S")
+        building.snapshot()
+        gc.collect()
+        building.set_wall_material(wall.id, Material(name="Concrete"))
+        assert building.walls[wall.id] is wall
+
+    def test_undo_after_snapshot_keeps_snapshot(self, building):
+        base = next(iter(building.rooms.values()))
+        wall = building.get_wall_by_direction(base.id, "S")
+        building.add_opening(wall.id, Opening(OPENING_TYPES["Win_Standard"], 1.0, 1.0))
+
+        snap = building.snapshot()
+        building.undo()
+        assert len(snap.walls[wall.id].openings) == 1
+        assert len(building.walls[wall.id].openings) == 0
+
+    def test_simulation_on_snapshot(self, building):
+        profiles = {rid: RoomControlProfile() for rid in building.rooms}
+        snap = building.snapshot()
+        sim = ThermalSimulation(snap)
+        sim.initialize(start_temp=18.0, profiles=profiles, t_min=-5, t_max=0, internal_gain=100)
+
+        building.delete_room(next(iter(building.rooms)))
+        sim.run_simulation(duration_hours=1)
+
+        reference = ThermalSimulation(snap)
+        reference.initialize(start_temp=18.0, profiles=profiles, t_min=-5, t_max=0, internal_gain=100)
+        reference.run_simulation(duration_hours=1)
+        assert sim.history_temps == reference.history_temps
@@ -0,0 +1,82 @@
+import copy
+import pickle
+import pytest
+from building import Building, Wall, Material
+from bulding_compounds.custom_errors import RoomOverlapError
+from bulding_compounds.spatial_index import SegmentGridIndex
+
+
+class TestSegmentGridIndex:
+
+    def test_query_returns_touching_segments(self):
+        index = SegmentGridIndex(cell_size=2.0)
+        index.insert("a", 0, 0, 4, 0)
+        index.insert("b", 4, 0, 4, 4)  # торкається "a" кінцем
+        index.insert("far", 100, 100, 104, 100)
+
+        assert set(index.query(2, -1, 2, 1)) == {"a"}
+        assert set(index.query(4, 0, 6, 0)) == {"a", "b"}
+        assert index.query(50, 50, 51, 51) == []
+
+    def test_remove_and_reinsert(self):
+        index = SegmentGridIndex()
+        index.insert("a", 0, 0, 10, 0)
+        index.remove("a")
+        assert "a" not in index
+        assert index.query(0, 0, 10, 0) == []
+
+        index.insert("a", 0, 0, 10, 0)
+        index.insert("a", 20, 0, 30, 0)  # повторна вставка переносить відрізок
+        assert len(index) == 1
+        assert index.query(0, 0, 10, 0) == []
+
+    def test_invalid_cell_size(self):
+        with pytest.raises(ValueError):
+            SegmentGridIndex(cell_size=0)
+
+
+class TestBuildingWallIndex:
+
+    @pytest.fixture
+    def building(self):
+        b = Building()
+        b.create_initial_room(10, 10, 3, Material(name="Brick"), name="Base")
+        return b
+
+    def test_direct_insert_is_indexed(self, building):
+        # Стіна, вставлена напряму в словник, має блокувати прибудову
+        building.walls["blocker"] = Wall(-5, 12, 15, 12, 3, Material())
+        north = next(w for w in building.walls.values() if w.start_y == 10 and w.end_y == 10)
+        with pytest.raises(RoomOverlapError):
+            building.add_room_to_wall(north.id, 5.0)
+
+    def test_deleted_wall_is_unindexed(self, building):
+        building.walls["blocker"] = Wall(-5, 12, 15, 12, 3, Material())
+        del building.walls["blocker"]
+        north = next(w for w in building.walls.values() if w.start_y == 10 and w.end_y == 10)
+        assert building.add_room_to_wall(north.id, 5.0) is not None
+
+    def test_whole_dict_assignment_reindexes(self, building):
+        building.walls = {"x": Wall(0, 5, 10, 5, 3, Material())}
+        assert not building.check_if_walls_intersection_right(Wall(5, 0, 5, 10, 3, Material()))
+        assert building.check_if_walls_intersection_right(Wall(20, 0, 20, 10, 3, Material()))
+
+    @pytest.mark.parametrize("clone", [copy.deepcopy, lambda b: pickle.loads(pickle.dumps(b))])
+    def test_copies_keep_working_index(self, building, clone):
+        other = clone(building)
+        assert other == building
+        other.walls["blocker"] = Wall(-5, 5, 15, 5, 3, Material())
+        assert not other.check_if_walls_intersection_right(Wall(5, 0, 5, 10, 3, Material()))
+        # Оригінал не змінився
+        assert "blocker" not in building.walls
+
+    def test_long_chain_of_rooms(self):
+        """Довгий ланцюжок кімнат будується без помилок перетину."""
+        b = Building()
+        b.create_initial_room(4, 4, 3, Material(name="Brick"), name="R0")
+        room = next(iter(b.rooms.values()))
+        for i in range(60):
+            east = b.get_wall_by_direction(room.id, "E")
+            room = b.add_room_to_wall(east.id, 4.0, f"R{i + 1}")
+        assert len(b.rooms) == 61
+        assert len(b.walls) == 4 + 60 * 3
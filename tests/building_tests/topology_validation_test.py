@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+from building import Building, Wall, Room, Material
+from bulding_compounds.validation import find_improper_pairs
+
+
+@pytest.fixture
+def building():
+    b = Building()
+    b.create_initial_room(10, 10, 3, Material(name="Brick"), name="Base")
+    base = next(iter(b.rooms.values()))
+    b.add_room_to_wall(b.get_wall_by_direction(base.id, "N").id, 5, "North")
+    return b
+
+
+class TestFindImproperPairs:
+
+    def test_detects_crossing_and_overlap(self):
+        segments = np.array([
+            [0, 0, 10, 0],
+            [5, -5, 5, 5],   # X з першим
+            [20, 0, 30, 0],
+            [25, 0, 35, 0],  # накладання з третім
+            [10, 0, 10, 10], # кут з першим — ок
+        ], dtype=float)
+        pairs = {tuple(sorted(p)) for p in find_improper_pairs(segments).tolist()}
+        assert pairs == {(0, 1), (2, 3)}
+
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(7)
+        segments = rng.integers(0, 6, size=(120, 4)).astype(float)
+        segments = segments[(segments[:, 0] != segments[:, 2]) | (segments[:, 1] != segments[:, 3])]
+
+        from bulding_compounds.wall import segments_intersect_properly
+        expected = set()
+        for i in range(len(segments)):
+            bad = ~segments_intersect_properly(segments[i], segments[i + 1:])
+            expected |= {(i, i + 1 + int(k)) for k in np.flatnonzero(bad)}
+
+        found = {tuple(sorted(p)) for p in find_improper_pairs(segments).tolist()}
+        assert found == expected
+
+    def test_matches_brute_force_mixed_lengths(self):
+        # Короткі та довгі відрізки з дробовими координатами: довгі накривають багато клітинок сітки
+        rng = np.random.default_rng(11)
+        starts = rng.uniform(0, 50, size=(300, 2))
+        lengths = rng.choice([0.5, 2.0, 40.0], size=(300, 1))
+        angles = rng.uniform(0, np.pi, size=(300, 1))
+        segments = np.hstack([starts, starts + lengths * np.hstack([np.cos(angles), np.sin(angles)])])
+
+        from bulding_compounds.wall import segments_intersect_properly
+        expected = set()
+        for i in range(len(segments)):
+            bad = ~segments_intersect_properly(segments[i], segments[i + 1:])
+            expected |= {(i, i + 1 + int(k)) for k in np.flatnonzero(bad)}
+
+        found = [tuple(sorted(p)) for p in find_improper_pairs(segments).tolist()]
+        assert len(found) == len(set(found))
+        assert set(found) == expected
+
+    def test_small_inputs(self):
+        assert find_improper_pairs(np.empty((0, 4))).shape == (0, 2)
+        assert find_improper_pairs(np.array([[0, 0, 1, 0]])).shape == (0, 2)
+
+
+class TestBuildingValidate:
+
+    def test_valid_building(self, building):
+        report = building.validate()
+        assert report.is_valid
+        assert report.messages() == []
+
+    def test_reports_improper_intersection(self, building):
+        building.walls["cross"] = Wall(5, -5, 5, 5, 3, Material())
+        report = building.validate()
+        assert not report.is_valid
+        assert all("cross" in pair for pair in report.improper_intersections)
+        assert len(report.improper_intersections) == 1
+
+    def test_reports_duplicate(self, building):
+        south = next(w for w in building.walls.values() if w.start_y == 0 and w.end_y == 0)
+        building.walls["dup"] = Wall(south.end_x, south.end_y, south.start_x, south.start_y)
+        report = building.validate()
+        assert report.duplicate_walls == [[south.id, "dup"]]
+
+    def test_reports_orphan_wall_id(self, building):
+        room = next(iter(building.rooms.values()))
+        room.wall_ids.append("ghost")
+        assert building.validate().orphan_wall_ids == [(room.id, "ghost")]
+
+    def test_reports_overfull_wall(self, building):
+        wall = next(iter(building.walls.values()))
+        wall.room_ids.extend(["x", "y"])
+        report = building.validate()
+        assert report.overfull_walls == [wall.id]
+        assert any(wall.id in msg for msg in report.messages())
+
+    def test_large_grid_is_valid(self):
+        """Сітка 30x30 кімнат зі спільними стінами — без хибних спрацювань."""
+        b = Building()
+        n = 30
+        for i in range(n + 1):
+            for j in range(n):
+                b.walls[f"h{i}_{j}"] = Wall(j, i, j + 1, i)
+                b.walls[f"v{i}_{j}"] = Wall(i, j, i, j + 1)
+        assert b.validate().is_valid
+
+    def test_tall_column_is_fast(self):
+        """Стовпчик кімнат: габарити всіх стін перекриваються по X, тож сортування лише по X дало б O(n²)."""
+        import time
+        from plan_builder import build_room_grid
+        b = Building()
+        build_room_grid(b, 5000, 1, 3, 3, 3, Material(name="Brick"))
+        start = time.perf_counter()
+        assert b.validate().is_valid
+        assert time.perf_counter() - start < 1.0
+
+    def test_tall_column_finds_crossing(self):
+        segments = np.array([[0, y, 3, y] for y in range(0, 3000, 3)] + [[1, 10, 1, 11]], dtype=float)
+        pairs = {tuple(sorted(p)) for p in find_improper_pairs(segments).tolist()}
+        assert pairs == set()
+        segments[-1] = [1, 10, 1, 13]  # перетинає горизонталь y=12
+        pairs = {tuple(sorted(p)) for p in find_improper_pairs(segments).tolist()}
+        assert pairs == {(4, len(segments) - 1)}
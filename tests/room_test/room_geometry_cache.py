@@ -0,0 +1,89 @@
+import pytest
+from building import Building, Wall, Room, Material
+
+
+@pytest.fixture
+def building():
+    b = Building()
+    base = b.create_initial_room(10, 5, 3, Material(name="Brick"), "Base")
+    b.add_room_to_wall(b.get_wall_by_direction(base.id, "E").id, 4, "East")
+    return b, base
+
+
+class TestRoomGeometryCache:
+
+    def test_values(self, building):
+        b, base = building
+        geometry = b.get_room_geometry(base)
+        assert geometry.center == (5.0, 2.5)
+        assert geometry.bounds == (0.0, 0.0, 10.0, 5.0)
+        assert geometry.floor_area == 50.0
+        assert geometry.volume == 150.0
+        assert sorted(geometry.wall_directions.values()) == ["E", "N", "S", "W"]
+
+    def test_cached_between_calls(self, building):
+        b, base = building
+        assert b.get_room_geometry(base) is b.get_room_geometry(base)
+
+    def test_wall_move_invalidates_only_own_room(self, building):
+        b, base = building
+        east = next(r for r in b.rooms.values() if r.id != base.id)
+        base_geometry = b.get_room_geometry(base)
+        east_geometry = b.get_room_geometry(east)
+
+        # Північна стіна кімнати East не належить Base
+        north = b.get_wall_by_direction(east.id, "N")
+        north.start_y += 1
+        north.end_y += 1
+
+        assert b.get_room_geometry(base) is base_geometry
+        assert b.get_room_geometry(east) is not east_geometry
+        assert b.calculate_room_dimensions(east.id) == (4.0, 6.0)
+
+    def test_wall_list_change_invalidates(self, building):
+        b, base = building
+        geometry = b.get_room_geometry(base)
+        base.wall_ids.append("missing")
+        assert b.get_room_geometry(base) is not geometry
+
+    def test_replaced_wall_invalidates(self, building):
+        b, base = building
+        geometry = b.get_room_geometry(base)
+        south = b.get_wall_by_direction(base.id, "S")
+        b.walls[south.id] = Wall(0, -1, 10, -1, id=south.id, room_ids=[base.id])
+        assert b.get_room_geometry(base).bounds == (0.0, -1.0, 10.0, 5.0)
+        assert b.get_room_geometry(base) is not geometry
+
+    def test_height_change_updates_volume(self, building):
+        b, base = building
+        b.get_room_geometry(base)
+        base.height = 4
+        assert b.get_room_geometry(base).volume == 200.0
+
+    def test_direction_uses_cached_center(self, building):
+        b, base = building
+        for wid, direction in b.get_room_geometry(base).wall_directions.items():
+            assert b.get_wall_direction(wid, base.id) == direction
+
+    def test_no_walls(self):
+        b = Building()
+        room = Room("Ghost", 5, 5, 3, 0, 0, wall_ids=["a"])
+        assert b.get_room_geometry(room) is None
+
+    def test_unrelated_wall_move_keeps_fast_path(self, building):
+        b, base = building
+        geometry = b.get_room_geometry(base)
+        east = next(r for r in b.rooms.values() if r.id != base.id)
+        b.get_wall_by_direction(east.id, "N").start_y += 1
+        assert b.get_room_geometry(base) is geometry
+        # Після перевірки за відбитком запис знову проходить швидку перевірку
+        cached = b._room_geometry[base.id]
+        assert b._changes.room_revision(base.id) == cached[0]
+
+    def test_deleted_wall_bumps_room_revision(self, building):
+        b, base = building
+        geometry = b.get_room_geometry(base)
+        revision = b._changes.room_revision(base.id)
+        del b.walls[b.get_wall_by_direction(base.id, "S").id]
+        assert b._changes.room_revision(base.id) > revision
+        assert b.get_room_geometry(base) is not geometry
@@ -0,0 +1,123 @@
+import pytest
+from building import Building, Wall, Room, Material
+from bulding_compounds.hvac import HVACDevice, HVACType
+from simulation.thermal_sim import ThermalSimulation, RoomControlProfile, PARALLEL_MIN_COMPONENTS
+from simulation.controls import ControlMode
+from simulation.components import find_room_components, extract_component
+from simulation.incremental import run_incremental
+from simulation.result_cache import ResultCache
+
+
+def add_box_room(b: Building, x: float, y: float, size: float, name: str) -> Room:
+    """Окрема прямокутна кімната з власними стінами у точці (x, y)."""
+    mat = Material(name="Brick", thickness=0.25, conductivity=0.7, density=1800, specific_heat=880)
+    room = Room(name, size, size, 3, x, y, wall_ids=[])
+    corners = [(x, y), (x + size, y), (x + size, y + size), (x, y + size)]
+    for i in range(4):
+        (sx, sy), (ex, ey) = corners[i], corners[(i + 1) % 4]
+        wall = Wall(sx, sy, ex, ey, 3, mat, room_ids=[room.id])
+        b.walls[wall.id] = wall
+        room.wall_ids.append(wall.id)
+    b.rooms[room.id] = room
+    return room
+
+
+@pytest.fixture
+def two_wings():
+    """Два крила: A (дві суміжні кімнати) та B (окрема кімната далеко)."""
+    b = Building()
+    b.create_initial_room(4, 4, 3, Material(name="Brick", thickness=0.25, conductivity=0.7), "A1")
+    a1 = next(iter(b.rooms.values()))
+    east = b.get_wall_by_direction(a1.id, "E")
+    a2 = b.add_room_to_wall(east.id, 3.0, "A2")
+    b_room = add_box_room(b, 100, 100, 5, "B1")
+    b_room.add_hvac(HVACDevice("Heater", HVACType.HEATER, power_heating=1500))
+    return b, [a1.id, a2.id], [b_room.id]
+
+
+def profiles_for(building, target=21.0):
+    return {rid: RoomControlProfile(target_temp=target) for rid in building.rooms}
+
+
+def run(cache, building, profiles):
+    return run_incremental(cache, building, profiles, start_temp=18.0, t_min=-5, t_max=0,
+                           internal_gain=100, duration_hours=2, dt_seconds=60)
+
+
+class TestComponents:
+
+    def test_split_into_wings(self, two_wings):
+        b, wing_a, wing_b = two_wings
+        assert find_room_components(b) == [wing_a, wing_b]
+
+    def test_extract_component_keeps_own_walls(self, two_wings):
+        b, wing_a, _ = two_wings
+        sub = extract_component(b, wing_a)
+        assert set(sub.rooms) == set(wing_a)
+        assert all(set(w.room_ids) <= set(wing_a) for w in sub.walls.values())
+
+
+class TestIncrementalRun:
+
+    def test_matches_full_simulation(self, two_wings):
+        b, _, _ = two_wings
+        profiles = profiles_for(b)
+        result = run(ResultCache(cache_dir=None), b, profiles).result
+
+        sim = ThermalSimulation(b)
+        sim.initialize(start_temp=18.0, profiles=profiles, t_min=-5, t_max=0, internal_gain=100)
+        sim.run_simulation(duration_hours=2, dt_seconds=60)
+
+        assert result.history_temps == sim.history_temps
+        assert result.total_energy_kwh == sim.total_energy_kwh
+        assert result.history_time == sim.history_time
+
+    def test_only_changed_component_recomputed(self, two_wings):
+        b, wing_a, wing_b = two_wings
+        cache = ResultCache(cache_dir=None)
+        profiles = profiles_for(b)
+
+        first = run(cache, b, profiles)
+        assert len(first.recomputed) == 2
+
+        # Змінюємо уставку кімнати з крила B
+        profiles[wing_b[0]] = RoomControlProfile(target_temp=25.0)
+        second = run(cache, b, profiles)
+
+        assert second.recomputed == [wing_b]
+        # Крило A не змінилось
+        for rid in wing_a:
+            assert second.result.history_temps[rid] == first.result.history_temps[rid]
+
+    def test_unchanged_inputs_fully_cached(self, two_wings):
+        b, _, _ = two_wings
+        cache = ResultCache(cache_dir=None)
+        run(cache, b, profiles_for(b))
+        assert run(cache, b, profiles_for(b)).recomputed == []
+
+    def test_progress_reaches_one(self, two_wings):
+        b, _, _ = two_wings
+        seen = []
+        run_incremental(ResultCache(cache_dir=None), b, profiles_for(b), start_temp=18.0, t_min=-5, t_max=0,
+                        internal_gain=0, duration_hours=1, chunks=4, on_progress=seen.append)
+        assert seen[-1] == pytest.approx(1.0)
+
+    def test_invalid_chunks(self, two_wings):
+        b, _, _ = two_wings
+        with pytest.raises(ValueError):
+            run_incremental(ResultCache(cache_dir=None), b, profiles_for(b), start_temp=18.0, t_min=-5, t_max=0,
+                            internal_gain=0, duration_hours=1, chunks=0)
+
+    def test_many_components_in_processes_match_serial(self):
+        b = Building()
+        for n in range(PARALLEL_MIN_COMPONENTS):
+            add_box_room(b, n * 20.0, 0, 4, f"House {n}")
+        serial = run_incremental(ResultCache(cache_dir=None), b, profiles_for(b), start_temp=18.0, t_min=-5,
+                                 t_max=0, internal_gain=100, duration_hours=1, chunks=2, workers=1)
+        seen = []
+        parallel = run_incremental(ResultCache(cache_dir=None), b, profiles_for(b), start_temp=18.0, t_min=-5,
+                                   t_max=0, internal_gain=100, duration_hours=1, chunks=2, workers=2,
+                                   on_progress=seen.append)
+        assert parallel.result == serial.result
+        assert len(parallel.recomputed) == PARALLEL_MIN_COMPONENTS
+        assert seen[-1] == pytest.approx(1.0)
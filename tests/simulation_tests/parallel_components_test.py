@@ -0,0 +1,72 @@
+import pytest
+from building import Building, Wall, Room, Material
+from bulding_compounds.hvac import HVACDevice, HVACType
+from simulation.thermal_sim import ThermalSimulation, RoomControlProfile, PARALLEL_MIN_COMPONENTS
+
+
+def build_campus(count: int) -> Building:
+    """Кілька окремих будиночків, що не мають спільних стін."""
+    b = Building()
+    mat = Material(name="Brick", thickness=0.25, conductivity=0.7, density=1800, specific_heat=880)
+    for n in range(count):
+        x = n * 20.0
+        room = Room(f"House {n}", 4, 4, 3, x, 0, wall_ids=[])
+        corners = [(x, 0), (x + 4, 0), (x + 4, 4), (x, 4)]
+        for i in range(4):
+            (sx, sy), (ex, ey) = corners[i], corners[(i + 1) % 4]
+            wall = Wall(sx, sy, ex, ey, 3, mat, room_ids=[room.id])
+            b.walls[wall.id] = wall
+            room.wall_ids.append(wall.id)
+        if n % 2 == 0:
+            room.add_hvac(HVACDevice("Heater", HVACType.HEATER, power_heating=1000))
+        b.rooms[room.id] = room
+    return b
+
+
+def make_sim(b: Building) -> ThermalSimulation:
+    sim = ThermalSimulation(b)
+    profiles = {rid: RoomControlProfile(target_temp=21.0) for rid in b.rooms}
+    sim.initialize(start_temp=18.0, profiles=profiles, t_min=-8, t_max=-2, internal_gain=50)
+    return sim
+
+
+class TestParallelComponents:
+
+    def test_parallel_matches_serial(self):
+        b = build_campus(PARALLEL_MIN_COMPONENTS + 1)
+        serial = make_sim(b)
+        parallel = make_sim(b)
+
+        serial.run_simulation(duration_hours=1, dt_seconds=60)
+        parallel.run_simulation(duration_hours=1, dt_seconds=60, workers=2)
+
+        assert parallel.history_temps == serial.history_temps
+        assert parallel.total_energy_kwh == serial.total_energy_kwh
+        assert parallel.history_time == serial.history_time
+        assert parallel.history_outdoor == serial.history_outdoor
+        assert parallel.current_time_sec == serial.current_time_sec
+
+    def test_parallel_can_be_continued(self):
+        """Кілька послідовних викликів (як робить сторінка симуляції) склеюють історію."""
+        b = build_campus(PARALLEL_MIN_COMPONENTS)
+        serial = make_sim(b)
+        parallel = make_sim(b)
+
+        for _ in range(2):
+            serial.run_simulation(duration_hours=0.5, dt_seconds=60)
+            parallel.run_simulation(duration_hours=0.5, dt_seconds=60, workers=2)
+
+        assert parallel.history_temps == serial.history_temps
+        assert len(parallel.history_time) == 61
+
+    def test_few_components_stay_serial(self, monkeypatch):
+        """Для малої кількості зон пул процесів не піднімається."""
+        b = build_campus(PARALLEL_MIN_COMPONENTS - 1)
+        sim = make_sim(b)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("parallel path should not be used")
+
+        monkeypatch.setattr(sim, "_run_parallel", fail)
+        sim.run_simulation(duration_hours=0.1, dt_seconds=60, workers=4)
+        assert sim.current_time_sec == pytest.approx(360.0)
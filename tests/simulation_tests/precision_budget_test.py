@@ -0,0 +1,126 @@
+import pytest
+from array import array
+from simulation.thermal_sim import ThermalSimulation, Building, Room, RoomControlProfile, HISTORY_BYTES_PER_SAMPLE
+from bulding_compounds.material import Material
+
+
+@pytest.fixture
+def building():
+    b = Building()
+    b.create_initial_room(5, 4, 3, Material(name="Brick", thickness=0.25, conductivity=0.7), "Hall")
+    return b
+
+
+def make_sim(building, **kwargs):
+    sim = ThermalSimulation(building, **kwargs)
+    sim.initialize(start_temp=20.0, profiles={rid: RoomControlProfile() for rid in building.rooms},
+                   t_min=-5, t_max=0)
+    return sim
+
+
+class TestFloat32Mode:
+
+    def test_history_is_compact_array(self, building):
+        sim = make_sim(building, precision="float32")
+        sim.run_simulation(duration_hours=1, dt_seconds=60)
+
+        rid = next(iter(building.rooms))
+        assert isinstance(sim.history_temps[rid], array)
+        assert sim.history_temps[rid].typecode == "f"
+        assert len(sim.history_temps[rid]) == 61
+        assert len(sim.history_time) == len(sim.history_outdoor) == 61
+
+    def test_time_stays_float64(self, building):
+        sim = make_sim(building, precision="float32")
+        # Далеко від старту float32 мав би крок ~0.004 год і нерівні інтервали
+        sim.current_time_sec = 5 * 365 * 24 * 3600
+        sim.run_simulation(duration_hours=1, dt_seconds=60)
+
+        assert sim.history_time.typecode == "d"
+        times = list(sim.history_time)[1:]
+        gaps = [b - a for a, b in zip(times, times[1:])]
+        assert gaps == pytest.approx([1 / 60] * len(gaps), abs=1e-9)
+
+    def test_close_to_float64(self, building):
+        f64 = make_sim(building)
+        f32 = make_sim(building, precision="float32")
+        f64.run_simulation(duration_hours=2, dt_seconds=60)
+        f32.run_simulation(duration_hours=2, dt_seconds=60)
+
+        rid = next(iter(building.rooms))
+        assert f32.current_temperatures[rid] == pytest.approx(f64.current_temperatures[rid], abs=1e-3)
+
+    def test_chart_accepts_float32_history(self, building):
+        sim = make_sim(building, precision="float32")
+        sim.run_simulation(duration_hours=1, dt_seconds=60)
+        fig = sim.get_results_chart()
+        assert len(fig.data[0].x) == 61
+
+    def test_unknown_precision(self, building):
+        with pytest.raises(ValueError, match="Unknown precision"):
+            ThermalSimulation(building, precision="float16")
+
+
+class TestMemoryBudget:
+
+    def test_estimate(self, building):
+        sim = make_sim(building)
+        # 1 кімната + час + вулиця = 3 ряди; 1 стартова точка + 60 нових
+        assert sim.estimate_history_bytes(60) == 3 * 61 * HISTORY_BYTES_PER_SAMPLE["float64"]
+
+    def test_no_decimation_within_budget(self, building):
+        sim = make_sim(building, memory_budget=10 ** 9)
+        sim.run_simulation(duration_hours=1, dt_seconds=60)
+        assert sim.history_stride == 1
+        assert len(sim.history_time) == 61
+
+    def test_decimation_keeps_history_within_budget(self, building):
+        budget = 3 * 25 * HISTORY_BYTES_PER_SAMPLE["float64"]
+        sim = make_sim(building, memory_budget=budget)
+        sim.run_simulation(duration_hours=2, dt_seconds=60)
+
+        rid = next(iter(building.rooms))
+        assert sim.history_stride > 1
+        assert 3 * len(sim.history_time) * HISTORY_BYTES_PER_SAMPLE["float64"] <= budget
+        assert len(sim.history_temps[rid]) == len(sim.history_time) == len(sim.history_outdoor)
+        # Фізика не проріджується — час іде повністю
+        assert sim.current_time_sec == 7200
+
+    def test_decimated_state_matches_full(self, building):
+        full = make_sim(building)
+        sparse = make_sim(building, memory_budget=3 * 10 * HISTORY_BYTES_PER_SAMPLE["float64"])
+        full.run_simulation(duration_hours=1, dt_seconds=60)
+        sparse.run_simulation(duration_hours=1, dt_seconds=60)
+        assert sparse.current_temperatures == full.current_temperatures
+
+    def test_invalid_budget(self, building):
+        with pytest.raises(ValueError):
+            ThermalSimulation(building, memory_budget=0)
+
+    def test_chunked_run_uses_planned_budget(self, building):
+        budget = 3 * 25 * HISTORY_BYTES_PER_SAMPLE["float64"]
+        sim = make_sim(building, memory_budget=budget)
+        sim.plan_history(duration_hours=2, dt_seconds=60)
+        for _ in range(10):
+            sim.run_simulation(duration_hours=0.2, dt_seconds=60)
+
+        # Крок визначено одразу, точки рівномірні від старту до кінця
+        stride = sim.history_stride
+        assert 3 * len(sim.history_time) * HISTORY_BYTES_PER_SAMPLE["float64"] <= budget
+        assert list(sim.history_time) == pytest.approx([i * stride / 60 for i in range(len(sim.history_time))])
+        assert sim.history_time[-1] == pytest.approx(2.0)
+
+    def test_unplanned_continuation_stays_even(self, building):
+        budget = 3 * 25 * HISTORY_BYTES_PER_SAMPLE["float64"]
+        sim = make_sim(building, memory_budget=budget)
+        for _ in range(10):
+            sim.run_simulation(duration_hours=0.2, dt_seconds=60)
+
+        rid = next(iter(building.rooms))
+        times = list(sim.history_time)
+        gaps = {round(b - a, 9) for a, b in zip(times, times[1:])}
+        assert len(gaps) == 1
+        assert 3 * len(times) * HISTORY_BYTES_PER_SAMPLE["float64"] <= budget
+        assert len(sim.history_temps[rid]) == len(times) == len(sim.history_outdoor)
+        # Наприкінці історії не одна-дві точки на частину, а більша частина бюджету
+        assert len(times) > 12
@@ -0,0 +1,85 @@
+import pytest
+from simulation.thermal_sim import ThermalSimulation, Building, RoomControlProfile
+from simulation.profiling import PHASES, SimulationProfiler
+from bulding_compounds.material import Material
+
+
+@pytest.fixture
+def building():
+    b = Building()
+    b.create_initial_room(5, 4, 3, Material(name="Brick", thickness=0.25, conductivity=0.7), "Hall")
+    wall = next(iter(b.walls.values()))
+    b.add_room_to_wall(wall.id, 3.0, "Second")
+    return b
+
+
+def make_sim(building, **kwargs):
+    sim = ThermalSimulation(building, **kwargs)
+    sim.initialize(start_temp=20.0, profiles={rid: RoomControlProfile() for rid in building.rooms},
+                   t_min=-5, t_max=0)
+    return sim
+
+
+class TestProfiling:
+
+    def test_disabled_by_default(self, building):
+        sim = make_sim(building)
+        sim.run_simulation(duration_hours=0.5, dt_seconds=60)
+        assert sim.profiler is None
+        assert sim.get_profile_report() is None
+
+    def test_phase_call_counts(self, building):
+        sim = make_sim(building, profile=True)
+        sim.run_simulation(duration_hours=1, dt_seconds=60)
+        report = sim.get_profile_report()
+
+        rooms = len(building.rooms)
+        assert set(report.phases) == set(PHASES)
+        assert report.steps == 60
+        assert report.phases["weather"].calls == 60
+        assert report.phases["history"].calls == 60
+        assert report.phases["transmission"].calls == 60 * rooms
+        assert report.phases["hvac"].calls == 60 * rooms
+        assert report.phases["mass"].calls == 60 * rooms
+        assert report.wall_time_sec > 0
+        assert report.steps_per_second > 0
+        assert not report.allocations_tracked
+        assert report.allocated_bytes == report.peak_allocated_bytes == 0
+
+    def test_allocation_pass_has_no_timings(self, building):
+        sim = make_sim(building, profile_allocations=True)
+        sim.run_simulation(duration_hours=1, dt_seconds=60)
+        report = sim.get_profile_report()
+
+        assert report.allocations_tracked
+        assert report.peak_allocated_bytes > 0
+        assert report.phases["transmission"].calls == 60 * len(building.rooms)
+        # Час під tracemalloc не видається за час фаз
+        assert report.wall_time_sec == 0
+        assert all(stats.total_sec == 0 for stats in report.phases.values())
+        assert "кроків/с" not in report.summary()
+
+    def test_passes_are_exclusive(self, building):
+        with pytest.raises(ValueError):
+            ThermalSimulation(building, profile=True, profile_allocations=True)
+
+    def test_accumulates_across_runs(self, building):
+        sim = make_sim(building, profile=True)
+        sim.run_simulation(duration_hours=0.5, dt_seconds=60)
+        sim.run_simulation(duration_hours=0.5, dt_seconds=60)
+        assert sim.get_profile_report().steps == 60
+
+    def test_same_physics_when_profiled(self, building):
+        plain = make_sim(building)
+        profiled = make_sim(building, profile=True)
+        plain.run_simulation(duration_hours=1, dt_seconds=60)
+        profiled.run_simulation(duration_hours=1, dt_seconds=60)
+        assert profiled.history_temps == plain.history_temps
+
+    def test_report_is_snapshot(self):
+        profiler = SimulationProfiler(track_allocations=False)
+        profiler.add("weather", 0.5)
+        report = profiler.report()
+        profiler.add("weather", 0.5)
+        assert report.phases["weather"].calls == 1
+        assert "weather" in report.summary()
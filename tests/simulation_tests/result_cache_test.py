@@ -0,0 +1,125 @@
+import pytest
+from simulation.thermal_sim import ThermalSimulation, Building, RoomControlProfile
+from simulation.controls import ControlMode
+from simulation.result_cache import ResultCache, SimulationResult, make_cache_key
+from bulding_compounds.material import Material
+
+
+@pytest.fixture
+def building():
+    b = Building()
+    b.create_initial_room(4, 3, 2.8, Material(name="Brick", thickness=0.25, conductivity=0.7), "Hall")
+    return b
+
+
+@pytest.fixture
+def profiles(building):
+    return {rid: RoomControlProfile() for rid in building.rooms}
+
+
+def run_sim(building, profiles, hours=1):
+    sim = ThermalSimulation(building)
+    sim.initialize(start_temp=20.0, profiles=profiles, t_min=-5, t_max=0)
+    sim.run_simulation(duration_hours=hours, dt_seconds=60)
+    return sim
+
+
+class TestCacheKey:
+
+    def test_key_is_deterministic(self, building, profiles):
+        key1 = make_cache_key(building, profiles, t_min=-5, t_max=0)
+        key2 = make_cache_key(building, profiles, t_max=0, t_min=-5)
+        assert key1 == key2
+
+    def test_key_changes_with_options(self, building, profiles):
+        assert make_cache_key(building, profiles, t_min=-5) != make_cache_key(building, profiles, t_min=-6)
+
+    def test_key_changes_with_profile(self, building, profiles):
+        key1 = make_cache_key(building, profiles)
+        rid = next(iter(profiles))
+        changed = dict(profiles)
+        changed[rid] = RoomControlProfile(mode=ControlMode.ALWAYS_OFF)
+        assert key1 != make_cache_key(building, changed)
+
+    def test_key_changes_with_building(self, building, profiles):
+        key1 = make_cache_key(building, profiles)
+        wall = next(iter(building.walls.values()))
+        building.add_room_to_wall(wall.id, 3.0, "Second")
+        profiles = {rid: RoomControlProfile() for rid in building.rooms}
+        assert key1 != make_cache_key(building, profiles)
+
+    def test_key_changes_with_engine_version(self, building, profiles, monkeypatch):
+        import simulation.result_cache as result_cache
+        key1 = make_cache_key(building, profiles)
+        monkeypatch.setattr(result_cache, "ENGINE_VERSION", result_cache.ENGINE_VERSION + 1)
+        assert key1 != make_cache_key(building, profiles)
+
+
+class TestResultCache:
+
+    def test_roundtrip_through_simulation(self, building, profiles, tmp_path):
+        sim = run_sim(building, profiles)
+        cache = ResultCache(cache_dir=str(tmp_path))
+        cache.put("k", SimulationResult.from_simulation(sim))
+
+        fresh = ThermalSimulation(building)
+        fresh.initialize(start_temp=20.0, profiles=profiles, t_min=-5, t_max=0)
+        cache.get("k").apply_to(fresh)
+
+        assert fresh.history_temps == sim.history_temps
+        assert fresh.total_energy_kwh == sim.total_energy_kwh
+        assert fresh.current_time_sec == sim.current_time_sec
+
+    def test_lru_eviction(self):
+        cache = ResultCache(max_entries=2, cache_dir=None)
+        result = SimulationResult([0.0], [0.0], {}, {}, {}, 0.0)
+        cache.put("a", result)
+        cache.put("b", result)
+        cache.get("a")  # "a" тепер найсвіжіший
+        cache.put("c", result)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert len(cache) == 2
+
+    def test_disk_shared_between_instances(self, building, profiles, tmp_path):
+        sim = run_sim(building, profiles)
+        ResultCache(cache_dir=str(tmp_path)).put("k", SimulationResult.from_simulation(sim))
+
+        # Інший "воркер" з порожньою пам'яттю бачить результат з диска
+        other = ResultCache(cache_dir=str(tmp_path))
+        loaded = other.get("k")
+        assert loaded is not None
+        assert loaded.history_temps == sim.history_temps
+
+    def test_corrupted_file_is_a_miss(self, tmp_path):
+        cache = ResultCache(cache_dir=str(tmp_path))
+        (tmp_path / "bad.json").write_text("{not json", encoding="utf-8")
+        assert cache.get("bad") is None
+
+    def test_clear(self, tmp_path):
+        cache = ResultCache(cache_dir=str(tmp_path))
+        cache.put("k", SimulationResult([0.0], [0.0], {}, {}, {}, 0.0))
+        cache.clear()
+        assert "k" not in cache
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            ResultCache(max_entries=0)
+
+    def test_disk_eviction(self, tmp_path):
+        import os
+        cache = ResultCache(max_entries=1, cache_dir=str(tmp_path), max_disk_entries=2)
+        result = SimulationResult([0.0], [0.0], {}, {}, {}, 0.0)
+        cache.put("a", result)
+        cache.put("b", result)
+        # "a" використано останнім — mtime свіжіший за "b"
+        os.utime(tmp_path / "b.json", (1, 1))
+        cache.put("c", result)
+
+        assert sorted(p.name for p in tmp_path.glob("*.json")) == ["a.json", "c.json"]
+        assert "b" not in ResultCache(cache_dir=str(tmp_path))
+
+    def test_invalid_disk_size(self):
+        with pytest.raises(ValueError):
+            ResultCache(max_disk_entries=0, cache_dir=None)
@@ -114,4 +114,23 @@ class TestThermalMassCalculation:
         c_total = sim._calculate_room_thermal_mass(room)
 
         # Розрахунок дасть ~0, але функція має повернути 1000
-        assert c_total == 1000.0
\ No newline at end of file
+        assert c_total == 1000.0
+    def test_wall_without_material(self, setup_room):
+        """Стіна без матеріалу не додає теплоємності і не ламає розрахунок."""
+        sim, room, concrete = setup_room
+        concrete.density = 0
+        sim.building.walls["w0"].base_material = None
+
+        c_total = sim._calculate_room_thermal_mass(room)
+        assert c_total == pytest.approx(1 * AIR_DENSITY * AIR_SPECIFIC_HEAT)
+
+    def test_step_with_material_less_wall(self, concrete):
+        """Повний крок симуляції з кімнатою, одна зі стін якої без матеріалу."""
+        from simulation.controls import RoomControlProfile
+        b = Building()
+        room = b.create_initial_room(4, 4, 3, concrete, "Hall")
+        b.mutable_wall(room.wall_ids[0]).base_material = None
+        sim = ThermalSimulation(b)
+        sim.initialize(start_temp=20.0, profiles={room.id: RoomControlProfile()}, t_min=-5, t_max=0)
+        sim.run_simulation(duration_hours=0.1, dt_seconds=60, workers=1)
+        assert len(sim.history_time) == 7
@@ -0,0 +1,52 @@
+from streamlit.testing.v1 import AppTest
+from building_serializer import BuildingSerializer
+from custom_pages.save_load import _export_file
+from building import Building
+from bulding_compounds.material import MATERIALS
+
+
+def open_export_page(app_path):
+    """Будівля з однією кімнатою на сторінці імпорту / експорту."""
+    building = Building()
+    building.create_initial_room(5, 4, 2.8, next(iter(MATERIALS.values())), "Вітальня")
+    at = AppTest.from_file(app_path, default_timeout=10)
+    at.session_state.building = building
+    at.run()
+    at.sidebar.radio("navigation_radio").set_value("Імпорт та Експорт").run()
+    return at
+
+
+def test_export_built_only_on_request(app_path):
+    at = open_export_page(app_path)
+
+    # Звичайний показ сторінки нічого не серіалізує
+    assert not at.exception
+    assert len(at.get("download_button")) == 0
+
+    at.button("export_prepare").click().run()
+    assert not at.exception
+    assert len(at.get("download_button")) == 1
+    # Байти файлу не тримаються в стані сесії
+    assert "export_cache" not in at.session_state
+
+    # Наступний rerun відпускає підготовлений файл
+    at.run()
+    assert len(at.get("download_button")) == 0
+
+
+def test_export_file_contents():
+    building = Building()
+    building.create_initial_room(5, 4, 2.8, next(iter(MATERIALS.values())), "Вітальня")
+    assert _export_file(building, "json").getvalue() == BuildingSerializer.to_json(building).encode("utf-8")
+    compact = _export_file(building, "json_compact").getvalue()
+    assert compact == BuildingSerializer.to_json(building, compact=True).encode("utf-8")
+    restored = BuildingSerializer.from_binary(_export_file(building, "npz").getvalue())
+    assert set(restored.rooms) == set(building.rooms)
+
+
+def test_npz_export(app_path):
+    at = open_export_page(app_path)
+    at.radio("export_format").set_value("npz").run()
+    at.button("export_prepare").click().run()
+    assert not at.exception
+    assert len(at.get("download_button")) == 1
@@ -0,0 +1,105 @@
+import pytest
+from bulding_compounds.wall import Wall
+from bulding_compounds.material import Material
+from bulding_compounds.opening import Opening, OpeningTech, OpeningCategory, OpeningList
+
+
+@pytest.fixture
+def brick():
+    return Material(name="Brick", thickness=0.5, conductivity=0.5)
+
+
+@pytest.fixture
+def wall(brick):
+    # 10м x 3м
+    return Wall(start_x=0, start_y=0, end_x=10, end_y=0, height=3.0, base_material=brick)
+
+
+@pytest.fixture
+def window():
+    tech = OpeningTech(name="Glass", U=2.0, g=0.5, category=OpeningCategory.WINDOW)
+    return Opening(tech=tech, width=2.0, height=1.0)
+
+
+class TestWallCachedProperties:
+
+    def test_total_ua(self, wall, brick, window):
+        wall.add_opening(window)
+        assert wall.area_net == 28.0
+        assert wall.total_ua == pytest.approx(brick.U * 28.0 + 2.0 * 2.0)
+
+    def test_geometry_change_invalidates(self, wall):
+        assert wall.area_gross == 30.0
+        wall.end_x = 5
+        assert wall.length == 5.0
+        assert wall.area_gross == 15.0
+
+    def test_material_change_invalidates(self, wall, brick):
+        before = wall.total_ua
+        brick.thickness = 1.0  # зміна на місці
+        assert wall.total_ua < before
+        wall.base_material = Material(name="Glass wall", thickness=0.01, conductivity=1.0)
+        assert wall.total_ua > before
+
+    def test_direct_opening_list_change(self, wall, window):
+        wall.add_opening(window)
+        wall.openings.clear()  # напр., скасування в журналі
+        assert wall.area_openings == 0.0
+        assert wall.area_net == 30.0
+
+    def test_resized_opening_needs_invalidate(self, wall, window):
+        wall.add_opening(window)
+        window.width = 3.0
+        wall.invalidate_cache()
+        assert wall.area_openings == 3.0
+
+    def test_resized_opening_detected(self, wall, brick, window):
+        wall.add_opening(window)
+        assert wall.area_openings == 2.0
+        window.width = 3.0
+        assert wall.area_openings == 3.0
+        assert wall.total_ua == pytest.approx(brick.U * 27.0 + 2.0 * 3.0)
+
+    def test_replaced_opening_same_count(self, wall, brick, window):
+        wall.add_opening(window)
+        before = wall.total_ua
+        wall.openings[0] = Opening(tech=OpeningTech(name="Door", U=1.0, category=OpeningCategory.DOOR),
+                                   width=1.0, height=2.0)
+        assert wall.area_openings == 2.0
+        assert wall.total_ua == pytest.approx(brick.U * 28.0 + 1.0 * 2.0)
+        assert wall.total_ua != before
+
+    def test_opening_tech_u_change_detected(self, wall, brick, window):
+        wall.add_opening(window)
+        window.tech.U = 1.0
+        assert wall.total_ua == pytest.approx(brick.U * 28.0 + 1.0 * 2.0)
+
+    def test_openings_counter(self, wall, window):
+        assert wall.openings.revision == 0
+        wall.add_opening(window)
+        wall.openings.append(Opening(tech=window.tech, width=1.0, height=1.0))
+        assert wall.openings.revision == 2
+        del wall.openings[0]
+        assert wall.openings.revision == 3
+        assert wall.area_openings == 1.0
+
+    def test_assigned_list_is_counted(self, wall, window):
+        wall.openings = [window]
+        assert isinstance(wall.openings, OpeningList)
+        assert wall.area_openings == 2.0
+
+    def test_class_patch_respected(self, wall, monkeypatch):
+        monkeypatch.setattr(Material, "U", 0.5)
+        assert wall.total_ua == pytest.approx(0.5 * 30.0)
+
+
+class TestMaterialUCache:
+
+    def test_u_recomputed_after_change(self, brick):
+        u = brick.U
+        brick.conductivity = 0.05
+        assert brick.U < u
+
+    def test_cache_not_a_field(self, brick):
+        brick.U
+        assert brick == Material(name="Brick", thickness=0.5, conductivity=0.5, id=brick.id)
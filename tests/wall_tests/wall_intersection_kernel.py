@@ -0,0 +1,72 @@
+import random
+import numpy as np
+import pytest
+from shapely.geometry import LineString
+from bulding_compounds.wall import Wall, walls_intersect_properly, segments_intersect_properly
+
+
+def shapely_reference(s1, s2) -> bool:
+    """Попередня реалізація через shapely — еталон семантики."""
+    line1 = LineString([(s1[0], s1[1]), (s1[2], s1[3])])
+    line2 = LineString([(s2[0], s2[1]), (s2[2], s2[3])])
+    if line1.equals(line2):
+        return True
+    if not line1.intersects(line2):
+        return True
+    intersection = line1.intersection(line2)
+    if intersection.geom_type == "Point":
+        point = (intersection.x, intersection.y)
+        ends = [(s1[0], s1[1]), (s1[2], s1[3]), (s2[0], s2[1]), (s2[2], s2[3])]
+        return point in ends
+    return False
+
+
+def random_segment(rng, size=4):
+    while True:
+        seg = tuple(float(rng.randint(0, size)) for _ in range(4))
+        if seg[:2] != seg[2:]:
+            return seg
+
+
+class TestSegmentKernel:
+
+    def test_matches_shapely_on_grid_segments(self):
+        """Маленька ціла сітка дає багато кутів, Т-стиків та накладань."""
+        rng = random.Random(42)
+        for _ in range(300):
+            seg = random_segment(rng)
+            others = [random_segment(rng) for _ in range(20)]
+            result = segments_intersect_properly(seg, others)
+            expected = [shapely_reference(seg, other) for other in others]
+            assert result.tolist() == expected, (seg, others)
+
+    @pytest.mark.parametrize("other, expected", [
+        ((10, 0, 10, 10), True),   # кут
+        ((5, 0, 5, 10), True),     # Т-стик у внутрішній точці
+        ((10, 0, 0, 0), True),     # та сама стіна у зворотному напрямку
+        ((10, 0, 20, 0), True),    # колінеарні, торкаються кінцями
+        ((5, 0, 15, 0), False),    # накладання
+        ((2, 0, 8, 0), False),     # одна всередині іншої
+        ((5, -5, 5, 5), False),    # X-перетин
+        ((0, 1, 10, 1), True),     # паралельні
+        ((11, 0, 20, 0), True),    # колінеарні, не торкаються
+    ])
+    def test_cases(self, other, expected):
+        assert segments_intersect_properly((0, 0, 10, 0), [other]).tolist() == [expected]
+
+    def test_vertical_collinear_overlap(self):
+        assert segments_intersect_properly((0, 0, 0, 10), [(0, 5, 0, 15)]).tolist() == [False]
+
+    def test_empty_input(self):
+        assert segments_intersect_properly((0, 0, 1, 0), np.empty((0, 4))).shape == (0,)
+
+    def test_pairwise_wrapper_returns_bool(self):
+        assert walls_intersect_properly(Wall(0, 0, 10, 0), Wall(5, -5, 5, 5)) is False
+        assert walls_intersect_properly(Wall(0, 0, 10, 0), Wall(10, 0, 10, 5)) is True
+
+    def test_large_batch(self):
+        """10 000 відрізків сітки перевіряються одним викликом."""
+        xs = np.arange(10_000, dtype=float)
+        others = np.column_stack([xs, np.zeros_like(xs), xs, np.ones_like(xs)])
+        result = segments_intersect_properly((-1.0, 0.5, 20_000.0, 0.5), others)
+        assert not result.any()
@@ -0,0 +1,60 @@
+import pytest
+import numpy as np
+from bulding_compounds.wall import Wall
+from bulding_compounds.opening import Opening, OpeningTech, OpeningCategory
+
+
+@pytest.fixture
+def wall():
+    # Стіна довжиною 10м (0->10), висота 3м
+    return Wall(start_x=0, start_y=0, end_x=10, end_y=0, height=3.0)
+
+
+@pytest.fixture
+def tech():
+    return OpeningTech(name="Glass", U=1, g=0.5, category=OpeningCategory.WINDOW)
+
+
+class TestOpeningLayout:
+
+    def test_even_spacing(self, wall, tech):
+        wall.add_opening(Opening(tech=tech, width=2.0, height=1.5))
+        wall.add_opening(Opening(tech=tech, width=2.0, height=1.5))
+        # Проміжки: (10 - 4) / 3 = 2 -> [2..4] та [6..8]
+        np.testing.assert_allclose(wall.opening_layout, [[2, 2, 0, 4, 0], [6, 6, 0, 8, 0]])
+
+    def test_computed_once(self, wall, tech):
+        wall.add_opening(Opening(tech=tech, width=2.0, height=1.5))
+        assert wall.opening_layout is wall.opening_layout
+        assert not wall.opening_layout.flags.writeable
+
+    def test_recomputed_after_geometry_change(self, wall, tech):
+        wall.add_opening(Opening(tech=tech, width=2.0, height=1.5))
+        wall.end_x, wall.end_y = 0, 10  # стіна тепер уздовж Y
+        np.testing.assert_allclose(wall.opening_layout, [[4, 0, 4, 0, 6]])
+
+    def test_recomputed_after_direct_list_change(self, wall, tech):
+        wall.add_opening(Opening(tech=tech, width=2.0, height=1.5))
+        wall.openings.clear()
+        assert wall.opening_layout.shape == (0, 5)
+
+    def test_not_a_dataclass_field(self, wall, tech):
+        other = Wall(start_x=0, start_y=0, end_x=10, end_y=0, height=3.0, id=wall.id)
+        wall.add_opening(Opening(tech=tech, width=2.0, height=1.5))
+        other.openings.append(wall.openings[0])
+        assert wall == other
+
+    def test_wall_without_openings_stores_nothing(self, wall):
+        other = Wall(start_x=0, start_y=0, end_x=5, end_y=0, height=3.0)
+        assert wall.opening_layout.shape == (0, 5)
+        # Порожня розкладка спільна, у самій стіні кеш не заповнюється
+        assert wall.opening_layout is other.opening_layout
+        assert wall._cached("_opening_layout") is None
+
+    def test_recomputed_after_reorder(self, wall, tech):
+        wall.add_opening(Opening(tech=tech, width=1.0, height=1.5))
+        wall.add_opening(Opening(tech=tech, width=3.0, height=1.5))
+        wall.opening_layout
+        wall.openings.reverse()
+        # Проміжки: (10 - 4) / 3 = 2 -> [2..5] та [7..8]
+        np.testing.assert_allclose(wall.opening_layout[:, 0], [2, 7])